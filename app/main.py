@@ -1,6 +1,28 @@
-from fastapi import FastAPI, Request
+import time
 
-from app.slack.app import handler
+_import_started = time.perf_counter()
+
+# Imported after the clock starts so IMPORT_SECONDS includes them.
+from fastapi import FastAPI, Request, Response  # noqa: E402
+
+from app.settings import get_settings  # noqa: E402
+from app.slack import reporting  # noqa: E402
+from app.telemetry import PROMETHEUS_CONTENT_TYPE, REGISTRY  # noqa: E402
+
+settings = get_settings()
+
+if settings.slack_async:
+    # Bolt AsyncApp + AsyncWebClient; snapshot work runs as background tasks.
+    from app.slack.async_app import async_handler as handler
+    from app.slack.async_app import scheduler
+    from app.slack.async_ui import panel_coalescer
+else:
+    from app.slack.app import handler, scheduler
+    from app.slack.ui import panel_coalescer
+
+# Seconds spent importing the app, from this module's first line; the
+# reporting stack is not part of it (see app.slack.reporting).
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 api = FastAPI()
 
@@ -8,6 +30,27 @@ api = FastAPI()
 async def slack_events(req: Request):
     return await handler.handle(req)
 
+@api.on_event("startup")
+def warm_up_reporting():
+    if settings.reporting_warm_up:
+        reporting.start_warm_up()
+
+@api.on_event("shutdown")
+async def flush_panel_updates():
+    flushed = panel_coalescer.flush()
+    if flushed is not None:
+        await flushed
+
 @api.get("/health")
 def health():
-    return {"ok": True}
+    status = {"ok": True, "startup": {"import_seconds": round(IMPORT_SECONDS, 4), "reporting": reporting.stats()}}
+    service = reporting.running_render_service()
+    if service is not None:
+        status["render"] = service.stats()
+    if scheduler is not None:
+        status["slack"] = scheduler.stats()
+    return status
+
+@api.get("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
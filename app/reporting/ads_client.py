@@ -1,11 +1,17 @@
-import datetime as dt
 import math
 import random
+import time
 import uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
-from app.reporting.utils import clamp, daterange, iso_utc_start_of_day, safe_div
+import numpy as np
+
+from app.reporting.utils import clamp, date_from_epoch_day, epoch_day_from_iso, iso_utc_from_epoch_day, safe_div
+from app.telemetry import span
+
+if TYPE_CHECKING:
+    from app.reporting.synthetic import SyntheticAdsGenerator
 
 @dataclass
 class AggregateRow:
@@ -28,7 +34,227 @@ class AggregateReport:
     continuation_token: Optional[str] = None
     warnings: Optional[List[str]] = None
 
+@dataclass
+class ColumnarReport:
+    """
+    Array-backed report: one NumPy array per stats field, plus integer entity/day
+    index columns into the `entity_*` lookup lists and the `days` array of
+    epoch days. Row objects (with ISO timestamps) are only materialized on
+    demand via `iter_rows()` / `rows`.
+    """
+    report_start: str
+    report_end: str
+    granularity: str
+    entity_type: str
+    entity_ids: List[str]
+    entity_names: List[str]
+    entity_statuses: List[str]
+    days: np.ndarray
+    entity_index: np.ndarray
+    day_index: np.ndarray
+    stats: Dict[str, np.ndarray]
+    parent_entities: Optional[List[Optional[Dict[str, Any]]]] = None
+    continuation_token: Optional[str] = None
+    warnings: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return int(self.entity_index.shape[0])
+
+    @property
+    def num_entities(self) -> int:
+        return len(self.entity_ids)
+
+    @property
+    def num_days(self) -> int:
+        return len(self.days)
+
+    def column(self, field: str) -> np.ndarray:
+        col = self.stats.get(field)
+        if col is None:
+            return np.zeros(len(self), dtype=np.float64)
+        return col
+
+    def iter_rows(self) -> Iterator[AggregateRow]:
+        day_bounds = [(iso_utc_from_epoch_day(d), iso_utc_from_epoch_day(d + 1)) for d in self.days.tolist()]
+        fields = list(self.stats.keys())
+        values = [self.stats[f].tolist() for f in fields]
+        parents = self.parent_entities
+        for i, (ent, day) in enumerate(zip(self.entity_index.tolist(), self.day_index.tolist())):
+            start_time, end_time = day_bounds[day]
+            yield AggregateRow(
+                entity_type=self.entity_type,
+                entity_id=self.entity_ids[ent],
+                entity_name=self.entity_names[ent],
+                entity_status=self.entity_statuses[ent],
+                start_time=start_time,
+                end_time=end_time,
+                stats={f: vals[i] for f, vals in zip(fields, values)},
+                parent_entity=parents[ent] if parents else None,
+            )
+
+    @property
+    def rows(self) -> List[AggregateRow]:
+        return list(self.iter_rows())
+
+    def to_report(self) -> AggregateReport:
+        return AggregateReport(
+            report_start=self.report_start,
+            report_end=self.report_end,
+            granularity=self.granularity,
+            entity_type=self.entity_type,
+            rows=self.rows,
+            continuation_token=self.continuation_token,
+            warnings=self.warnings,
+        )
+
+    def split_by_day(self) -> List["ColumnarReport"]:
+        """
+        One report per day present. Entity lookup lists are shared with `self`.
+        """
+        order = np.argsort(self.day_index, kind="stable")
+        sorted_days = self.day_index[order]
+        bounds = np.flatnonzero(np.diff(sorted_days)) + 1
+        parts: List[ColumnarReport] = []
+        for chunk in np.split(order, bounds):
+            if not len(chunk):
+                continue
+            day = int(self.days[self.day_index[chunk[0]]])
+            parts.append(
+                ColumnarReport(
+                    report_start=iso_utc_from_epoch_day(day),
+                    report_end=iso_utc_from_epoch_day(day),
+                    granularity=self.granularity,
+                    entity_type=self.entity_type,
+                    entity_ids=self.entity_ids,
+                    entity_names=self.entity_names,
+                    entity_statuses=self.entity_statuses,
+                    days=np.array([day], dtype=np.int32),
+                    entity_index=self.entity_index[chunk],
+                    day_index=np.zeros(len(chunk), dtype=np.int32),
+                    stats={f: col[chunk] for f, col in self.stats.items()},
+                    parent_entities=self.parent_entities,
+                )
+            )
+        return parts
+
+    @classmethod
+    def concat(cls, parts: List["ColumnarReport"]) -> "ColumnarReport":
+        """
+        Merges reports of the same entity type, unifying entity and day lookups.
+        """
+        if not parts:
+            raise ValueError("concat() needs at least one report")
+        entity_pos: Dict[str, int] = {}
+        entity_ids: List[str] = []
+        entity_names: List[str] = []
+        entity_statuses: List[str] = []
+        parents: List[Optional[Dict[str, Any]]] = []
+        day_pos: Dict[int, int] = {}
+        days: List[int] = []
+        ent_idx: List[np.ndarray] = []
+        day_idx: List[np.ndarray] = []
+        fields = list(dict.fromkeys(f for p in parts for f in p.stats))
+
+        for p in parts:
+            ent_map = np.empty(p.num_entities, dtype=np.int32)
+            for i, eid in enumerate(p.entity_ids):
+                e = entity_pos.get(eid)
+                if e is None:
+                    e = entity_pos[eid] = len(entity_ids)
+                    entity_ids.append(eid)
+                    entity_names.append(p.entity_names[i])
+                    entity_statuses.append(p.entity_statuses[i])
+                    parents.append(p.parent_entities[i] if p.parent_entities else None)
+                ent_map[i] = e
+            day_map = np.empty(p.num_days, dtype=np.int32)
+            for i, d in enumerate(p.days.tolist()):
+                j = day_pos.get(d)
+                if j is None:
+                    j = day_pos[d] = len(days)
+                    days.append(d)
+                day_map[i] = j
+            ent_idx.append(ent_map[p.entity_index])
+            day_idx.append(day_map[p.day_index])
+
+        return cls(
+            report_start=min(p.report_start for p in parts),
+            report_end=max(p.report_end for p in parts),
+            granularity=parts[0].granularity,
+            entity_type=parts[0].entity_type,
+            entity_ids=entity_ids,
+            entity_names=entity_names,
+            entity_statuses=entity_statuses,
+            days=np.array(days, dtype=np.int32),
+            entity_index=np.concatenate(ent_idx),
+            day_index=np.concatenate(day_idx),
+            stats={f: np.concatenate([p.column(f) for p in parts]) for f in fields},
+            parent_entities=parents if any(x is not None for x in parents) else None,
+            warnings=[w for p in parts for w in (p.warnings or [])],
+        )
+
+    @classmethod
+    def from_report(cls, report: AggregateReport) -> "ColumnarReport":
+        entity_pos: Dict[str, int] = {}
+        entity_ids: List[str] = []
+        entity_names: List[str] = []
+        entity_statuses: List[str] = []
+        parents: List[Optional[Dict[str, Any]]] = []
+        day_pos: Dict[str, int] = {}
+        days: List[int] = []
+        ent_idx: List[int] = []
+        day_idx: List[int] = []
+        fields: Dict[str, None] = {}
+
+        for r in report.rows:
+            e = entity_pos.get(r.entity_id)
+            if e is None:
+                e = entity_pos[r.entity_id] = len(entity_ids)
+                entity_ids.append(r.entity_id)
+                entity_names.append(r.entity_name)
+                entity_statuses.append(r.entity_status)
+                parents.append(r.parent_entity)
+            d = day_pos.get(r.start_time)
+            if d is None:
+                d = day_pos[r.start_time] = len(days)
+                days.append(epoch_day_from_iso(r.start_time))
+            ent_idx.append(e)
+            day_idx.append(d)
+            for f in r.stats:
+                fields.setdefault(f)
+
+        stats = {f: np.array([r.stats.get(f, 0) for r in report.rows]) for f in fields}
+        return cls(
+            report_start=report.report_start,
+            report_end=report.report_end,
+            granularity=report.granularity,
+            entity_type=report.entity_type,
+            entity_ids=entity_ids,
+            entity_names=entity_names,
+            entity_statuses=entity_statuses,
+            days=np.array(days, dtype=np.int32),
+            entity_index=np.array(ent_idx, dtype=np.int32),
+            day_index=np.array(day_idx, dtype=np.int32),
+            stats=stats,
+            parent_entities=parents if any(p is not None for p in parents) else None,
+            continuation_token=report.continuation_token,
+            warnings=report.warnings,
+        )
+
+# Entity IDs of the unseeded mock, stable per (account, entity type, index) so
+# that cached and refetched days of an account aggregate together.
+_MOCK_ENTITY_NAMESPACE = uuid.UUID("0d6f3c1e-8a42-4f7b-9c55-6e2b1a7d4f90")
+
+def _mock_entity_id(ad_account_id: str, entity_type: str, i: int) -> str:
+    return str(uuid.uuid5(_MOCK_ENTITY_NAMESPACE, f"{ad_account_id}:{entity_type}:{i}"))
+
 class MockSpotifyAdsApi:
+    def __init__(self, generator: Optional["SyntheticAdsGenerator"] = None, latency_seconds: float = 0.0):
+        # Without a generator, every call draws fresh random data (entity IDs
+        # stay stable per account).
+        self.generator = generator
+        # Simulated network round trip per page request.
+        self.latency_seconds = latency_seconds
+
     def get_aggregate_report_by_ad_account_id(
         self,
         ad_account_id: str,
@@ -41,22 +267,37 @@ class MockSpotifyAdsApi:
         limit: int = 50,
         continuation_token: Optional[str] = None,
     ) -> AggregateReport:
-        start_date = dt.datetime.strptime(report_start, "%Y-%m-%dT%H:%M:%SZ").date()
-        end_date = dt.datetime.strptime(report_end, "%Y-%m-%dT%H:%M:%SZ").date()
-        days = daterange(start_date, end_date)
+        if self.generator is not None:
+            return self.get_columnar_report_by_ad_account_id(
+                ad_account_id=ad_account_id,
+                entity_type=entity_type,
+                fields=fields,
+                report_start=report_start,
+                report_end=report_end,
+                granularity=granularity,
+                include_parent_entity=include_parent_entity,
+                limit=limit,
+                continuation_token=continuation_token,
+            ).to_report()
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        days = range(epoch_day_from_iso(report_start), epoch_day_from_iso(report_end) + 1)
 
         num_entities = {"CAMPAIGN": 6, "AD_SET": 10, "AD": 20, "AD_ACCOUNT": 1}.get(entity_type, 6)
+        offset = int(continuation_token or 0)
+        page_end = min(num_entities, offset + limit)
         entities = []
-        for i in range(num_entities):
+        for i in range(offset, page_end):
             entities.append({
-                "id": str(uuid.uuid4()),
+                "id": _mock_entity_id(ad_account_id, entity_type, i),
                 "name": f"{entity_type.title().replace('_',' ')} {i+1}",
                 "status": "ACTIVE" if i % 7 != 0 else "PAUSED",
             })
 
         weights = [1.0 / (i + 1) ** 1.15 for i in range(num_entities)]
         wsum = sum(weights)
-        weights = [w / wsum for w in weights]
+        weights = [w / wsum for w in weights][offset:page_end]
 
         rows: List[AggregateRow] = []
         base_imps_per_day = random.randint(250_000, 900_000)
@@ -65,6 +306,7 @@ class MockSpotifyAdsApi:
         streamed_share = random.uniform(0.65, 0.95)
 
         for day_idx, day in enumerate(days):
+            start_time, end_time = iso_utc_from_epoch_day(day), iso_utc_from_epoch_day(day + 1)
             trend = 1.0 + 0.15 * math.sin(day_idx / 6.0)
             noise = random.uniform(0.85, 1.15)
             day_imps = int(base_imps_per_day * trend * noise)
@@ -106,7 +348,11 @@ class MockSpotifyAdsApi:
 
                 parent = None
                 if include_parent_entity and entity_type in ("AD", "AD_SET"):
-                    parent = {"entity_type": "CAMPAIGN", "entity_id": str(uuid.uuid4()), "entity_name": "Parent Campaign"}
+                    parent = {
+                        "entity_type": "CAMPAIGN",
+                        "entity_id": _mock_entity_id(ad_account_id, "CAMPAIGN", (offset + ent_idx) % 6),
+                        "entity_name": "Parent Campaign",
+                    }
 
                 rows.append(
                     AggregateRow(
@@ -114,8 +360,8 @@ class MockSpotifyAdsApi:
                         entity_id=ent["id"],
                         entity_name=ent["name"],
                         entity_status=ent["status"],
-                        start_time=iso_utc_start_of_day(day),
-                        end_time=iso_utc_start_of_day(day + dt.timedelta(days=1)),
+                        start_time=start_time,
+                        end_time=end_time,
                         stats=stats,
                         parent_entity=parent,
                     )
@@ -126,7 +372,90 @@ class MockSpotifyAdsApi:
             report_end=report_end,
             granularity=granularity,
             entity_type=entity_type,
-            rows=rows[: limit * len(days)],
-            continuation_token=None,
+            rows=rows,
+            continuation_token=str(page_end) if page_end < num_entities else None,
             warnings=[],
         )
+
+    def get_columnar_report_by_ad_account_id(
+        self,
+        ad_account_id: str,
+        entity_type: str,
+        fields: List[str],
+        report_start: str,
+        report_end: str,
+        granularity: str = "DAY",
+        include_parent_entity: bool = False,
+        limit: int = 50,
+        continuation_token: Optional[str] = None,
+    ) -> ColumnarReport:
+        if self.generator is not None:
+            if self.latency_seconds:
+                time.sleep(self.latency_seconds)
+            offset = int(continuation_token or 0)
+            report = self.generator.generate(
+                ad_account_id=ad_account_id,
+                entity_type=entity_type,
+                fields=fields,
+                start_date=date_from_epoch_day(epoch_day_from_iso(report_start)),
+                end_date=date_from_epoch_day(epoch_day_from_iso(report_end)),
+                granularity=granularity,
+                include_parent_entity=include_parent_entity,
+                entity_offset=offset,
+                entity_limit=limit,
+            )
+            page_end = offset + report.num_entities
+            report.report_start = report_start
+            report.report_end = report_end
+            report.continuation_token = str(page_end) if page_end < self.generator.entity_count(entity_type) else None
+            return report
+
+        report = self.get_aggregate_report_by_ad_account_id(
+            ad_account_id=ad_account_id,
+            entity_type=entity_type,
+            fields=fields,
+            report_start=report_start,
+            report_end=report_end,
+            granularity=granularity,
+            include_parent_entity=include_parent_entity,
+            limit=limit,
+            continuation_token=continuation_token,
+        )
+        return ColumnarReport.from_report(report)
+
+def iter_report_pages(
+    api: MockSpotifyAdsApi,
+    *,
+    ad_account_id: str,
+    entity_type: str,
+    fields: List[str],
+    report_start: str,
+    report_end: str,
+    granularity: str = "DAY",
+    include_parent_entity: bool = False,
+    limit: int = 50,
+    columnar: bool = True,
+) -> Iterator[Any]:
+    """
+    Yields report pages, following continuation tokens until the API stops
+    returning one. Only the current page is held in memory.
+    """
+    fetch = api.get_columnar_report_by_ad_account_id if columnar else api.get_aggregate_report_by_ad_account_id
+    token: Optional[str] = None
+    while True:
+        with span("ads_fetch"):
+            page = fetch(
+                ad_account_id=ad_account_id,
+                entity_type=entity_type,
+                fields=fields,
+                report_start=report_start,
+                report_end=report_end,
+                granularity=granularity,
+                include_parent_entity=include_parent_entity,
+                limit=limit,
+                continuation_token=token,
+            )
+        yield page
+        token = page.continuation_token
+        if not token:
+            return
@@ -0,0 +1,177 @@
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import IO, Any, Optional, Union
+
+from app.reporting.template import TEMPLATE_VERSION
+
+def artifact_key(**inputs: Any) -> str:
+    """
+    sha256 of the inputs (and TEMPLATE_VERSION) as canonical JSON. Pass
+    everything the artifact is rendered from, data included, so a changed
+    input is a different artifact rather than a stale hit.
+    """
+    payload = json.dumps(
+        {"template_version": TEMPLATE_VERSION, **inputs},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_jsonable,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "item"):  # NumPy scalar
+        return value.item()
+    raise TypeError(f"Cannot hash {type(value).__name__} into an artifact key")
+
+class ArtifactCache:
+    """
+    Rendered artifacts on disk as `<key>.pdf`, keyed by artifact_key(), plus
+    `<key>.<channel>.slack` with the ID of the Slack file each one was
+    uploaded to that channel as.
+
+    Files are written to a temporary name and renamed into place, and each
+    (key, channel) has its own file, so worker processes can share the
+    directory without locking. A read refreshes the file's mtime; when a
+    write takes the total above `max_bytes`, the least recently used
+    artifacts are deleted.
+    """
+
+    def __init__(self, path: str, *, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "slack_file_hits": 0}
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{key}.{suffix}")
+
+    def open(self, key: str) -> Optional[IO[bytes]]:
+        """
+        The stored artifact as an open file, for the caller to close.
+        """
+        path = self._file(key, "pdf")
+        try:
+            f: Optional[IO[bytes]] = open(path, "rb")
+            os.utime(path)
+        except FileNotFoundError:
+            f = None
+        with self._lock:
+            self.stats["misses" if f is None else "hits"] += 1
+        return f
+
+    def get(self, key: str) -> Optional[bytes]:
+        f = self.open(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def put(self, key: str, data: Union[bytes, IO[bytes]]) -> None:
+        """
+        Stores the artifact (bytes, or a file from its current position, which
+        is restored) unless it alone exceeds `max_bytes`. Keys are content
+        hashes, so an existing one is only marked as used.
+        """
+        path = self._file(key, "pdf")
+        if _size(data) > self.max_bytes:
+            return
+        try:
+            os.utime(path)
+            return
+        except FileNotFoundError:
+            pass
+        self._write(path, data)
+        self._evict()
+
+    def slack_file(self, key: str, channel: str) -> Optional[str]:
+        """
+        ID of the Slack file this artifact was uploaded to `channel` as, if any.
+        """
+        try:
+            with open(self._slack_file(key, channel), encoding="utf-8") as f:
+                file_id: Optional[str] = f.read() or None
+        except FileNotFoundError:
+            file_id = None
+        if file_id is not None:
+            with self._lock:
+                self.stats["slack_file_hits"] += 1
+        return file_id
+
+    def remember_slack_file(self, key: str, channel: str, file_id: str) -> None:
+        self._write(self._slack_file(key, channel), file_id.encode("utf-8"))
+
+    def forget_slack_file(self, key: str, channel: str) -> None:
+        try:
+            os.remove(self._slack_file(key, channel))
+        except FileNotFoundError:
+            pass
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._artifacts())
+
+    def _slack_file(self, key: str, channel: str) -> str:
+        return self._file(key, f"{channel}.slack")
+
+    def _write(self, path: str, data: Union[bytes, IO[bytes]]) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                position = data.tell()
+                shutil.copyfileobj(data, f)
+                data.seek(position)
+        os.replace(tmp, path)
+
+    def _artifacts(self):
+        """
+        (key, size, mtime) of every stored artifact.
+        """
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith(".pdf"):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            yield entry.name[: -len(".pdf")], st.st_size, st.st_mtime_ns
+
+    def _evict(self) -> None:
+        artifacts = sorted(self._artifacts(), key=lambda a: a[2])
+        total = sum(size for _, size, _ in artifacts)
+        evicted = []
+        for key, size, _ in artifacts:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._file(key, "pdf"))
+            except FileNotFoundError:
+                pass
+            evicted.append(key)
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+        if not evicted:
+            return
+        prefixes = tuple(f"{key}." for key in evicted)
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".slack") and entry.name.startswith(prefixes):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+def _size(data: Union[bytes, IO[bytes]]) -> int:
+    if isinstance(data, bytes):
+        return len(data)
+    position = data.tell()
+    end = data.seek(0, os.SEEK_END)
+    data.seek(position)
+    return end - position
@@ -0,0 +1,186 @@
+import datetime as dt
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Generator, Iterator, List, Optional, Sequence, Tuple
+
+from app.reporting.ads_client import ColumnarReport, MockSpotifyAdsApi, iter_report_pages
+from app.reporting.history import AccountHistory, HistoryStore
+from app.reporting.utils import epoch_day, iso_utc_from_epoch_day, iso_utc_start_of_day
+
+CacheKey = Tuple[str, str, Tuple[str, ...], str]
+
+@dataclass
+class _DayEntry:
+    parts: List[ColumnarReport]
+    expires_at: float
+
+class ReportCache:
+    """
+    Per-day report cache keyed by (ad_account_id, entity_type, fields, granularity).
+
+    A request only fetches the days that are missing, expired, or recent enough
+    to still be changing (within `volatile_days` of today, which get the short
+    `volatile_ttl_seconds`). Keys are evicted least-recently-used beyond
+    `max_entries`.
+
+    With a `history` store, missing days that are no longer volatile are read
+    from disk before asking the API, and fetched ones are written there.
+    """
+
+    def __init__(
+        self,
+        api: MockSpotifyAdsApi,
+        *,
+        max_entries: int = 256,
+        ttl_seconds: float = 24 * 3600,
+        volatile_days: int = 1,
+        volatile_ttl_seconds: float = 15 * 60,
+        clock: Callable[[], float] = time.time,
+        today: Callable[[], dt.date] = dt.date.today,
+        history: Optional[HistoryStore] = None,
+    ):
+        self.api = api
+        self.history = history
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.volatile_days = volatile_days
+        self.volatile_ttl_seconds = volatile_ttl_seconds
+        self._clock = clock
+        self._today = today
+        # Per key: epoch day -> cached parts.
+        self._entries: "OrderedDict[CacheKey, Dict[int, _DayEntry]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"cached_days": 0, "history_days": 0, "fetched_days": 0, "evictions": 0}
+
+    def iter_pages(
+        self,
+        *,
+        ad_account_id: str,
+        entity_type: str,
+        fields: List[str],
+        start_date: dt.date,
+        end_date: dt.date,
+        granularity: str = "DAY",
+        limit: int = 50,
+    ) -> Iterator[ColumnarReport]:
+        """
+        Yields all cached days merged into one report, then freshly fetched pages
+        as they stream in. Fetched pages are split per day and stored.
+        """
+        params = dict(ad_account_id=ad_account_id, entity_type=entity_type, fields=fields, limit=limit)
+        if granularity != "DAY":
+            yield from iter_report_pages(
+                self.api,
+                report_start=iso_utc_start_of_day(start_date),
+                report_end=iso_utc_start_of_day(end_date),
+                granularity=granularity,
+                **params,
+            )
+            return
+
+        key: CacheKey = (ad_account_id, entity_type, tuple(fields), granularity)
+        days = range(epoch_day(start_date), epoch_day(end_date) + 1)
+        cached = self._lookup(key, days)
+        missing = [d for d in days if d not in cached]
+
+        if cached:
+            yield ColumnarReport.concat([p for d in days if d in cached for p in cached[d]])
+
+        history = self.history.account(ad_account_id, entity_type) if self.history is not None else None
+        runs = _contiguous_runs(missing)
+        if history is not None:
+            runs = yield from self._read_history(history, fields, runs)
+
+        closed_until = epoch_day(self._today()) - self.volatile_days - 1
+        for run_start, run_end in runs:
+            fetched: Dict[int, List[ColumnarReport]] = {}
+            for page in iter_report_pages(
+                self.api,
+                report_start=iso_utc_from_epoch_day(run_start),
+                report_end=iso_utc_from_epoch_day(run_end),
+                granularity=granularity,
+                **params,
+            ):
+                for part in page.split_by_day():
+                    fetched.setdefault(int(part.days[0]), []).append(part)
+                yield page
+            self._store(key, fetched, run_end - run_start + 1)
+            if history is not None and run_start <= closed_until:
+                closed_end = min(run_end, closed_until)
+                parts = [p for d in sorted(fetched) if d <= closed_end for p in fetched[d]]
+                if parts:
+                    history.write(ColumnarReport.concat(parts), run_start, closed_end)
+
+    def _read_history(
+        self, history: AccountHistory, fields: List[str], runs: List[Tuple[int, int]]
+    ) -> Generator[ColumnarReport, None, List[Tuple[int, int]]]:
+        """
+        Yields the stored part of each run and returns the runs left to fetch.
+        """
+        covered = history.covered()
+        if covered is None:
+            return runs
+        remaining: List[Tuple[int, int]] = []
+        for run_start, run_end in runs:
+            lo, hi = max(run_start, covered[0]), min(run_end, covered[1])
+            report = history.read(lo, hi, fields) if lo <= hi else None
+            if report is None:
+                remaining.append((run_start, run_end))
+                continue
+            with self._lock:
+                self.stats["history_days"] += hi - lo + 1
+            yield report
+            if run_start < lo:
+                remaining.append((run_start, lo - 1))
+            if hi < run_end:
+                remaining.append((hi + 1, run_end))
+        return remaining
+
+    def invalidate(self, ad_account_id: Optional[str] = None) -> None:
+        with self._lock:
+            if ad_account_id is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == ad_account_id]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: CacheKey, days: Sequence[int]) -> Dict[int, List[ColumnarReport]]:
+        now = self._clock()
+        with self._lock:
+            by_day = self._entries.get(key)
+            if by_day is None:
+                return {}
+            self._entries.move_to_end(key)
+            for d in [d for d, e in by_day.items() if e.expires_at <= now]:
+                del by_day[d]
+            hits = {d: by_day[d].parts for d in days if d in by_day}
+            self.stats["cached_days"] += len(hits)
+            return hits
+
+    def _store(self, key: CacheKey, fetched: Dict[int, List[ColumnarReport]], num_days: int) -> None:
+        now = self._clock()
+        volatile_from = epoch_day(self._today()) - self.volatile_days
+        with self._lock:
+            by_day = self._entries.setdefault(key, {})
+            self._entries.move_to_end(key)
+            self.stats["fetched_days"] += num_days
+            for d, parts in fetched.items():
+                ttl = self.volatile_ttl_seconds if d >= volatile_from else self.ttl_seconds
+                by_day[d] = _DayEntry(parts=parts, expires_at=now + ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+def _contiguous_runs(days: List[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for d in days:
+        if runs and d == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
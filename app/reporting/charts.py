@@ -0,0 +1,125 @@
+import io
+from typing import List, Sequence, Tuple
+
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.lib import colors
+from reportlab.lib.units import cm
+from reportlab.platypus import Flowable, Image
+
+from app.reporting.utils import date_from_epoch_day
+from app.telemetry import timed
+
+CHART_BACKENDS = ("reportlab", "matplotlib")
+CHART_WIDTH = 16 * cm
+CHART_HEIGHT = 5.7 * cm
+
+_LINE_COLOR = colors.HexColor("#1f77b4")
+_MAX_X_TICKS = 8
+
+@timed("chart_render")
+def line_chart(
+    xy: Sequence[Tuple[int, float]],
+    title: str,
+    ylabel: str,
+    *,
+    backend: str = "reportlab",
+    width: float = CHART_WIDTH,
+    height: float = CHART_HEIGHT,
+) -> Flowable:
+    if backend == "reportlab":
+        return reportlab_line_chart(xy, title, ylabel, width=width, height=height)
+    if backend == "matplotlib":
+        return matplotlib_line_chart(xy, title, ylabel, width=width, height=height)
+    raise ValueError(f"Unknown chart backend: {backend}")
+
+def reportlab_line_chart(
+    xy: Sequence[Tuple[int, float]],
+    title: str,
+    ylabel: str,
+    *,
+    width: float = CHART_WIDTH,
+    height: float = CHART_HEIGHT,
+) -> Drawing:
+    drawing = Drawing(width, height)
+    drawing.add(String(width / 2, height - 12, title, textAnchor="middle", fontName="Helvetica-Bold", fontSize=10))
+
+    label = Group(String(0, 0, ylabel, textAnchor="middle", fontName="Helvetica", fontSize=8))
+    label.transform = (0, 1, -1, 0, 10, height / 2)
+    drawing.add(label)
+
+    if not xy:
+        drawing.add(String(width / 2, height / 2, "No data", textAnchor="middle", fontName="Helvetica", fontSize=9))
+        return drawing
+
+    points = [(int(d), float(v)) for d, v in xy]
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+
+    plot = LinePlot()
+    plot.x = 58
+    plot.y = 42
+    plot.width = width - plot.x - 12
+    plot.height = height - plot.y - 24
+    plot.data = [points]
+    plot.lines[0].strokeColor = _LINE_COLOR
+    plot.lines[0].strokeWidth = 1.4
+
+    plot.xValueAxis.valueMin = xs[0]
+    plot.xValueAxis.valueMax = xs[-1] if xs[-1] > xs[0] else xs[0] + 1
+    plot.xValueAxis.valueSteps = _x_ticks(xs)
+    plot.xValueAxis.labelTextFormat = lambda v: date_from_epoch_day(v).isoformat()
+    plot.xValueAxis.labels.angle = 30
+    plot.xValueAxis.labels.boxAnchor = "ne"
+    plot.xValueAxis.labels.fontName = "Helvetica"
+    plot.xValueAxis.labels.fontSize = 7
+
+    plot.yValueAxis.valueMin = 0
+    plot.yValueAxis.valueMax = max(ys) * 1.05 if max(ys) > 0 else 1
+    plot.yValueAxis.labelTextFormat = _compact_number
+    plot.yValueAxis.labels.fontName = "Helvetica"
+    plot.yValueAxis.labels.fontSize = 7
+    plot.yValueAxis.visibleGrid = True
+    plot.yValueAxis.gridStrokeColor = colors.HexColor("#E8E8E8")
+
+    drawing.add(plot)
+    return drawing
+
+def matplotlib_line_chart(
+    xy: Sequence[Tuple[int, float]],
+    title: str,
+    ylabel: str,
+    *,
+    width: float = CHART_WIDTH,
+    height: float = CHART_HEIGHT,
+) -> Image:
+    # Object-oriented API only: pyplot's global figure manager is not thread-safe.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    xs = [date_from_epoch_day(d) for d, _ in xy]
+    ys = [v for _, v in xy]
+    fig = Figure(figsize=(7.2, 2.6), dpi=140)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.plot(xs, ys)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis="x", rotation=30)
+    fig.tight_layout()
+    out = io.BytesIO()
+    fig.savefig(out, format="png")
+    out.seek(0)
+    return Image(out, width=width, height=height)
+
+def _x_ticks(xs: List[int]) -> List[int]:
+    if len(xs) <= _MAX_X_TICKS:
+        return list(xs)
+    step = (len(xs) - 1) / (_MAX_X_TICKS - 1)
+    return [xs[round(i * step)] for i in range(_MAX_X_TICKS)]
+
+def _compact_number(v: float) -> str:
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if abs(v) >= threshold:
+            return f"{v / threshold:.1f}{suffix}"
+    return f"{v:.0f}"
@@ -0,0 +1,323 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.reporting.ads_client import ColumnarReport
+from app.reporting.utils import iso_utc_from_epoch_day
+
+FORMAT_VERSION = 2
+STAT_DTYPE = np.dtype("<f8")
+INDEX_DTYPE = np.dtype("<i4")
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+@dataclass
+class _Index:
+    fields: List[str]
+    # Epoch day of the first stored day.
+    start_day: int = 0
+    num_days: int = 0
+    entity_ids: List[str] = field(default_factory=list)
+    entity_names: List[str] = field(default_factory=list)
+    entity_statuses: List[str] = field(default_factory=list)
+    # day_offsets[k]..day_offsets[k + 1] are the rows of day start_day + k.
+    day_offsets: List[int] = field(default_factory=lambda: [0])
+    # Suffix of the column files; every rewrite moves to a new one.
+    generation: int = 0
+
+    @property
+    def rows(self) -> int:
+        return self.day_offsets[-1]
+
+    @property
+    def end_day(self) -> int:
+        return self.start_day + self.num_days - 1
+
+    def to_json(self) -> Dict:
+        return {"version": FORMAT_VERSION, **self.__dict__}
+
+    @classmethod
+    def from_json(cls, d: Dict) -> "_Index":
+        if d.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported history format version: {d.get('version')}")
+        return cls(**{k: v for k, v in d.items() if k != "version"})
+
+class AccountHistory:
+    """
+    Daily per-entity stats of one (ad_account_id, entity_type), on disk as
+    one fixed-width file per column (`<FIELD>.f8`, `entity.i4`, `day.i4`),
+    rows sorted by day, plus `index.json` with the entity table and the row
+    offset of every day. Reads are `np.memmap` slices of those files, so a
+    long range costs page faults, not heap copies.
+
+    The stored days form one contiguous run. New days after the run are
+    appended in place; anything else writes a new generation of column
+    files (`<FIELD>.<generation>.f8`) that the index switches to. Column
+    bytes are written before the index is atomically replaced, so a reader
+    (or a crashed writer) never sees rows the index does not count. Writers
+    take an flock on `.lock`, which also serializes worker processes.
+    Readers don't, so a store they can't read is a miss, not an error.
+    """
+
+    def __init__(self, path: str, entity_type: str):
+        self.path = path
+        self.entity_type = entity_type
+        self._lock = threading.RLock()
+        self._index: Optional[_Index] = None
+        self._index_version: Tuple[int, int] = (0, 0)
+        self._maps: Dict[str, np.ndarray] = {}
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _column_file(self, column: str, generation: int) -> str:
+        suffix = "i4" if column in ("entity", "day") else "f8"
+        return self._file(f"{column}.{suffix}" if generation == 0 else f"{column}.{generation}.{suffix}")
+
+    def _column_files(self) -> Dict[str, int]:
+        """
+        Generation of every column file on disk, including orphaned ones.
+        """
+        files = {}
+        for name in os.listdir(self.path):
+            parts = name.split(".")
+            if parts[-1] not in ("i4", "f8"):
+                continue
+            if len(parts) == 2:
+                files[name] = 0
+            elif len(parts) == 3 and parts[1].isdigit():
+                files[name] = int(parts[1])
+        return files
+
+    def _load_index(self) -> Optional[_Index]:
+        try:
+            st = os.stat(self._file("index.json"))
+        except FileNotFoundError:
+            return None
+        # Every save replaces the file, so the inode changes even when mtime doesn't.
+        version = (st.st_ino, st.st_mtime_ns)
+        if self._index is None or version != self._index_version:
+            with open(self._file("index.json"), encoding="utf-8") as f:
+                self._index = _Index.from_json(json.load(f))
+            self._index_version = version
+            self._maps = {}
+        return self._index
+
+    def _column(self, index: _Index, column: str) -> np.ndarray:
+        arr = self._maps.get(column)
+        if arr is None or len(arr) < index.rows:
+            dtype = INDEX_DTYPE if column in ("entity", "day") else STAT_DTYPE
+            path = self._column_file(column, index.generation)
+            if index.rows and os.path.getsize(path) < index.rows * dtype.itemsize:
+                raise ValueError(f"{path} is shorter than the {index.rows} rows its index counts")
+            arr = self._maps[column] = (
+                np.memmap(path, dtype=dtype, mode="r", shape=(index.rows,))
+                if index.rows
+                else np.zeros(0, dtype=dtype)
+            )
+        return arr
+
+    def covered(self) -> Optional[Tuple[int, int]]:
+        """
+        First and last stored epoch day.
+        """
+        with self._lock:
+            try:
+                index = self._load_index()
+            except (OSError, ValueError):
+                return None
+        if index is None or not index.num_days:
+            return None
+        return index.start_day, index.end_day
+
+    def read(self, start_day: int, end_day: int, fields: Sequence[str]) -> Optional[ColumnarReport]:
+        """
+        Zero-copy report for epoch days [start_day, end_day], or None unless
+        the range is stored and every field is. `day_index` counts from the first stored
+        day, so `days` starts there too. A store that can't be read (damaged,
+        or rewritten by another process meanwhile) is None as well.
+        """
+        with self._lock:
+            try:
+                index = self._load_index()
+                if index is None or not set(fields) <= set(index.fields):
+                    return None
+                first, last = start_day - index.start_day, end_day - index.start_day
+                if first < 0 or last >= index.num_days or first > last:
+                    return None
+                lo, hi = index.day_offsets[first], index.day_offsets[last + 1]
+                columns = {c: self._column(index, c) for c in ("entity", "day", *fields)}
+            except (OSError, ValueError):
+                self._index, self._maps = None, {}
+                return None
+        return ColumnarReport(
+            report_start=iso_utc_from_epoch_day(start_day),
+            report_end=iso_utc_from_epoch_day(end_day),
+            granularity="DAY",
+            entity_type=self.entity_type,
+            entity_ids=index.entity_ids,
+            entity_names=index.entity_names,
+            entity_statuses=index.entity_statuses,
+            days=np.arange(index.start_day, index.start_day + last + 1, dtype=np.int32),
+            entity_index=columns["entity"][lo:hi],
+            day_index=columns["day"][lo:hi],
+            stats={f: columns[f][lo:hi] for f in fields},
+        )
+
+    def write(self, report: ColumnarReport, start_day: int, end_day: int) -> bool:
+        """
+        Stores the report, which must hold every row of epoch days
+        [start_day, end_day].
+        Returns False (storing nothing) when the range would leave a gap in
+        the stored run or the report's fields differ from the stored ones.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, self._flock():
+            try:
+                index = self._load_index()
+                existing = self.read(index.start_day, index.end_day, index.fields) if index and index.num_days else None
+            except (OSError, ValueError):
+                index = existing = None
+            fields = sorted(report.stats)
+            if index is None or existing is None:
+                self._rewrite(_Index(fields=fields), report, start_day, end_day)
+                return True
+            if fields != sorted(index.fields):
+                return False
+            a, b = start_day, end_day
+            if b < index.start_day - 1 or a > index.end_day + 1:
+                return False
+            if a >= index.start_day:
+                if b > index.end_day:
+                    self._append(index, report, index.end_day + 1, b)
+                return True
+            merged = ColumnarReport.concat([
+                _days_between(report, a, index.start_day - 1),
+                existing,
+                _days_between(report, index.end_day + 1, b),
+            ])
+            self._rewrite(_Index(fields=index.fields), merged, a, max(b, index.end_day))
+            return True
+
+    @contextmanager
+    def _flock(self) -> Iterator[None]:
+        with open(self._file(".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _rows_by_day(self, index: _Index, report: ColumnarReport, first: int, last: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (row order, entity index into `index`, day number relative to
+        index.start_day) for the report rows within [first, last], by day.
+        """
+        row_days = report.days[report.day_index].astype(np.int64)
+        keep = np.flatnonzero((row_days >= first) & (row_days <= last))
+        order = keep[np.argsort(row_days[keep], kind="stable")]
+        positions = {eid: i for i, eid in enumerate(index.entity_ids)}
+        entity_map = np.empty(report.num_entities, dtype=INDEX_DTYPE)
+        for i, eid in enumerate(report.entity_ids):
+            if eid not in positions:
+                positions[eid] = len(index.entity_ids)
+                index.entity_ids.append(eid)
+                index.entity_names.append(report.entity_names[i])
+                index.entity_statuses.append(report.entity_statuses[i])
+            entity_map[i] = positions[eid]
+        return order, entity_map[report.entity_index[order]], (row_days[order] - index.start_day).astype(INDEX_DTYPE)
+
+    def _append(self, index: _Index, report: ColumnarReport, first: int, last: int) -> None:
+        order, entities, days = self._rows_by_day(index, report, first, last)
+        offset = index.rows
+        columns = {"entity": entities, "day": days, **{f: report.column(f)[order] for f in index.fields}}
+        for column, values in columns.items():
+            dtype = INDEX_DTYPE if column in ("entity", "day") else STAT_DTYPE
+            path = self._column_file(column, index.generation)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                # Drop bytes past the indexed rows left by an interrupted write.
+                f.truncate(offset * dtype.itemsize)
+                f.seek(offset * dtype.itemsize)
+                f.write(values.astype(dtype, copy=False).tobytes())
+        counts = np.bincount(days - index.num_days, minlength=last - first + 1)
+        index.day_offsets += (offset + np.cumsum(counts)).tolist()
+        index.num_days += last - first + 1
+        self._save_index(index)
+
+    def _rewrite(self, index: _Index, report: ColumnarReport, first: int, last: int) -> None:
+        """
+        Writes the report as a new generation of column files; the current
+        ones stay intact until the index has switched over.
+        """
+        files = self._column_files()
+        index.generation = max(files.values(), default=-1) + 1
+        for column in ("entity", "day", *index.fields):
+            open(self._column_file(column, index.generation), "wb").close()
+        index.start_day, index.num_days, index.day_offsets = first, 0, [0]
+        self._append(index, report, first, last)
+        for name, generation in files.items():
+            if generation != index.generation:
+                os.remove(self._file(name))
+
+    def _save_index(self, index: _Index) -> None:
+        tmp = self._file("index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index.to_json(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file("index.json"))
+        self._index = None
+        self._maps = {}
+
+def _days_between(report: ColumnarReport, first: int, last: int) -> ColumnarReport:
+    row_days = report.days[report.day_index]
+    rows = np.flatnonzero((row_days >= first) & (row_days <= last))
+    return ColumnarReport(
+        report_start=report.report_start,
+        report_end=report.report_end,
+        granularity=report.granularity,
+        entity_type=report.entity_type,
+        entity_ids=report.entity_ids,
+        entity_names=report.entity_names,
+        entity_statuses=report.entity_statuses,
+        days=report.days,
+        entity_index=report.entity_index[rows],
+        day_index=report.day_index[rows],
+        stats={f: col[rows] for f, col in report.stats.items()},
+    )
+
+class HistoryStore:
+    """
+    AccountHistory per (ad_account_id, entity_type) under `root`.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._accounts: Dict[Tuple[str, str], AccountHistory] = {}
+        self._lock = threading.Lock()
+
+    def account(self, ad_account_id: str, entity_type: str) -> AccountHistory:
+        key = (ad_account_id, entity_type)
+        with self._lock:
+            history = self._accounts.get(key)
+            if history is None:
+                path = os.path.join(self.root, _dirname(ad_account_id), _dirname(entity_type))
+                history = self._accounts[key] = AccountHistory(path, entity_type)
+            return history
+
+def _dirname(value: str) -> str:
+    """
+    A directory name for a user-supplied ID: its safe characters for
+    readability plus a hash of the whole ID, so no ID reaches outside the
+    store (".", "..") and no two IDs share a directory ("a/b", "a_b").
+    """
+    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+    return f"{_UNSAFE.sub('_', value)[:64]}-{digest}"
@@ -1,9 +1,15 @@
-import datetime as dt
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-from app.reporting.ads_client import AggregateRow
-from app.reporting.utils import safe_div
+import numpy as np
+
+from app.reporting.ads_client import AggregateRow, ColumnarReport
+from app.reporting.utils import epoch_day_from_iso, safe_div
+from app.telemetry import observe_stage, timed
+
+ReportRows = Union[List[AggregateRow], ColumnarReport]
 
 @dataclass
 class KPI:
@@ -14,7 +20,35 @@ class KPI:
     ctr: float
     e_cpcl: float
 
-def aggregate_kpis(rows: List[AggregateRow]) -> KPI:
+@dataclass(frozen=True)
+class MetricsSpec:
+    kpis: bool = True
+    top: Tuple[Tuple[str, int], ...] = ()
+    series: Tuple[str, ...] = ()
+
+@dataclass
+class MetricsResult:
+    kpi: Optional[KPI] = None
+    top: Dict[str, List[Tuple[str, float]]] = field(default_factory=dict)
+    # (epoch day, value) pairs in day order.
+    series: Dict[str, List[Tuple[int, float]]] = field(default_factory=dict)
+
+    def pdf_inputs(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for build_pdf_report's data parameters.
+        """
+        return {
+            "kpi": self.kpi,
+            "top_by_spend": self.top.get("SPEND", []),
+            "top_by_imps": self.top.get("IMPRESSIONS", []),
+            "series_imps": self.series.get("IMPRESSIONS", []),
+            "series_spend": self.series.get("SPEND", []),
+        }
+
+@timed("metrics.aggregate_kpis")
+def aggregate_kpis(rows: ReportRows) -> KPI:
+    if isinstance(rows, ColumnarReport):
+        return _aggregate_kpis_columnar(rows)
     imps = 0
     simps = 0
     clicks = 0
@@ -28,7 +62,10 @@ def aggregate_kpis(rows: List[AggregateRow]) -> KPI:
     e_cpcl = safe_div(spend, clicks)
     return KPI(impressions=imps, streamed_impressions=simps, clicks=clicks, spend=spend, ctr=ctr, e_cpcl=e_cpcl)
 
-def top_entities(rows: List[AggregateRow], metric: str, n: int = 8) -> List[Tuple[str, float]]:
+@timed("metrics.top_entities")
+def top_entities(rows: ReportRows, metric: str, n: int = 8) -> List[Tuple[str, float]]:
+    if isinstance(rows, ColumnarReport):
+        return _top_entities_columnar(rows, metric, n)
     agg: Dict[str, float] = {}
     name_by_id: Dict[str, str] = {}
     for r in rows:
@@ -38,9 +75,202 @@ def top_entities(rows: List[AggregateRow], metric: str, n: int = 8) -> List[Tupl
     ranked = sorted(agg.items(), key=lambda x: x[1], reverse=True)[:n]
     return [(name_by_id[k], v) for k, v in ranked]
 
-def daily_series(rows: List[AggregateRow], metric: str) -> List[Tuple[dt.date, float]]:
-    by_day: Dict[dt.date, float] = {}
+@timed("metrics.daily_series")
+def daily_series(rows: ReportRows, metric: str) -> List[Tuple[int, float]]:
+    if isinstance(rows, ColumnarReport):
+        return _daily_series_columnar(rows, metric)
+    by_day: Dict[int, float] = {}
     for r in rows:
-        d = dt.datetime.strptime(r.start_time, "%Y-%m-%dT%H:%M:%SZ").date()
+        d = epoch_day_from_iso(r.start_time)
         by_day[d] = by_day.get(d, 0.0) + float(r.stats.get(metric, 0.0))
     return sorted(by_day.items(), key=lambda x: x[0])
+
+class KpiAccumulator:
+    def __init__(self):
+        self.impressions = 0
+        self.streamed_impressions = 0
+        self.clicks = 0
+        self.spend = 0.0
+
+    def add(self, rows: ReportRows) -> "KpiAccumulator":
+        if isinstance(rows, ColumnarReport):
+            self.impressions += int(rows.column("IMPRESSIONS").sum())
+            self.streamed_impressions += int(rows.column("STREAMED_IMPRESSIONS").sum())
+            self.clicks += int(rows.column("CLICKS").sum())
+            self.spend += float(rows.column("SPEND").sum())
+            return self
+        for r in rows:
+            self.add_stats(r.stats)
+        return self
+
+    def add_stats(self, stats: Dict[str, float]) -> None:
+        self.impressions += int(stats.get("IMPRESSIONS", 0))
+        self.streamed_impressions += int(stats.get("STREAMED_IMPRESSIONS", 0))
+        self.clicks += int(stats.get("CLICKS", 0))
+        self.spend += float(stats.get("SPEND", 0.0))
+
+    def result(self) -> KPI:
+        return KPI(
+            impressions=self.impressions,
+            streamed_impressions=self.streamed_impressions,
+            clicks=self.clicks,
+            spend=self.spend,
+            ctr=safe_div(self.clicks, self.impressions),
+            e_cpcl=safe_div(self.spend, self.clicks),
+        )
+
+class TopNAccumulator:
+    """
+    Keeps one running total per entity (not per row), so memory grows with the
+    number of distinct entities only, never with days × entities.
+    """
+
+    def __init__(self, metric: str, n: int):
+        self.metric = metric
+        self.n = n
+        self.totals: Dict[str, float] = {}
+        self.names: Dict[str, str] = {}
+
+    def add(self, rows: ReportRows) -> "TopNAccumulator":
+        if isinstance(rows, ColumnarReport):
+            page_totals = _group_sum(rows.entity_index, rows.column(self.metric), rows.num_entities)
+            for i in _present(rows.entity_index, rows.num_entities).tolist():
+                self.add_value(rows.entity_ids[i], rows.entity_names[i], float(page_totals[i]))
+            return self
+        for r in rows:
+            self.add_value(r.entity_id, r.entity_name, float(r.stats.get(self.metric, 0.0)))
+        return self
+
+    def add_value(self, entity_id: str, entity_name: str, value: float) -> None:
+        self.names[entity_id] = entity_name
+        self.totals[entity_id] = self.totals.get(entity_id, 0.0) + value
+
+    def result(self) -> List[Tuple[str, float]]:
+        ranked = heapq.nlargest(self.n, self.totals.items(), key=lambda x: x[1])
+        return [(self.names[k], v) for k, v in ranked]
+
+class DailySeriesAccumulator:
+    def __init__(self, metric: str):
+        self.metric = metric
+        self.by_day: Dict[int, float] = {}
+
+    def add(self, rows: ReportRows) -> "DailySeriesAccumulator":
+        if isinstance(rows, ColumnarReport):
+            page_totals = _group_sum(rows.day_index, rows.column(self.metric), rows.num_days)
+            days = rows.days.tolist()
+            for i in _present(rows.day_index, rows.num_days).tolist():
+                self.add_value(days[i], float(page_totals[i]))
+            return self
+        for r in rows:
+            self.add_value(epoch_day_from_iso(r.start_time), float(r.stats.get(self.metric, 0.0)))
+        return self
+
+    def add_value(self, day: int, value: float) -> None:
+        self.by_day[day] = self.by_day.get(day, 0.0) + value
+
+    def result(self) -> List[Tuple[int, float]]:
+        return sorted(self.by_day.items(), key=lambda x: x[0])
+
+class MetricsAccumulator:
+    """
+    Incremental form of compute_metrics: feed report pages to `add()` as they
+    arrive and call `result()` once the last page has been consumed.
+    """
+
+    def __init__(self, spec: MetricsSpec):
+        self.spec = spec
+        self.kpis = KpiAccumulator() if spec.kpis else None
+        self.top = {m: TopNAccumulator(m, n) for m, n in _top_limits(spec).items()}
+        self.series = {m: DailySeriesAccumulator(m) for m in spec.series}
+
+    def add(self, rows: ReportRows) -> "MetricsAccumulator":
+        if isinstance(rows, ColumnarReport):
+            for acc in self._accumulators():
+                acc.add(rows)
+            return self
+
+        kpis = self.kpis
+        top = list(self.top.values())
+        series = list(self.series.values())
+        for r in rows:
+            stats = r.stats
+            if kpis is not None:
+                kpis.add_stats(stats)
+            for t in top:
+                t.add_value(r.entity_id, r.entity_name, float(stats.get(t.metric, 0.0)))
+            if series:
+                d = epoch_day_from_iso(r.start_time)
+                for a in series:
+                    a.add_value(d, float(stats.get(a.metric, 0.0)))
+        return self
+
+    def _accumulators(self) -> List[Any]:
+        accs: List[Any] = [self.kpis] if self.kpis is not None else []
+        return accs + list(self.top.values()) + list(self.series.values())
+
+    def result(self) -> MetricsResult:
+        return MetricsResult(
+            kpi=self.kpis.result() if self.kpis is not None else None,
+            top={m: acc.result() for m, acc in self.top.items()},
+            series={m: acc.result() for m, acc in self.series.items()},
+        )
+
+@timed("metrics.compute_metrics")
+def compute_metrics(rows: ReportRows, spec: MetricsSpec) -> MetricsResult:
+    """
+    Computes every output in `spec` in one traversal of the report
+    (or one set of group-bys for a ColumnarReport).
+    """
+    return MetricsAccumulator(spec).add(rows).result()
+
+def stream_metrics(pages: Iterable[ReportRows], spec: MetricsSpec) -> MetricsResult:
+    acc = MetricsAccumulator(spec)
+    # Iterating `pages` may fetch, which is timed as its own stage.
+    elapsed = 0.0
+    for page in pages:
+        started = time.perf_counter()
+        acc.add(page)
+        elapsed += time.perf_counter() - started
+    started = time.perf_counter()
+    result = acc.result()
+    observe_stage("metrics.stream_metrics", elapsed + time.perf_counter() - started)
+    return result
+
+def _top_limits(spec: MetricsSpec) -> Dict[str, int]:
+    limits: Dict[str, int] = {}
+    for metric, n in spec.top:
+        limits[metric] = max(n, limits.get(metric, 0))
+    return limits
+
+def _aggregate_kpis_columnar(report: ColumnarReport) -> KPI:
+    imps = int(report.column("IMPRESSIONS").sum())
+    simps = int(report.column("STREAMED_IMPRESSIONS").sum())
+    clicks = int(report.column("CLICKS").sum())
+    spend = float(report.column("SPEND").sum())
+    ctr = safe_div(clicks, imps)
+    e_cpcl = safe_div(spend, clicks)
+    return KPI(impressions=imps, streamed_impressions=simps, clicks=clicks, spend=spend, ctr=ctr, e_cpcl=e_cpcl)
+
+def _group_sum(index: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    return np.bincount(index, weights=values.astype(np.float64, copy=False), minlength=size)
+
+def _present(index: np.ndarray, size: int) -> np.ndarray:
+    return np.flatnonzero(np.bincount(index, minlength=size))
+
+def _top_entities_columnar(report: ColumnarReport, metric: str, n: int) -> List[Tuple[str, float]]:
+    return _rank_entities(report, _present(report.entity_index, report.num_entities), metric, n)
+
+def _rank_entities(report: ColumnarReport, candidates: np.ndarray, metric: str, n: int) -> List[Tuple[str, float]]:
+    totals = _group_sum(report.entity_index, report.column(metric), report.num_entities)
+    # Stable sort on the negated totals keeps first-seen order for ties, like sorted(reverse=True).
+    order = candidates[np.argsort(-totals[candidates], kind="stable")][:n]
+    return [(report.entity_names[i], float(totals[i])) for i in order.tolist()]
+
+def _daily_series_columnar(report: ColumnarReport, metric: str) -> List[Tuple[int, float]]:
+    return _series_for_days(report, _present(report.day_index, report.num_days), metric)
+
+def _series_for_days(report: ColumnarReport, days: np.ndarray, metric: str) -> List[Tuple[int, float]]:
+    totals = _group_sum(report.day_index, report.column(metric), report.num_days)
+    series = list(zip(report.days[days].tolist(), totals[days].tolist()))
+    series.sort(key=lambda x: x[0])
+    return series
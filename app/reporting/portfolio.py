@@ -0,0 +1,134 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+
+from app.reporting.metrics import MetricsResult
+from app.reporting.utils import safe_div
+
+# Days at each end of the spend series compared for the trend column.
+TREND_WINDOW_DAYS = 7
+
+_SPLIT = re.compile(r"[\s,;]+")
+
+def parse_account_ids(text: str) -> List[str]:
+    """
+    Ad account IDs from free text or a CSV/TXT file body: separated by
+    whitespace, commas or semicolons; a header row and duplicates are dropped.
+    """
+    seen = {}
+    for token in _SPLIT.split(text):
+        token = token.strip().strip("\"'")
+        if token and token.lower() not in ("ad_account_id", "ad_account", "id"):
+            seen.setdefault(token, None)
+    return list(seen)
+
+@dataclass
+class AccountScan:
+    ad_account_id: str
+    metrics: Optional[MetricsResult] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def spend_change(self) -> float:
+        """
+        Relative spend change, last TREND_WINDOW_DAYS versus the first ones.
+        """
+        series = self.metrics.series.get("SPEND", []) if self.metrics else []
+        if len(series) < 2 * TREND_WINDOW_DAYS:
+            return 0.0
+        before = sum(v for _, v in series[:TREND_WINDOW_DAYS])
+        after = sum(v for _, v in series[-TREND_WINDOW_DAYS:])
+        return safe_div(after - before, before)
+
+@dataclass
+class PortfolioScan:
+    accounts: List[AccountScan]
+    elapsed_seconds: float
+    max_concurrency: int
+    peak_concurrency: int
+    max_rate: Optional[float] = None
+    failed: List[AccountScan] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Accounts fetched per second of wall time.
+        """
+        return safe_div(len(self.accounts) + len(self.failed), self.elapsed_seconds)
+
+    def ranked(self) -> List[AccountScan]:
+        # Steepest spend decline first.
+        return sorted(self.accounts, key=lambda a: a.spend_change)
+
+class _RateLimiter:
+    """
+    Spaces calls at least 1/rate seconds apart across threads.
+    """
+
+    def __init__(self, rate: Optional[float], clock: Callable[[], float], sleep: Callable[[float], None]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+def scan_portfolio(
+    account_ids: Iterable[str],
+    fetch: Callable[[str], MetricsResult],
+    *,
+    max_concurrency: int = 16,
+    max_rate: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> PortfolioScan:
+    """
+    Runs `fetch` for every account on up to `max_concurrency` threads, starting
+    at most `max_rate` fetches per second (None = unthrottled). A failing
+    account is reported in `failed` and does not stop the scan.
+    """
+    limiter = _RateLimiter(max_rate, clock, sleep)
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def run(ad_account_id: str) -> AccountScan:
+        nonlocal in_flight, peak
+        limiter.wait()
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        started = clock()
+        try:
+            return AccountScan(ad_account_id, metrics=fetch(ad_account_id), seconds=clock() - started)
+        except Exception as e:
+            return AccountScan(ad_account_id, error=f"{type(e).__name__}: {e}", seconds=clock() - started)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    started = clock()
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="portfolio-scan") as pool:
+        results = list(pool.map(run, account_ids))
+
+    return PortfolioScan(
+        accounts=[r for r in results if r.error is None],
+        failed=[r for r in results if r.error is not None],
+        elapsed_seconds=clock() - started,
+        max_concurrency=max_concurrency,
+        peak_concurrency=peak,
+        max_rate=max_rate,
+    )
@@ -0,0 +1,250 @@
+import asyncio
+import multiprocessing as mp
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.reporting.pdf import build_pdf_report
+from app.telemetry import current_tags, observe_stage
+
+class JobState(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    TIMED_OUT = "TIMED_OUT"
+    REJECTED = "REJECTED"
+
+FINAL_STATES = (JobState.DONE, JobState.FAILED, JobState.TIMED_OUT, JobState.REJECTED)
+
+class RenderError(Exception):
+    pass
+
+class RenderJob:
+    def __init__(self, kwargs: Dict[str, Any]):
+        self.kwargs = kwargs
+        self.state = JobState.QUEUED
+        self.submitted_at = time.monotonic()
+        # Telemetry tags of the submitter; render threads have none of their own.
+        self.tags = current_tags()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._result: Optional[bytes] = None
+        self._done = threading.Event()
+        self._callbacks: List[Callable[["RenderJob"], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> bytes:
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Render job still {self.state.value}")
+        if self.state != JobState.DONE:
+            raise RenderError(f"Render job {self.state.value}: {self.error}")
+        assert self._result is not None
+        return self._result
+
+    async def wait_async(self) -> bytes:
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+        self.add_done_callback(lambda _: loop.call_soon_threadsafe(_resolve, finished))
+        await finished
+        return self.result(timeout=0)
+
+    def add_done_callback(self, fn: Callable[["RenderJob"], None]) -> None:
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self, state: JobState, result: Optional[bytes] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.state = state
+            self._result = result
+            self.error = error
+            self.finished_at = time.monotonic()
+            self.kwargs = {}
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+def _worker_main(conn, target: Callable[..., bytes]) -> None:
+    while True:
+        try:
+            kwargs = conn.recv()
+        except EOFError:
+            return
+        if kwargs is None:
+            return
+        try:
+            conn.send(("ok", target(**kwargs)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    def __init__(self, ctx, target: Callable[..., bytes]):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, target), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+class RenderService:
+    """
+    Renders reports in a fixed pool of worker processes, keeping CPU-bound
+    PDF builds off the Slack listener threads.
+
+    At most `max_queue` jobs wait for a worker. `submit()` never blocks: a
+    job that finds the queue full comes back already REJECTED, for the
+    caller to report rather than wait on. A job that exceeds `job_timeout`
+    or crashes its worker only fails itself; the worker process is
+    replaced. Jobs still waiting at shutdown() are REJECTED.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 16,
+        job_timeout: float = 60.0,
+        target: Callable[..., bytes] = build_pdf_report,
+        mp_context: str = "spawn",
+    ):
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self._target = target
+        self._ctx = mp.get_context(mp_context)
+        self.max_queue = max_queue
+        self._queue: Deque[RenderJob] = deque()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._running = 0
+        self._counts = {state: 0 for state in FINAL_STATES}
+        self._latencies: Deque[float] = deque(maxlen=1024)
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run_worker, name=f"render-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, **kwargs: Any) -> RenderJob:
+        job = RenderJob(kwargs)
+        with self._ready:
+            if self._closed:
+                error = "render service is shut down"
+            elif len(self._queue) >= self.max_queue:
+                error = "render queue is full"
+            else:
+                self._queue.append(job)
+                self._ready.notify()
+                return job
+            self._counts[JobState.REJECTED] += 1
+        job._finish(JobState.REJECTED, error=error)
+        return job
+
+    def render(self, timeout: Optional[float] = None, **kwargs: Any) -> bytes:
+        return self.submit(**kwargs).result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counts = {state.value.lower(): n for state, n in self._counts.items()}
+            running = self._running
+            waiting = len(self._queue)
+
+        def pct(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            "workers": self.workers,
+            "queue_depth": waiting,
+            "queue_capacity": self.max_queue,
+            "running": running,
+            **counts,
+            "latency_p50_ms": round(pct(0.50) * 1000, 1),
+            "latency_p95_ms": round(pct(0.95) * 1000, 1),
+            "latency_max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        """
+        Lets running jobs finish (up to `job_timeout`) and rejects waiting ones.
+        """
+        with self._ready:
+            self._closed = True
+            waiting = list(self._queue)
+            self._queue.clear()
+            self._counts[JobState.REJECTED] += len(waiting)
+            self._ready.notify_all()
+        for job in waiting:
+            job._finish(JobState.REJECTED, error="render service is shut down")
+        for t in self._threads:
+            t.join(timeout=self.job_timeout)
+
+    def _next_job(self) -> Optional[RenderJob]:
+        with self._ready:
+            while not self._queue and not self._closed:
+                self._ready.wait()
+            if self._closed:
+                return None
+            self._running += 1
+            return self._queue.popleft()
+
+    def _run_worker(self) -> None:
+        worker = _Worker(self._ctx, self._target)
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                job.state = JobState.RUNNING
+                job.started_at = time.monotonic()
+                observe_stage("render_queue", job.started_at - job.submitted_at, job.tags)
+                state, result, error = JobState.FAILED, None, None
+                try:
+                    worker.conn.send(job.kwargs)
+                    if worker.conn.poll(self.job_timeout):
+                        status, payload = worker.conn.recv()
+                        if status == "ok":
+                            state, result = JobState.DONE, payload
+                            # The worker process's own spans are not collected.
+                            observe_stage("build_pdf_report", time.monotonic() - job.started_at, job.tags)
+                        else:
+                            error = payload
+                    else:
+                        state, error = JobState.TIMED_OUT, f"exceeded {self.job_timeout:.0f}s"
+                        worker.kill()
+                        worker = _Worker(self._ctx, self._target)
+                except (EOFError, OSError):
+                    worker.kill()
+                    error = f"worker process exited (code {worker.process.exitcode})"
+                    worker = _Worker(self._ctx, self._target)
+                with self._lock:
+                    self._running -= 1
+                    self._counts[state] += 1
+                    self._latencies.append(time.monotonic() - job.submitted_at)
+                job._finish(state, result, error)
+        finally:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.kill()
@@ -0,0 +1,184 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.reporting.portfolio import PortfolioScan
+
+# Entities whose combined share of spend is the concentration signal.
+TOP_ENTITIES = 3
+
+SIGNALS = ("spend_decline", "ctr_drop", "e_cpcl_rise", "concentration")
+
+SIGNAL_LABELS = {
+    "spend_decline": "spend declining",
+    "ctr_drop": "CTR below baseline",
+    "e_cpcl_rise": "E-CPCL rising",
+    "concentration": "spend concentrated in few entities",
+}
+
+@dataclass(frozen=True)
+class RiskModel:
+    """
+    CTR and E-CPCL compare the last `recent_days` with the `baseline_days`
+    before them; spend decline is the least-squares slope over the whole
+    window. Each signal is scaled to [0, 1] by its `*_full` value (the level that
+    counts as maximal risk) and the score is the weighted sum, out of 100.
+    """
+    recent_days: int = 7
+    baseline_days: int = 14
+    spend_decline_full: float = 0.5
+    ctr_drop_full: float = 0.5
+    e_cpcl_rise_full: float = 1.0
+    concentration_floor: float = 0.5
+    weights: Dict[str, float] = field(default_factory=lambda: {
+        "spend_decline": 0.4,
+        "ctr_drop": 0.25,
+        "e_cpcl_rise": 0.2,
+        "concentration": 0.15,
+    })
+
+DEFAULT_MODEL = RiskModel()
+
+@dataclass
+class DailyMatrix:
+    """
+    (account × day) matrices of daily totals, one row per account and one
+    column per epoch day in `days`; `concentration` is the share of
+    each account's spend in its top entities (NaN when unknown).
+    """
+    account_ids: List[str]
+    days: List[int]
+    spend: np.ndarray
+    impressions: np.ndarray
+    clicks: np.ndarray
+    concentration: np.ndarray
+
+    @classmethod
+    def from_scan(cls, scan: PortfolioScan) -> "DailyMatrix":
+        accounts = [a for a in scan.accounts if a.metrics is not None]
+        days = sorted({d for a in accounts for series in a.metrics.series.values() for d, _ in series})
+        col = {d: j for j, d in enumerate(days)}
+        shape = (len(accounts), len(days))
+        mats = {name: np.zeros(shape) for name in ("SPEND", "IMPRESSIONS", "CLICKS")}
+        concentration = np.full(len(accounts), np.nan)
+        for i, a in enumerate(accounts):
+            for name, mat in mats.items():
+                for d, v in a.metrics.series.get(name, ()):
+                    mat[i, col[d]] = v
+            top = a.metrics.top.get("SPEND")
+            if top and a.metrics.kpi and a.metrics.kpi.spend > 0:
+                concentration[i] = sum(v for _, v in top) / a.metrics.kpi.spend
+        return cls(
+            account_ids=[a.ad_account_id for a in accounts],
+            days=days,
+            spend=mats["SPEND"],
+            impressions=mats["IMPRESSIONS"],
+            clicks=mats["CLICKS"],
+            concentration=concentration,
+        )
+
+@dataclass
+class RiskScores:
+    account_ids: List[str]
+    score: np.ndarray
+    signals: Dict[str, np.ndarray]
+
+@dataclass
+class RiskCandidate:
+    """
+    `signals` are the scaled [0, 1] values; `suggested_case` holds the fields
+    to prefill when opening a churn case for the account.
+    """
+    ad_account_id: str
+    score: float
+    signals: Dict[str, float]
+    reasons: List[str]
+    suggested_case: Dict[str, Any]
+
+def _ratio(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b > 0, a / np.where(b > 0, b, 1.0), np.nan)
+
+def spend_slope(spend: np.ndarray) -> np.ndarray:
+    """
+    Least-squares daily slope of each row, relative to the row mean.
+    """
+    n = spend.shape[1]
+    if n < 2:
+        return np.zeros(spend.shape[0])
+    t = np.arange(n, dtype=np.float64) - (n - 1) / 2.0
+    denom = float(t @ t) or 1.0
+    slope = (spend - spend.mean(axis=1, keepdims=True)) @ t / denom
+    return _ratio(slope, spend.mean(axis=1))
+
+def score_matrix(matrix: DailyMatrix, model: RiskModel = DEFAULT_MODEL) -> RiskScores:
+    """
+    Scores every account at once. Windows shorter than recent + baseline are
+    split in half rather than rejected.
+    """
+    window = matrix.spend.shape[1]
+    r = min(model.recent_days, window // 2)
+    b = min(model.baseline_days, window - r)
+    recent, base = slice(window - r, window), slice(window - r - b, window - r)
+
+    def total(m: np.ndarray, s: slice) -> np.ndarray:
+        return m[:, s].sum(axis=1)
+
+    ctr_recent = _ratio(total(matrix.clicks, recent), total(matrix.impressions, recent))
+    ctr_base = _ratio(total(matrix.clicks, base), total(matrix.impressions, base))
+    cpcl_recent = _ratio(total(matrix.spend, recent), total(matrix.clicks, recent))
+    cpcl_base = _ratio(total(matrix.spend, base), total(matrix.clicks, base))
+
+    raw = {
+        # Relative change in spend across the whole window implied by the slope.
+        "spend_decline": -spend_slope(matrix.spend) * window,
+        "ctr_drop": 1.0 - _ratio(ctr_recent, ctr_base),
+        "e_cpcl_rise": _ratio(cpcl_recent, cpcl_base) - 1.0,
+        "concentration": matrix.concentration - model.concentration_floor,
+    }
+    full = {
+        "spend_decline": model.spend_decline_full,
+        "ctr_drop": model.ctr_drop_full,
+        "e_cpcl_rise": model.e_cpcl_rise_full,
+        "concentration": 1.0 - model.concentration_floor,
+    }
+    signals = {name: np.clip(np.nan_to_num(raw[name] / full[name]), 0.0, 1.0) for name in SIGNALS}
+    score = 100.0 * sum(model.weights[name] * signals[name] for name in SIGNALS)
+    return RiskScores(account_ids=matrix.account_ids, score=score, signals=signals)
+
+def rank_candidates(
+    scores: RiskScores,
+    limit: Optional[int] = None,
+    min_score: float = 0.0,
+    days_back: int = 30,
+    account_names: Optional[Dict[str, str]] = None,
+) -> List[RiskCandidate]:
+    order = np.argsort(-scores.score, kind="stable")
+    order = order[scores.score[order] >= min_score][:limit]
+    candidates: List[RiskCandidate] = []
+    for i in order.tolist():
+        signals = {name: float(scores.signals[name][i]) for name in SIGNALS}
+        reasons = [SIGNAL_LABELS[n] for n in sorted(signals, key=signals.get, reverse=True) if signals[n] >= 0.2]
+        ad_account_id = scores.account_ids[i]
+        candidates.append(RiskCandidate(
+            ad_account_id=ad_account_id,
+            score=round(float(scores.score[i]), 1),
+            signals=signals,
+            reasons=reasons,
+            suggested_case={
+                "ad_account_id": ad_account_id,
+                "account_name": (account_names or {}).get(ad_account_id, ""),
+                "days_back": days_back,
+                "reason": ", ".join(reasons) or "low risk",
+            },
+        ))
+    return candidates
+
+def score_portfolio(scan: PortfolioScan, model: RiskModel = DEFAULT_MODEL, limit: Optional[int] = None) -> List[RiskCandidate]:
+    """
+    Ranked candidates for the successful accounts of a portfolio scan, highest
+    risk first.
+    """
+    matrix = DailyMatrix.from_scan(scan)
+    return rank_candidates(score_matrix(matrix, model), limit=limit, days_back=max(len(matrix.days), 1))
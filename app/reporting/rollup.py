@@ -0,0 +1,238 @@
+import datetime as dt
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.reporting.ads_client import ColumnarReport
+from app.reporting.metrics import KPI, ReportRows, _group_sum, _present
+from app.reporting.utils import date_from_epoch_day, epoch_day, epoch_day_from_iso, safe_div
+
+ROLLUP_FIELDS = ("IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND")
+_IMPS, _SIMPS, _CLICKS, _SPEND, _HAVE = range(5)
+
+@dataclass
+class PeriodComparison:
+    current: KPI
+    previous: KPI
+    # Whether the rollup had data for every day of the previous period.
+    previous_complete: bool = True
+
+    def change(self, field: str) -> float:
+        """
+        Relative change of a KPI field versus the previous period (0 when the
+        previous value is 0).
+        """
+        before = getattr(self.previous, field)
+        return safe_div(getattr(self.current, field) - before, before)
+
+class DailyRollup:
+    """
+    Cumulative daily totals of ROLLUP_FIELDS for one account: row k of the
+    prefix-sum matrix holds the totals of the first k days, so any range is
+    two row lookups. An extra column counts the days that have data, which
+    makes `covers()` O(1) too.
+
+    Days are keyed by epoch day internally; the query methods take dates.
+    Days are set, not added: ingesting a day again replaces its totals.
+    Appending a new day is O(1) amortized; replacing an older day updates the
+    rows after it.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.start_day: Optional[int] = None
+        self.updated_at = 0.0
+        self._clock = clock
+        self._cum = np.zeros((33, len(ROLLUP_FIELDS) + 1))
+        self._days = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._days
+
+    @property
+    def start(self) -> Optional[dt.date]:
+        return date_from_epoch_day(self.start_day) if self._days else None
+
+    @property
+    def end(self) -> Optional[dt.date]:
+        return date_from_epoch_day(self.start_day + self._days - 1) if self._days else None
+
+    def set_days(self, totals: Dict[int, np.ndarray]) -> None:
+        """
+        Sets the ROLLUP_FIELDS totals of each given epoch day.
+        """
+        if not totals:
+            return
+        with self._lock:
+            for day in sorted(totals):
+                self._set_day(day, totals[day])
+            self.updated_at = self._clock()
+
+    def _set_day(self, day: int, values: np.ndarray) -> None:
+        if self.start_day is None:
+            self.start_day = day
+        i = day - self.start_day
+        if i < 0:
+            self._prepend(-i)
+            i = 0
+        if i >= self._days:
+            self._extend(i + 1)
+        row = np.append(values, 1.0)
+        delta = row - (self._cum[i + 1] - self._cum[i])
+        self._cum[i + 1 : self._days + 1] += delta
+
+    def _extend(self, days: int) -> None:
+        if days + 1 > len(self._cum):
+            grown = np.zeros((max(days + 1, 2 * len(self._cum)), self._cum.shape[1]))
+            grown[: self._days + 1] = self._cum[: self._days + 1]
+            self._cum = grown
+        # Gap days carry the running total forward.
+        self._cum[self._days + 1 : days + 1] = self._cum[self._days]
+        self._days = days
+
+    def _prepend(self, days: int) -> None:
+        grown = np.zeros((max(self._days + days + 1, len(self._cum)), self._cum.shape[1]))
+        grown[days + 1 : days + self._days + 1] = self._cum[1 : self._days + 1]
+        self._cum = grown
+        self._days += days
+        self.start_day -= days
+
+    def _bounds(self, start_date: dt.date, end_date: dt.date) -> Tuple[int, int]:
+        if self.start_day is None:
+            return 0, 0
+        i = max(0, epoch_day(start_date) - self.start_day)
+        j = min(self._days, epoch_day(end_date) - self.start_day + 1)
+        return i, max(i, j)
+
+    def totals(self, start_date: dt.date, end_date: dt.date) -> np.ndarray:
+        """
+        ROLLUP_FIELDS totals over [start_date, end_date]; days outside the
+        rollup count as zero.
+        """
+        with self._lock:
+            i, j = self._bounds(start_date, end_date)
+            return (self._cum[j] - self._cum[i])[:_HAVE]
+
+    def covers(self, start_date: dt.date, end_date: dt.date) -> bool:
+        with self._lock:
+            i, j = self._bounds(start_date, end_date)
+            return self._cum[j, _HAVE] - self._cum[i, _HAVE] == (end_date - start_date).days + 1
+
+    def kpi(self, start_date: dt.date, end_date: dt.date) -> KPI:
+        """
+        KPIs over [start_date, end_date]. Raises ValueError unless the rollup
+        covers the range, since a missing day would count as zero.
+        """
+        with self._lock:
+            i, j = self._bounds(start_date, end_date)
+            if self._cum[j, _HAVE] - self._cum[i, _HAVE] != (end_date - start_date).days + 1:
+                raise ValueError(f"Rollup does not cover {start_date} → {end_date}")
+            return _kpi((self._cum[j] - self._cum[i])[:_HAVE])
+
+    def compare(self, start_date: dt.date, end_date: dt.date) -> PeriodComparison:
+        """
+        KPIs for the range and for the equally long period right before it.
+        Raises ValueError unless the range is covered; the previous period may
+        be partial, see `previous_complete`.
+        """
+        length = dt.timedelta(days=(end_date - start_date).days + 1)
+        return PeriodComparison(
+            current=self.kpi(start_date, end_date),
+            previous=_kpi(self.totals(start_date - length, end_date - length)),
+            previous_complete=self.covers(start_date - length, end_date - length),
+        )
+
+    def series(self, metric: str, start_date: dt.date, end_date: dt.date) -> List[Tuple[int, float]]:
+        """
+        (epoch day, value) pairs, like MetricsResult.series.
+        """
+        col = ROLLUP_FIELDS.index(metric)
+        with self._lock:
+            i, j = self._bounds(start_date, end_date)
+            daily = np.diff(self._cum[i : j + 1, col])
+            first = (self.start_day or 0) + i
+        return [(first + k, float(v)) for k, v in enumerate(daily.tolist())]
+
+    def tap(
+        self,
+        pages: Iterable[ReportRows],
+        start_date: Optional[dt.date] = None,
+        end_date: Optional[dt.date] = None,
+    ) -> Iterator[ReportRows]:
+        """
+        Passes report pages through unchanged and, once the stream is
+        exhausted, sets the totals of every day it contained. A day can span
+        pages, so nothing is written for a stream that stops early. Given the
+        report's range, days in it without rows are set to zero, so the range
+        counts as covered.
+        """
+        totals: Dict[int, np.ndarray] = {}
+        for page in pages:
+            _add_day_totals(totals, page)
+            yield page
+        if start_date is not None and end_date is not None:
+            for day in range(epoch_day(start_date), epoch_day(end_date) + 1):
+                totals.setdefault(day, np.zeros(len(ROLLUP_FIELDS)))
+        self.set_days(totals)
+
+def _kpi(t: np.ndarray) -> KPI:
+    imps, clicks, spend = int(round(t[_IMPS])), int(round(t[_CLICKS])), float(t[_SPEND])
+    return KPI(
+        impressions=imps,
+        streamed_impressions=int(round(t[_SIMPS])),
+        clicks=clicks,
+        spend=spend,
+        ctr=safe_div(clicks, imps),
+        e_cpcl=safe_div(spend, clicks),
+    )
+
+def _add_day_totals(totals: Dict[int, np.ndarray], rows: ReportRows) -> None:
+    if isinstance(rows, ColumnarReport):
+        page = np.stack([_group_sum(rows.day_index, rows.column(f), rows.num_days) for f in ROLLUP_FIELDS], axis=1)
+        days = rows.days.tolist()
+        for i in _present(rows.day_index, rows.num_days).tolist():
+            day = days[i]
+            totals[day] = totals[day] + page[i] if day in totals else page[i]
+        return
+    for r in rows:
+        day = epoch_day_from_iso(r.start_time)
+        values = np.array([float(r.stats.get(f, 0.0)) for f in ROLLUP_FIELDS])
+        totals[day] = totals[day] + values if day in totals else values
+
+class RollupStore:
+    """
+    One DailyRollup per (ad_account_id, entity_type), evicted least-recently-used
+    beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 256, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._rollups: "OrderedDict[Tuple[str, str], DailyRollup]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ad_account_id: str, entity_type: str) -> DailyRollup:
+        key = (ad_account_id, entity_type)
+        with self._lock:
+            rollup = self._rollups.get(key)
+            if rollup is None:
+                rollup = self._rollups[key] = DailyRollup(clock=self._clock)
+                while len(self._rollups) > self.max_entries:
+                    self._rollups.popitem(last=False)
+            self._rollups.move_to_end(key)
+            return rollup
+
+    def invalidate(self, ad_account_id: Optional[str] = None) -> None:
+        with self._lock:
+            if ad_account_id is None:
+                self._rollups.clear()
+                return
+            for key in [k for k in self._rollups if k[0] == ad_account_id]:
+                del self._rollups[key]
+
+    def __len__(self) -> int:
+        return len(self._rollups)
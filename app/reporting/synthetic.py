@@ -0,0 +1,149 @@
+import datetime as dt
+import hashlib
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.reporting.ads_client import ColumnarReport
+from app.reporting.utils import EPOCH_ORDINAL, iso_utc_start_of_day
+
+DEFAULT_ENTITY_COUNTS = {"CAMPAIGN": 6, "AD_SET": 10, "AD": 20, "AD_ACCOUNT": 1}
+
+_ENTITY_NAMESPACE = uuid.UUID("5b0c7f53-3f0e-4a53-9a57-2d1c0b8f9e61")
+
+# Independent noise streams, so adding a field never shifts the values of another.
+_DAY_NOISE, _ENT_FACTOR, _CTR, _CPM, _COMPLETES = range(5)
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+class SyntheticAdsGenerator:
+    """
+    Deterministic, vectorized mock Ads data. Every cell is a pure function of
+    (seed, ad_account_id, entity_type, day, entity), so entity IDs are stable
+    across calls and overlapping date ranges return identical values.
+    """
+
+    def __init__(self, seed: int = 0, entity_counts: Optional[Dict[str, int]] = None):
+        self.seed = seed
+        self.entity_counts = {**DEFAULT_ENTITY_COUNTS, **(entity_counts or {})}
+
+    def _key(self, *parts: str) -> int:
+        digest = hashlib.blake2b(":".join((str(self.seed),) + parts).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def _uniform(self, key: int, days: np.ndarray, ents: np.ndarray, stream: int, lo: float, hi: float) -> np.ndarray:
+        counter = (days.astype(np.uint64) << np.uint64(32)) | (ents.astype(np.uint64) << np.uint64(4)) | np.uint64(stream)
+        bits = _splitmix64(counter ^ np.uint64(key))
+        u = (bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+        return lo + (hi - lo) * u
+
+    def entity_count(self, entity_type: str) -> int:
+        return self.entity_counts.get(entity_type, 6)
+
+    def entities(self, ad_account_id: str, entity_type: str, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, str]]:
+        count = self.entity_count(entity_type) if stop is None else stop
+        label = entity_type.title().replace("_", " ")
+        return [
+            {
+                "id": str(uuid.uuid5(_ENTITY_NAMESPACE, f"{self.seed}:{ad_account_id}:{entity_type}:{i}")),
+                "name": f"{label} {i+1}",
+                "status": "ACTIVE" if i % 7 != 0 else "PAUSED",
+            }
+            for i in range(start, count)
+        ]
+
+    def generate(
+        self,
+        ad_account_id: str,
+        entity_type: str,
+        fields: List[str],
+        start_date: dt.date,
+        end_date: dt.date,
+        granularity: str = "DAY",
+        include_parent_entity: bool = False,
+        entity_offset: int = 0,
+        entity_limit: Optional[int] = None,
+    ) -> ColumnarReport:
+        count = self.entity_count(entity_type)
+        stop = count if entity_limit is None else min(count, entity_offset + entity_limit)
+        ent = np.arange(entity_offset, stop, dtype=np.int64)
+        day = np.arange(start_date.toordinal(), end_date.toordinal() + 1, dtype=np.int64)
+        num_days, num_ents = len(day), len(ent)
+
+        key = self._key(ad_account_id, entity_type)
+        params = np.random.default_rng(key).random(4)
+        base_imps_per_day = 250_000 + int(params[0] * 650_000)
+        base_ctr = 0.002 + 0.010 * params[1]
+        base_cpm = 6.0 + 12.0 * params[2]
+        streamed_share = 0.65 + 0.30 * params[3]
+
+        weights = 1.0 / (np.arange(count) + 1.0) ** 1.15
+        weights = weights / weights.sum()
+
+        d = day[:, None]
+        e = ent[None, :]
+        trend = 1.0 + 0.15 * np.sin(day / 6.0)
+        noise = self._uniform(key, day, np.zeros_like(day), _DAY_NOISE, 0.85, 1.15)
+        day_imps = np.floor(base_imps_per_day * trend * noise)
+
+        ent_factor = weights[ent][None, :] * self._uniform(key, d, e, _ENT_FACTOR, 0.7, 1.3)
+        imps = np.maximum(0.0, np.floor(day_imps[:, None] * ent_factor))
+        streamed_imps = np.floor(imps * streamed_share)
+        ctr_draw = np.clip(base_ctr * self._uniform(key, d, e, _CTR, 0.7, 1.4), 0.0005, 0.03)
+        clicks = np.floor(imps * ctr_draw)
+        cpm_draw = np.clip(base_cpm * self._uniform(key, d, e, _CPM, 0.75, 1.35), 2.0, 40.0)
+        spend = (imps / 1000.0) * cpm_draw
+        completes = np.floor(streamed_imps * self._uniform(key, d, e, _COMPLETES, 0.12, 0.45))
+
+        def ratio(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            return np.divide(a, b, out=np.zeros_like(a), where=b != 0)
+
+        values = {
+            "IMPRESSIONS": imps.astype(np.int64),
+            "STREAMED_IMPRESSIONS": streamed_imps.astype(np.int64),
+            "CLICKS": clicks.astype(np.int64),
+            "SPEND": spend,
+            "CTR": ratio(clicks, imps),
+            "COMPLETES": completes.astype(np.int64),
+            "COMPLETION_RATE": ratio(completes, streamed_imps),
+            "E_CPCL": ratio(spend, clicks),
+        }
+        size = num_days * num_ents
+        stats = {
+            f: values[f].reshape(size) if f in values else np.zeros(size, dtype=np.float64)
+            for f in fields
+        }
+
+        selected = self.entities(ad_account_id, entity_type, entity_offset, stop)
+        parents = None
+        if include_parent_entity and entity_type in ("AD", "AD_SET"):
+            parents = [
+                {
+                    "entity_type": "CAMPAIGN",
+                    "entity_id": str(uuid.uuid5(_ENTITY_NAMESPACE, f"{self.seed}:{ad_account_id}:CAMPAIGN:{i % 6}")),
+                    "entity_name": f"Campaign {i % 6 + 1}",
+                }
+                for i in ent.tolist()
+            ]
+
+        return ColumnarReport(
+            report_start=iso_utc_start_of_day(start_date),
+            report_end=iso_utc_start_of_day(end_date),
+            granularity=granularity,
+            entity_type=entity_type,
+            entity_ids=[x["id"] for x in selected],
+            entity_names=[x["name"] for x in selected],
+            entity_statuses=[x["status"] for x in selected],
+            days=(day - EPOCH_ORDINAL).astype(np.int32),
+            entity_index=np.tile(np.arange(num_ents, dtype=np.int32), num_days),
+            day_index=np.repeat(np.arange(num_days, dtype=np.int32), num_ents),
+            stats=stats,
+            parent_entities=parents,
+            continuation_token=None,
+            warnings=[],
+        )
@@ -0,0 +1,91 @@
+import copy
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+# Bump whenever the rendered layout or static text changes.
+TEMPLATE_VERSION = "1"
+
+DEFAULT_TITLE = "Spotify Advertising — Account Value Overview"
+
+KPI_HEADER = ["Impressions", "Streamed Impressions", "Clicks", "CTR", "Spend", "E-CPCL"]
+ENTITY_COL_WIDTHS = [11 * cm, 4 * cm]
+
+APPENDIX_TEXT = (
+    "This report was generated from aggregated metrics using a mocked Ads API response for demonstration. "
+    "In production: pagination, deterministic inputs, data quality checks, and auditable/signed report artifacts."
+)
+CONCENTRATION_NOTE = (
+    "Concentration is high across top entities — optimizing allocation can preserve outcomes while improving efficiency."
+)
+
+_HEADINGS = {
+    "summary": "Executive Summary",
+    "key_metrics": "Key Metrics",
+    "top_spend": "Top Entities (Spend)",
+    "top_imps": "Top Entities (Impressions)",
+    "trends": "Trends",
+    "appendix": "Appendix: Notes",
+}
+
+class ReportTemplate:
+    """
+    Styles and static flowables for the report, built once per process.
+
+    Static paragraphs are parsed once and handed out as shallow copies, so each
+    document gets its own layout state while sharing the parsed markup.
+    """
+
+    def __init__(self):
+        self.styles = getSampleStyleSheet()
+        self.table_style = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#E8E8E8")),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("PADDING", (0, 0), (-1, -1), 6),
+        ])
+        self._static: Dict[str, Paragraph] = {
+            key: Paragraph(text, self.styles["Heading2"]) for key, text in _HEADINGS.items()
+        }
+        self._static["appendix_text"] = Paragraph(APPENDIX_TEXT, self.styles["BodyText"])
+        self._static["default_title"] = Paragraph(DEFAULT_TITLE, self.styles["Title"])
+        self._titles: Dict[str, Paragraph] = {}
+        self._lock = threading.Lock()
+
+    def static(self, key: str) -> Paragraph:
+        return copy.copy(self._static[key])
+
+    def title(self, text: Optional[str]) -> Paragraph:
+        if not text:
+            return self.static("default_title")
+        para = self._titles.get(text)
+        if para is None:
+            with self._lock:
+                para = self._titles.setdefault(text, Paragraph(text, self.styles["Title"]))
+        return copy.copy(para)
+
+    def paragraph(self, text: str, style: str = "Normal") -> Paragraph:
+        return Paragraph(text, self.styles[style])
+
+    def table(self, rows: List[List[Any]], col_widths: Optional[Sequence[float]] = None) -> Table:
+        t = Table(rows, hAlign="LEFT", colWidths=col_widths)
+        t.setStyle(self.table_style)
+        return t
+
+    def spacer(self, height: float) -> Spacer:
+        return Spacer(1, height)
+
+_template: Optional[ReportTemplate] = None
+_template_lock = threading.Lock()
+
+def get_report_template() -> ReportTemplate:
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = ReportTemplate()
+    return _template
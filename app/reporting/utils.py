@@ -1,16 +1,30 @@
 import datetime as dt
-from typing import List
+from functools import lru_cache
+
+# Days are carried internally as integer days since 1970-01-01 (UTC); ISO
+# strings and date objects only appear at the API and rendering edges.
+EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
 
 def iso_utc_start_of_day(d: dt.date) -> str:
     return f"{d.isoformat()}T00:00:00Z"
 
-def daterange(start: dt.date, end_inclusive: dt.date) -> List[dt.date]:
-    days = []
-    cur = start
-    while cur <= end_inclusive:
-        days.append(cur)
-        cur += dt.timedelta(days=1)
-    return days
+def epoch_day(d: dt.date) -> int:
+    return d.toordinal() - EPOCH_ORDINAL
+
+def date_from_epoch_day(day: int) -> dt.date:
+    return dt.date.fromordinal(int(day) + EPOCH_ORDINAL)
+
+@lru_cache(maxsize=4096)
+def epoch_day_from_iso(timestamp: str) -> int:
+    """
+    Epoch day of an ISO date or `YYYY-MM-DDT...` timestamp (time ignored).
+    Reports repeat the same few start times, so results are memoized.
+    """
+    return dt.date(int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10])).toordinal() - EPOCH_ORDINAL
+
+@lru_cache(maxsize=4096)
+def iso_utc_from_epoch_day(day: int) -> str:
+    return iso_utc_start_of_day(date_from_epoch_day(day))
 
 def safe_div(a: float, b: float) -> float:
     return a / b if b else 0.0
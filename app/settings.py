@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,9 +9,53 @@ load_dotenv()
 class Settings:
     slack_bot_token: str
     slack_signing_secret: str
+    ads_mock_seed: Optional[int] = None
+    ads_mock_latency_ms: float = 0.0
+    report_cache_ttl_seconds: float = 24 * 3600
+    report_cache_max_entries: int = 256
+    history_dir: str = ""
+    artifact_cache_dir: str = ""
+    artifact_cache_max_mb: float = 256.0
+    pdf_chart_backend: str = "reportlab"
+    pdf_render_workers: int = 0
+    pdf_render_queue: int = 16
+    pdf_render_timeout_seconds: float = 60.0
+    pdf_stream_uploads: bool = False
+    reporting_warm_up: bool = False
+    slack_async: bool = False
+    case_store: str = "memory"
+    case_db_path: str = "cases.db"
+    panel_update_window_seconds: float = 1.0
+    slack_max_in_flight: int = 8
+    slack_max_retries: int = 3
+    scan_max_concurrency: int = 16
+    scan_max_accounts_per_second: float = 0.0
+    scan_max_accounts: int = 1000
 
 def get_settings() -> Settings:
     return Settings(
         slack_bot_token=os.environ.get("SLACK_BOT_TOKEN", ""),
         slack_signing_secret=os.environ.get("SLACK_SIGNING_SECRET", ""),
+        ads_mock_seed=int(os.environ["ADS_MOCK_SEED"]) if os.environ.get("ADS_MOCK_SEED") else None,
+        ads_mock_latency_ms=float(os.environ.get("ADS_MOCK_LATENCY_MS", 0)),
+        report_cache_ttl_seconds=float(os.environ.get("REPORT_CACHE_TTL_SECONDS", 24 * 3600)),
+        report_cache_max_entries=int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", 256)),
+        history_dir=os.environ.get("HISTORY_DIR", ""),
+        artifact_cache_dir=os.environ.get("ARTIFACT_CACHE_DIR", ""),
+        artifact_cache_max_mb=float(os.environ.get("ARTIFACT_CACHE_MAX_MB", 256)),
+        pdf_chart_backend=os.environ.get("PDF_CHART_BACKEND", "reportlab"),
+        pdf_render_workers=int(os.environ.get("PDF_RENDER_WORKERS", 0)),
+        pdf_render_queue=int(os.environ.get("PDF_RENDER_QUEUE", 16)),
+        pdf_render_timeout_seconds=float(os.environ.get("PDF_RENDER_TIMEOUT_SECONDS", 60)),
+        pdf_stream_uploads=os.environ.get("PDF_STREAM_UPLOADS", "").lower() in ("1", "true", "yes"),
+        reporting_warm_up=os.environ.get("REPORTING_WARM_UP", "").lower() in ("1", "true", "yes"),
+        slack_async=os.environ.get("SLACK_ASYNC", "").lower() in ("1", "true", "yes"),
+        case_store=os.environ.get("CASE_STORE", "memory"),
+        case_db_path=os.environ.get("CASE_DB_PATH", "cases.db"),
+        panel_update_window_seconds=float(os.environ.get("PANEL_UPDATE_WINDOW_SECONDS", 1.0)),
+        slack_max_in_flight=int(os.environ.get("SLACK_MAX_IN_FLIGHT", 8)),
+        slack_max_retries=int(os.environ.get("SLACK_MAX_RETRIES", 3)),
+        scan_max_concurrency=int(os.environ.get("SCAN_MAX_CONCURRENCY", 16)),
+        scan_max_accounts_per_second=float(os.environ.get("SCAN_MAX_ACCOUNTS_PER_SECOND", 0)),
+        scan_max_accounts=int(os.environ.get("SCAN_MAX_ACCOUNTS", 1000)),
     )
@@ -5,14 +5,34 @@ from slack_bolt import App as SlackApp
 from slack_bolt.adapter.fastapi import SlackRequestHandler
 
 from app.settings import get_settings
+from app.slack.scheduler import OutboundScheduler, ScheduledWebClient
+from app.telemetry import ListenerExecutor, bolt_tags, set_tags
 
 settings = get_settings()
 
+scheduler = OutboundScheduler(
+    max_in_flight=settings.slack_max_in_flight,
+    max_retries=settings.slack_max_retries,
+)
+
 slack_app = SlackApp(
-    token=settings.slack_bot_token,
+    client=ScheduledWebClient(token=settings.slack_bot_token, scheduler=scheduler),
     signing_secret=settings.slack_signing_secret,
+    listener_executor=ListenerExecutor(max_workers=5),
 )
 
+@slack_app.middleware
+def tag_request(body, next):
+    # Listeners run on ListenerExecutor, which carries these tags over.
+    set_tags(*bolt_tags(body))
+    next()
+
+@slack_app.middleware
+def schedule_outbound_calls(context, next):
+    # Bolt builds a plain WebClient per request; route it through the scheduler.
+    context["client"] = ScheduledWebClient.like(context.client, scheduler)
+    next()
+
 handler = SlackRequestHandler(slack_app)
 
 from app.slack import commands 
@@ -0,0 +1,69 @@
+from typing import Any
+
+from slack_bolt.adapter.fastapi.async_handler import AsyncSlackRequestHandler
+from slack_bolt.async_app import AsyncApp
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+
+from app.settings import get_settings
+from app.slack.scheduler import AsyncOutboundScheduler
+from app.telemetry import bolt_tags, set_tags, slack_api_span
+
+settings = get_settings()
+
+scheduler = AsyncOutboundScheduler(
+    max_in_flight=settings.slack_max_in_flight,
+    max_retries=settings.slack_max_retries,
+)
+
+class ScheduledAsyncWebClient(AsyncWebClient):
+    """
+    AsyncWebClient whose API calls are admitted by an AsyncOutboundScheduler
+    and timed into the Slack API histogram.
+    """
+
+    def __init__(self, *args: Any, scheduler: AsyncOutboundScheduler, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+
+    async def api_call(self, api_method: str, **kwargs: Any) -> AsyncSlackResponse:
+        with slack_api_span(api_method):
+            return await self.scheduler.call_async(
+                api_method, lambda: super(ScheduledAsyncWebClient, self).api_call(api_method, **kwargs)
+            )
+
+    @classmethod
+    def like(cls, client: AsyncWebClient, scheduler: AsyncOutboundScheduler) -> "ScheduledAsyncWebClient":
+        """
+        Copy of a (per-request) Bolt client that goes through `scheduler`.
+        """
+        return cls(
+            token=client.token,
+            base_url=client.base_url,
+            timeout=client.timeout,
+            ssl=client.ssl,
+            proxy=client.proxy,
+            session=client.session,
+            trust_env_in_session=client.trust_env_in_session,
+            headers=client.headers,
+            team_id=client.default_params.get("team_id"),
+            logger=client.logger,
+            retry_handlers=client.retry_handlers.copy() if client.retry_handlers is not None else None,
+            scheduler=scheduler,
+        )
+
+async_slack_app = AsyncApp(
+    client=ScheduledAsyncWebClient(token=settings.slack_bot_token, scheduler=scheduler),
+    signing_secret=settings.slack_signing_secret,
+)
+
+@async_slack_app.middleware
+async def instrument_request(body, context, next):
+    # Listener tasks are created later in this dispatch and inherit the tags.
+    set_tags(*bolt_tags(body))
+    context["client"] = ScheduledAsyncWebClient.like(context.client, scheduler)
+    await next()
+
+async_handler = AsyncSlackRequestHandler(async_slack_app)
+
+from app.slack import async_listeners
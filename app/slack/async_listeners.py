@@ -0,0 +1,210 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Coroutine, Dict, List, Optional, Set
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from app.settings import get_settings
+from app.slack.async_app import async_slack_app
+from app.slack.async_ui import post_to_case_thread, upsert_case_panel
+from app.slack.blocks import (
+    offer_modal_view,
+    portfolio_scan_text,
+    read_offer_form,
+    read_start_case_form,
+    start_case_modal_view,
+    start_case_root_text,
+)
+from app.slack.reporting import (
+    SCAN_USAGE,
+    SNAPSHOT_BUSY_TEXT,
+    build_pdf_report,
+    download_file_text,
+    get_render_service,
+    parse_account_ids,
+    prepare_finance_snapshot,
+    run_portfolio_scan,
+    split_file_refs,
+    spool_pdf_report,
+)
+from app.slack.uploads import UploadData, upload_file_async
+from app.store.cases import create_case, get_case, save_case, set_case_status
+from app.store.models import Case
+from app.telemetry import span, timed_listener
+
+if TYPE_CHECKING:
+    from app.slack.pdf_actions import FinanceSnapshot
+
+settings = get_settings()
+
+# Strong references to in-flight background work; asyncio only keeps weak ones.
+_background_tasks: Set["asyncio.Task[Any]"] = set()
+
+def spawn_background(coro: Coroutine[Any, Any, Any]) -> "asyncio.Task[Any]":
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def render_pdf(render_kwargs: Dict[str, Any]) -> Optional[UploadData]:
+    """
+    Bytes, or with PDF_STREAM_UPLOADS an open spooled file (rendered inline
+    only). None when the render service's queue is full.
+    """
+    service = get_render_service()
+    if service is None:
+        render = spool_pdf_report if settings.pdf_stream_uploads else build_pdf_report
+        return await asyncio.to_thread(render, **render_kwargs)
+    job = service.submit(**render_kwargs)
+    # JobState is a str enum; comparing by value keeps render_service unimported here.
+    if job.state == "REJECTED":
+        return None
+    return await job.wait_async()
+
+async def share_uploaded_snapshot(client: AsyncWebClient, snapshot: "FinanceSnapshot") -> bool:
+    file_id = await asyncio.to_thread(snapshot.uploaded_file)
+    if file_id is None:
+        return False
+    try:
+        permalink = (await client.files_info(file=file_id))["file"]["permalink"]
+    except SlackApiError:
+        await asyncio.to_thread(snapshot.forget_upload)
+        return False
+    await client.chat_postMessage(**snapshot.share_message(permalink))
+    return True
+
+async def run_finance_snapshot(client: AsyncWebClient, case: Case, viewer_user_id: str):
+    note = "Finance snapshot ready."
+    try:
+        await post_to_case_thread(client, case, "Generating finance snapshot…")
+        snapshot = await asyncio.to_thread(prepare_finance_snapshot, case)
+        if not await share_uploaded_snapshot(client, snapshot):
+            pdf = await asyncio.to_thread(snapshot.cached_pdf)
+            if pdf is None:
+                pdf = await render_pdf(snapshot.render_kwargs)
+            if pdf is None:
+                note = "Finance snapshot not rendered: the renderer is busy."
+                await post_to_case_thread(client, case, SNAPSHOT_BUSY_TEXT)
+            else:
+                try:
+                    await asyncio.to_thread(snapshot.store_pdf, pdf)
+                    with span("files_upload_v2"):
+                        response = await upload_file_async(client, pdf, **snapshot.upload_kwargs)
+                finally:
+                    if not isinstance(pdf, bytes):
+                        pdf.close()
+                await asyncio.to_thread(snapshot.remember_upload, response)
+    except Exception as e:
+        await post_to_case_thread(client, case, f":x: Failed to generate finance snapshot: `{e}`")
+
+    await upsert_case_panel(client, case, viewer_user_id=viewer_user_id, note=note)
+    await asyncio.to_thread(save_case, case)
+
+@async_slack_app.command("/churn-prevention-start")
+@timed_listener
+async def churn_prevention_start(ack, body, client: AsyncWebClient, logger):
+    await ack()
+    await client.views_open(trigger_id=body["trigger_id"], view=start_case_modal_view(body["channel_id"]))
+
+def _read_file_account_ids(url: str, token: str) -> List[str]:
+    return parse_account_ids(download_file_text(url, token))
+
+@async_slack_app.command("/churn-prevention-scan")
+@timed_listener
+async def churn_prevention_scan(ack, body, client: AsyncWebClient, logger):
+    await ack()
+    channel_id = body["channel_id"]
+
+    # The parsers live in the lazily loaded reporting stack; loading it must
+    # not stall the event loop.
+    account_ids, file_ids = await asyncio.to_thread(split_file_refs, body.get("text") or "")
+    for file_id in file_ids:
+        info = (await client.files_info(file=file_id))["file"]
+        account_ids += await asyncio.to_thread(_read_file_account_ids, info["url_private_download"], client.token)
+    account_ids = list(dict.fromkeys(account_ids))
+    if not account_ids:
+        await client.chat_postEphemeral(channel=channel_id, user=body["user_id"], text=SCAN_USAGE)
+        return
+
+    scan, start_date, end_date = await asyncio.to_thread(run_portfolio_scan, account_ids)
+    await client.chat_postMessage(channel=channel_id, text=portfolio_scan_text(scan, start_date, end_date))
+
+@async_slack_app.view("churn_start_modal")
+@timed_listener
+async def churn_start_modal_submit(ack, body, client: AsyncWebClient, logger):
+    await ack()
+
+    initiator_user_id = body["user"]["id"]
+    form = read_start_case_form(body["view"])
+
+    root = await client.chat_postMessage(
+        channel=form["channel_id"],
+        text=start_case_root_text(form, initiator_user_id),
+    )
+    case = await asyncio.to_thread(create_case, thread_ts=root["ts"], initiator_user_id=initiator_user_id, **form)
+
+    await upsert_case_panel(client, case, viewer_user_id=initiator_user_id, note="Case created.")
+    await asyncio.to_thread(save_case, case)
+    spawn_background(run_finance_snapshot(client, case, initiator_user_id))
+
+@async_slack_app.view("churn_offer_modal")
+@timed_listener
+async def churn_offer_modal_submit(ack, body, client: AsyncWebClient, logger):
+    await ack()
+    case = await asyncio.to_thread(get_case, body["view"]["private_metadata"])
+    user_id = body["user"]["id"]
+
+    if user_id != case.approver_user_id:
+        await post_to_case_thread(client, case, ":no_entry: Offer submission rejected (not authorized).")
+        return
+
+    case.offer = read_offer_form(body["view"], user_id)
+    await asyncio.to_thread(save_case, case)
+
+    await upsert_case_panel(client, case, viewer_user_id=case.initiator_user_id, note="Offer proposed.")
+
+@async_slack_app.action("cp_propose_offer")
+@timed_listener
+async def on_cp_propose_offer(ack, body, client: AsyncWebClient, logger):
+    await ack()
+    case_id = body["actions"][0]["value"]
+    case = await asyncio.to_thread(get_case, case_id)
+    user_id = body["user"]["id"]
+
+    if user_id != case.approver_user_id:
+        await client.chat_postEphemeral(
+            channel=case.channel_id,
+            user=user_id,
+            text=f"Only <@{case.approver_user_id}> can propose offers for case `{case_id}`.",
+        )
+        return
+
+    await client.views_open(trigger_id=body["trigger_id"], view=offer_modal_view(case_id))
+
+# action_id -> (new status, message for non-initiators, panel note)
+STATUS_ACTIONS = {
+    "cp_dismiss_case": ("DISMISSED", "Only the initiator can dismiss this case.", "Case dismissed."),
+    "cp_offer_accepted": ("ACCEPTED", "Only the initiator can close this case.", "Offer accepted. Case closed."),
+    "cp_offer_declined": ("DECLINED", "Only the initiator can close this case.", "Offer declined. Case closed."),
+    "cp_reopen_case": ("OPEN", "Only the initiator can reopen this case.", "Case reopened."),
+}
+
+def _status_action(action_id: str, status: str, denied: str, note: str):
+    async def handler(ack, body, client: AsyncWebClient, logger):
+        await ack()
+        case = await asyncio.to_thread(get_case, body["actions"][0]["value"])
+        user_id = body["user"]["id"]
+
+        if user_id != case.initiator_user_id:
+            await client.chat_postEphemeral(channel=case.channel_id, user=user_id, text=denied)
+            return
+
+        await asyncio.to_thread(set_case_status, case, status)
+        await upsert_case_panel(client, case, viewer_user_id=user_id, note=note)
+
+    # Named like the sync listeners (on_cp_dismiss_case, ...), which Bolt logs.
+    handler.__name__ = handler.__qualname__ = f"on_{action_id}"
+    return timed_listener(handler)
+
+for _action_id, (_status, _denied, _note) in STATUS_ACTIONS.items():
+    async_slack_app.action(_action_id)(_status_action(_action_id, _status, _denied, _note))
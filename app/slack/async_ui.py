@@ -0,0 +1,50 @@
+from typing import Any, Dict
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from app.settings import get_settings
+from app.slack.blocks import case_controls_json
+from app.slack.coalescer import AsyncPanelCoalescer
+from app.store.models import Case
+
+panel_coalescer = AsyncPanelCoalescer(window=get_settings().panel_update_window_seconds)
+
+async def post_to_case_thread(
+    client: AsyncWebClient,
+    case: Case,
+    text: str,
+    blocks=None,
+):
+    payload: Dict[str, Any] = {
+        "channel": case.channel_id,
+        "thread_ts": case.thread_ts,
+        "text": text,
+    }
+    if blocks is not None:
+        payload["blocks"] = blocks
+    return await client.chat_postMessage(**payload)
+
+async def upsert_case_panel(client: AsyncWebClient, case: Case, viewer_user_id: str, note: str = ""):
+    """
+    Async twin of app.slack.ui.upsert_case_panel.
+    """
+    text = note or f"Case `{case.case_id}`"
+    blocks = case_controls_json(case, viewer_user_id)
+
+    if case.panel_ts:
+        return await panel_coalescer.update(
+            client,
+            channel=case.channel_id,
+            ts=case.panel_ts,
+            text=text,
+            blocks=blocks,
+        )
+
+    msg = await client.chat_postMessage(
+        channel=case.channel_id,
+        thread_ts=case.thread_ts,
+        text=text,
+        blocks=blocks,
+    )
+    case.panel_ts = msg["ts"]
+    return msg
@@ -1,6 +1,14 @@
-from typing import Any, Dict, List, Optional
+import datetime as dt
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 from app.reporting.utils import fmt_int, fmt_money, fmt_pct
+from app.store.models import Case, CaseStatus, Offer, as_case
+
+if TYPE_CHECKING:
+    from app.reporting.portfolio import PortfolioScan
 
 def _status_emoji(status: str) -> str:
     return {
@@ -10,24 +18,23 @@ def _status_emoji(status: str) -> str:
         "DISMISSED": ":wastebasket:",
     }.get(status, ":grey_question:")
 
-def _offer_summary(case: Dict[str, Any]) -> str:
-    offer = case.get("offer")
+def _offer_summary(case: Case) -> str:
+    offer = case.offer
     if not offer:
         return "_No offer proposed yet._"
-    details = (offer.get("details") or "").strip()
+    details = offer.details.strip()
     if len(details) > 120:
         details = details[:117] + "…"
-    expiry = offer.get("expiry") or "—"
-    typ = offer.get("type") or "—"
+    expiry = offer.expiry or "—"
+    typ = offer.type or "—"
     return f"*{typ}* — {details}\n_Expires_: {expiry}"
 
-def _next_step_text(case: Dict[str, Any]) -> str:
-    status = case.get("status", "OPEN")
-    if status != "OPEN":
+def _next_step_text(case: Case) -> str:
+    if case.status != CaseStatus.OPEN:
         return "Case is closed."
-    if not case.get("offer"):
-        return f"Next: <@{case['approver_user_id']}> proposes the special offer."
-    return f"Next: <@{case['initiator_user_id']}> holds the meeting and closes the case."
+    if not case.offer:
+        return f"Next: <@{case.approver_user_id}> proposes the special offer."
+    return f"Next: <@{case.initiator_user_id}> holds the meeting and closes the case."
 
 def _action_button(text: str, action_id: str, value: str, style: Optional[str] = None) -> Dict[str, Any]:
     btn: Dict[str, Any] = {
@@ -40,70 +47,285 @@ def _action_button(text: str, action_id: str, value: str, style: Optional[str] =
         btn["style"] = style
     return btn
 
-def case_controls_blocks(case: Dict[str, Any], viewer_user_id: str) -> List[Dict[str, Any]]:
-    case_id = case["case_id"]
-    status = case.get("status", "OPEN")
-    initiator = case["initiator_user_id"]
-    approver = case["approver_user_id"]
-    stakeholder = case["stakeholder_user_id"]
-    offer_exists = bool(case.get("offer"))
+# Rendered panel fragments, keyed by (fragment, case_id, revision[, role]).
+PANEL_CACHE_MAX_ENTRIES = 4096
+
+_DIVIDER: Dict[str, Any] = {"type": "divider"}
+
+# (is_initiator, is_approver); the action buttons only depend on this.
+ViewerRole = Tuple[bool, bool]
+
+_MISSING = object()
+
+class _FragmentCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
+panel_cache = _FragmentCache(PANEL_CACHE_MAX_ENTRIES)
+
+def _header_block(case: Case) -> Dict[str, Any]:
     header = (
-        f"{_status_emoji(status)} *Churn Prevention Case* `{case_id}`\n"
-        f"*Ad account*: `{case['ad_account_id']}`"
-        + (f" ({case.get('account_name')})" if case.get("account_name") else "")
+        f"{_status_emoji(case.status.value)} *Churn Prevention Case* `{case.case_id}`\n"
+        f"*Ad account*: `{case.ad_account_id}`"
+        + (f" ({case.account_name})" if case.account_name else "")
         + "\n"
-        f"*Initiator*: <@{initiator}>   •   *Approver*: <@{approver}>   •   *Stakeholder*: <@{stakeholder}>"
+        f"*Initiator*: <@{case.initiator_user_id}>   •   *Approver*: <@{case.approver_user_id}>   •   "
+        f"*Stakeholder*: <@{case.stakeholder_user_id}>"
     )
+    return {"type": "section", "text": {"type": "mrkdwn", "text": header}}
 
-    blocks: List[Dict[str, Any]] = [
-        {"type": "section", "text": {"type": "mrkdwn", "text": header}},
-        {"type": "divider"},
-    ]
-
-    kpi = case.get("kpi")
-    if kpi:
-        blocks.append(
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": (
-                    f"*Finance snapshot ({kpi.get('range','')})*\n"
-                    f"Spend: *{fmt_money(float(kpi.get('spend', 0.0)))}*  •  "
-                    f"Impressions: *{fmt_int(float(kpi.get('impressions', 0)))}*  •  "
-                    f"CTR: *{fmt_pct(float(kpi.get('ctr', 0.0)))}*  •  "
-                    f"E-CPCL: *{fmt_money(float(kpi.get('e_cpcl', 0.0)))}*"
-                )},
-            }
-        )
-    else:
-        blocks.append(
-            {"type": "section", "text": {"type": "mrkdwn", "text": "*Finance snapshot*\n_Generating / not available yet._"}}
-        )
+def _kpi_block(case: Case) -> Dict[str, Any]:
+    kpi = case.kpi
+    if not kpi:
+        return {"type": "section", "text": {"type": "mrkdwn", "text": "*Finance snapshot*\n_Generating / not available yet._"}}
+    return {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": (
+            f"*Finance snapshot ({kpi.range})*\n"
+            f"Spend: *{fmt_money(kpi.spend)}*  •  "
+            f"Impressions: *{fmt_int(kpi.impressions)}*  •  "
+            f"CTR: *{fmt_pct(kpi.ctr)}*  •  "
+            f"E-CPCL: *{fmt_money(kpi.e_cpcl)}*"
+        )},
+    }
 
-    blocks += [
-        {"type": "divider"},
+def _offer_blocks(case: Case) -> List[Dict[str, Any]]:
+    return [
         {"type": "section", "text": {"type": "mrkdwn", "text": f"*Offer*\n{_offer_summary(case)}"}},
-        {"type": "context", "elements": [{"type": "mrkdwn", "text": f"*Status*: *{status}*  •  {_next_step_text(case)}"}]},
+        {"type": "context", "elements": [
+            {"type": "mrkdwn", "text": f"*Status*: *{case.status.value}*  •  {_next_step_text(case)}"},
+        ]},
     ]
 
+def _actions_block(case: Case, role: ViewerRole) -> Optional[Dict[str, Any]]:
+    case_id = case.case_id
+    is_initiator, is_approver = role
     actions: List[Dict[str, Any]] = []
 
-    if status == "OPEN":
-        if not offer_exists:
-            if viewer_user_id == approver:
+    if case.status == CaseStatus.OPEN:
+        if not case.offer:
+            if is_approver:
                 actions.append(_action_button("Propose offer", "cp_propose_offer", case_id, style="primary"))
-            if viewer_user_id == initiator:
+            if is_initiator:
                 actions.append(_action_button("Dismiss case", "cp_dismiss_case", case_id, style="danger"))
         else:
-            if viewer_user_id == initiator:
+            if is_initiator:
                 actions.append(_action_button("Offer accepted", "cp_offer_accepted", case_id, style="primary"))
                 actions.append(_action_button("Offer declined", "cp_offer_declined", case_id, style="danger"))
                 actions.append(_action_button("Dismiss case", "cp_dismiss_case", case_id, style="danger"))
     else:
-        if viewer_user_id == initiator:
+        if is_initiator:
             actions.append(_action_button("Reopen case", "cp_reopen_case", case_id))
 
-    if actions:
-        blocks.append({"type": "actions", "elements": actions})
+    return {"type": "actions", "elements": actions} if actions else None
+
+def _build_panel(case: Case, role: ViewerRole, cached: bool) -> List[Dict[str, Any]]:
+    def fragment(name: str, build: Callable[[], Any], *extra: Any) -> Any:
+        if not cached:
+            return build()
+        return panel_cache.get((name, case.case_id, case.revision, *extra), build)
 
+    blocks = [
+        fragment("header", lambda: _header_block(case)),
+        _DIVIDER,
+        fragment("kpi", lambda: _kpi_block(case)),
+        _DIVIDER,
+        *fragment("offer", lambda: _offer_blocks(case)),
+    ]
+    actions = fragment("actions", lambda: _actions_block(case, role), role)
+    if actions:
+        blocks.append(actions)
     return blocks
+
+def _viewer_role(case: Case, viewer_user_id: str) -> ViewerRole:
+    return (viewer_user_id == case.initiator_user_id, viewer_user_id == case.approver_user_id)
+
+def case_controls_blocks(case: Union[Case, Dict[str, Any]], viewer_user_id: str) -> List[Dict[str, Any]]:
+    """
+    Panel blocks for this viewer. For Case objects the result is assembled
+    from fragments cached per (case revision, viewer role); treat the
+    returned block dicts as read-only. Plain dicts are rendered uncached.
+    """
+    if not isinstance(case, Case):
+        case = as_case(case)
+        return _build_panel(case, _viewer_role(case, viewer_user_id), cached=False)
+    role = _viewer_role(case, viewer_user_id)
+    return list(panel_cache.get(
+        ("panel", case.case_id, case.revision, role),
+        lambda: _build_panel(case, role, cached=True),
+    ))
+
+def case_controls_json(case: Case, viewer_user_id: str) -> str:
+    """
+    `case_controls_blocks` pre-serialized to the JSON string Slack accepts
+    for `blocks`; reused as is until the case changes.
+    """
+    role = _viewer_role(case, viewer_user_id)
+    return panel_cache.get(
+        ("json", case.case_id, case.revision, role),
+        lambda: json.dumps(case_controls_blocks(case, viewer_user_id), ensure_ascii=False, separators=(",", ":")),
+    )
+
+def start_case_modal_view(channel_id: str) -> Dict[str, Any]:
+    return {
+        "type": "modal",
+        "callback_id": "churn_start_modal",
+        "private_metadata": channel_id,
+        "title": {"type": "plain_text", "text": "Start Churn Case"},
+        "submit": {"type": "plain_text", "text": "Start"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "blocks": [
+            {
+                "type": "input",
+                "block_id": "ad_account",
+                "label": {"type": "plain_text", "text": "Ad Account ID (UUID)"},
+                "element": {"type": "plain_text_input", "action_id": "id"},
+            },
+            {
+                "type": "input",
+                "block_id": "account_name",
+                "label": {"type": "plain_text", "text": "Account Name (optional)"},
+                "optional": True,
+                "element": {"type": "plain_text_input", "action_id": "name"},
+            },
+            {
+                "type": "input",
+                "block_id": "stakeholder",
+                "label": {"type": "plain_text", "text": "Stakeholder (Slack user)"},
+                "element": {"type": "users_select", "action_id": "user"},
+            },
+            {
+                "type": "input",
+                "block_id": "approver",
+                "label": {"type": "plain_text", "text": "Finance approver (proposes offer)"},
+                "element": {"type": "users_select", "action_id": "user"},
+            },
+        ],
+    }
+
+def offer_modal_view(case_id: str) -> Dict[str, Any]:
+    return {
+        "type": "modal",
+        "callback_id": "churn_offer_modal",
+        "private_metadata": case_id,
+        "title": {"type": "plain_text", "text": "Propose Offer"},
+        "submit": {"type": "plain_text", "text": "Send"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "blocks": [
+            {
+                "type": "input",
+                "block_id": "offer_type",
+                "label": {"type": "plain_text", "text": "Offer type"},
+                "element": {
+                    "type": "static_select",
+                    "action_id": "type",
+                    "options": [
+                        {"text": {"type": "plain_text", "text": "Free credits"}, "value": "CREDITS"},
+                        {"text": {"type": "plain_text", "text": "Discount"}, "value": "DISCOUNT"},
+                        {"text": {"type": "plain_text", "text": "Reduced terms"}, "value": "TERMS"},
+                        {"text": {"type": "plain_text", "text": "Custom"}, "value": "CUSTOM"},
+                    ],
+                },
+            },
+            {
+                "type": "input",
+                "block_id": "details",
+                "label": {"type": "plain_text", "text": "Offer details"},
+                "element": {"type": "plain_text_input", "action_id": "text", "multiline": True},
+            },
+            {
+                "type": "input",
+                "block_id": "expiry",
+                "label": {"type": "plain_text", "text": "Offer expiry (YYYY-MM-DD)"},
+                "element": {"type": "plain_text_input", "action_id": "date", "initial_value": (dt.date.today() + dt.timedelta(days=14)).isoformat()},
+            },
+            {
+                "type": "input",
+                "block_id": "internal_notes",
+                "optional": True,
+                "label": {"type": "plain_text", "text": "Internal notes (optional)"},
+                "element": {"type": "plain_text_input", "action_id": "notes", "multiline": True},
+            },
+        ],
+    }
+
+def read_start_case_form(view: Dict[str, Any]) -> Dict[str, str]:
+    v = view["state"]["values"]
+    return {
+        "channel_id": view["private_metadata"],
+        "ad_account_id": v["ad_account"]["id"]["value"].strip(),
+        "account_name": (v["account_name"]["name"].get("value") or "").strip(),
+        "stakeholder_user_id": v["stakeholder"]["user"]["selected_user"],
+        "approver_user_id": v["approver"]["user"]["selected_user"],
+    }
+
+def start_case_root_text(form: Dict[str, str], initiator_user_id: str) -> str:
+    account_name = form["account_name"]
+    return (
+        f":rotating_light: *Churn Prevention Case* started by <@{initiator_user_id}>.\n"
+        f"*Ad account:* `{form['ad_account_id']}` {f'({account_name})' if account_name else ''}\n"
+        f"*Stakeholder:* <@{form['stakeholder_user_id']}>\n"
+        f"*Finance approver:* <@{form['approver_user_id']}>"
+    )
+
+def read_offer_form(view: Dict[str, Any], user_id: str) -> Offer:
+    v = view["state"]["values"]
+    return Offer(
+        type=v["offer_type"]["type"]["selected_option"]["value"],
+        details=v["details"]["text"]["value"].strip(),
+        expiry=v["expiry"]["date"]["value"].strip(),
+        notes=(v["internal_notes"]["notes"].get("value") or "").strip(),
+        created_by=user_id,
+        created_at=dt.datetime.utcnow().isoformat(),
+    )
+
+def portfolio_scan_text(scan: "PortfolioScan", start_date: dt.date, end_date: dt.date, limit: int = 20) -> str:
+    # Scoring needs numpy; a scan has loaded it already, app startup need not.
+    from app.reporting.risk import DEFAULT_MODEL, TOP_ENTITIES, score_portfolio
+
+    candidates = score_portfolio(scan)
+    by_id = {a.ad_account_id: a for a in scan.accounts}
+    lines = [
+        f":mag: *Portfolio scan* — {len(scan.accounts)} accounts, {start_date} → {end_date}",
+        f"_Ranked by churn risk (0–100): spend trend, CTR and E-CPCL over the last {DEFAULT_MODEL.recent_days} days "
+        f"vs the {DEFAULT_MODEL.baseline_days} before, top-{TOP_ENTITIES} spend concentration. "
+        f"{scan.throughput:.1f} accounts/s, peak {scan.peak_concurrency}/{scan.max_concurrency} concurrent fetches, "
+        f"{scan.elapsed_seconds:.1f}s total._",
+    ]
+    for i, candidate in enumerate(candidates[:limit], start=1):
+        account = by_id[candidate.ad_account_id]
+        kpi = account.metrics.kpi
+        reason = f" — _{', '.join(candidate.reasons)}_" if candidate.reasons else ""
+        lines.append(
+            f"{i}. `{account.ad_account_id}` risk *{candidate.score:.0f}* • spend {fmt_money(kpi.spend)} "
+            f"({account.spend_change:+.0%}) • CTR {fmt_pct(kpi.ctr)} • E-CPCL {fmt_money(kpi.e_cpcl)}{reason}"
+        )
+    if len(candidates) > limit:
+        lines.append(f"_…and {len(candidates) - limit} more._")
+    if scan.failed:
+        failed = ", ".join(f"`{a.ad_account_id}`" for a in scan.failed[:10])
+        lines.append(f":warning: {len(scan.failed)} account(s) failed: {failed}")
+    return "\n".join(lines)
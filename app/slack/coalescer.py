@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from slack_sdk import WebClient
+from slack_sdk.web.async_client import AsyncWebClient
+
+PanelKey = Tuple[str, str]
+
+# Forget send times for idle panels once this many are tracked.
+_MAX_TRACKED = 1024
+
+def _prune(last_sent: Dict[PanelKey, float], pending: Dict[PanelKey, Any], now: float, window: float) -> None:
+    if len(last_sent) > _MAX_TRACKED:
+        for key in [k for k, t in last_sent.items() if now - t >= window and k not in pending]:
+            del last_sent[key]
+
+class PanelCoalescer:
+    """
+    Coalesces chat_update calls on the same panel message.
+
+    The first update of a panel goes out straight away. Further updates within
+    `window` seconds of the last one sent are held back; only the latest is
+    sent when the window closes, so a burst of clicks costs two calls at most.
+    `flush()` sends everything still pending and is registered at exit.
+    """
+
+    def __init__(self, window: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self._clock = clock
+        self._last_sent: Dict[PanelKey, float] = {}
+        self._pending: Dict[PanelKey, Tuple[WebClient, Dict[str, Any]]] = {}
+        self._timers: Dict[PanelKey, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self.stats = {"sent": 0, "coalesced": 0}
+
+    def update(self, client: WebClient, *, channel: str, ts: str, **kwargs: Any) -> Optional[Any]:
+        """
+        Returns the chat_update response, or None when the update was deferred.
+        """
+        key = (channel, ts)
+        payload = dict(channel=channel, ts=ts, **kwargs)
+        with self._lock:
+            now = self._clock()
+            last = self._last_sent.get(key)
+            if self.window <= 0 or last is None or now - last >= self.window:
+                # A held-back update is older than this one; it must not follow it.
+                if self._pending.pop(key, None) is not None:
+                    self.stats["coalesced"] += 1
+                superseded = self._timers.pop(key, None)
+                _prune(self._last_sent, self._pending, now, self.window)
+                self._last_sent[key] = now
+                self.stats["sent"] += 1
+                send_now = True
+            else:
+                if key in self._pending:
+                    self.stats["coalesced"] += 1
+                self._pending[key] = (client, payload)
+                if key not in self._timers:
+                    timer = threading.Timer(last + self.window - now, self._flush_key, args=(key,))
+                    timer.daemon = True
+                    self._timers[key] = timer
+                    timer.start()
+                superseded = None
+                send_now = False
+        if superseded is not None:
+            superseded.cancel()
+        return client.chat_update(**payload) if send_now else None
+
+    def flush(self) -> None:
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self._flush_key(key)
+
+    def _flush_key(self, key: PanelKey) -> None:
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return
+            self._last_sent[key] = self._clock()
+            self.stats["sent"] += 1
+        if timer is not None:
+            timer.cancel()
+        client, payload = pending
+        client.chat_update(**payload)
+
+class AsyncPanelCoalescer:
+    """
+    Async twin of PanelCoalescer; deferred updates run as tasks on the
+    running event loop.
+    """
+
+    def __init__(self, window: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self._clock = clock
+        self._last_sent: Dict[PanelKey, float] = {}
+        self._pending: Dict[PanelKey, Tuple[AsyncWebClient, Dict[str, Any]]] = {}
+        self._tasks: Dict[PanelKey, "asyncio.Task[None]"] = {}
+        self._running: Set["asyncio.Task[None]"] = set()
+        self.stats = {"sent": 0, "coalesced": 0}
+
+    async def update(self, client: AsyncWebClient, *, channel: str, ts: str, **kwargs: Any) -> Optional[Any]:
+        key = (channel, ts)
+        payload = dict(channel=channel, ts=ts, **kwargs)
+        now = self._clock()
+        last = self._last_sent.get(key)
+        if self.window <= 0 or last is None or now - last >= self.window:
+            if self._pending.pop(key, None) is not None:
+                self.stats["coalesced"] += 1
+            task = self._tasks.pop(key, None)
+            if task is not None:
+                task.cancel()
+            _prune(self._last_sent, self._pending, now, self.window)
+            self._last_sent[key] = now
+            self.stats["sent"] += 1
+            return await client.chat_update(**payload)
+
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[key] = (client, payload)
+        if key not in self._tasks:
+            task = asyncio.create_task(self._flush_later(key, last + self.window - now))
+            self._tasks[key] = task
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return None
+
+    async def flush(self) -> None:
+        for key in list(self._pending):
+            task = self._tasks.pop(key, None)
+            if task is not None:
+                task.cancel()
+            await self._send(key)
+
+    async def _flush_later(self, key: PanelKey, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._tasks.pop(key, None)
+        await self._send(key)
+
+    async def _send(self, key: PanelKey) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        self._last_sent[key] = self._clock()
+        self.stats["sent"] += 1
+        client, payload = pending
+        await client.chat_update(**payload)
@@ -1,11 +1,14 @@
 from slack_sdk import WebClient
 
 from app.slack.app import slack_app
-from app.slack.pdf_actions import generate_and_upload_finance_snapshot
+from app.slack.blocks import portfolio_scan_text, start_case_modal_view
+from app.slack.reporting import SCAN_USAGE, generate_and_upload_finance_snapshot, read_account_ids, run_portfolio_scan
 from app.slack.ui import post_to_case_thread, upsert_case_panel
-from app.store.memory import create_case
+from app.store.cases import create_case
+from app.telemetry import timed_listener
 
 @slack_app.command("/churn-prevention-start")
+@timed_listener
 def churn_prevention_start(ack, body, client: WebClient, logger):
     ack()
     channel_id = body["channel_id"]
@@ -13,39 +16,20 @@ def churn_prevention_start(ack, body, client: WebClient, logger):
 
     client.views_open(
         trigger_id=trigger_id,
-        view={
-            "type": "modal",
-            "callback_id": "churn_start_modal",
-            "private_metadata": channel_id,
-            "title": {"type": "plain_text", "text": "Start Churn Case"},
-            "submit": {"type": "plain_text", "text": "Start"},
-            "close": {"type": "plain_text", "text": "Cancel"},
-            "blocks": [
-                {
-                    "type": "input",
-                    "block_id": "ad_account",
-                    "label": {"type": "plain_text", "text": "Ad Account ID (UUID)"},
-                    "element": {"type": "plain_text_input", "action_id": "id"},
-                },
-                {
-                    "type": "input",
-                    "block_id": "account_name",
-                    "label": {"type": "plain_text", "text": "Account Name (optional)"},
-                    "optional": True,
-                    "element": {"type": "plain_text_input", "action_id": "name"},
-                },
-                {
-                    "type": "input",
-                    "block_id": "stakeholder",
-                    "label": {"type": "plain_text", "text": "Stakeholder (Slack user)"},
-                    "element": {"type": "users_select", "action_id": "user"},
-                },
-                {
-                    "type": "input",
-                    "block_id": "approver",
-                    "label": {"type": "plain_text", "text": "Finance approver (proposes offer)"},
-                    "element": {"type": "users_select", "action_id": "user"},
-                },
-            ],
-        },
+        view=start_case_modal_view(channel_id),
     )
+
+@slack_app.command("/churn-prevention-scan")
+@timed_listener
+def churn_prevention_scan(ack, body, client: WebClient, logger):
+    ack()
+    channel_id = body["channel_id"]
+    user_id = body["user_id"]
+
+    account_ids = read_account_ids(client, body.get("text") or "")
+    if not account_ids:
+        client.chat_postEphemeral(channel=channel_id, user=user_id, text=SCAN_USAGE)
+        return
+
+    scan, start_date, end_date = run_portfolio_scan(account_ids)
+    client.chat_postMessage(channel=channel_id, text=portfolio_scan_text(scan, start_date, end_date))
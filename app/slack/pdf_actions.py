@@ -1,78 +1,309 @@
+import atexit
 import datetime as dt
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Optional
 
 from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
 
 from app.reporting.ads_client import MockSpotifyAdsApi
-from app.reporting.metrics import aggregate_kpis, daily_series, top_entities
-from app.reporting.pdf import build_pdf_report
-from app.reporting.utils import fmt_int, fmt_money, fmt_pct, iso_utc_start_of_day
+from app.reporting.artifacts import ArtifactCache, artifact_key
+from app.reporting.cache import ReportCache
+from app.reporting.history import HistoryStore
+from app.reporting.metrics import KPI, MetricsResult, MetricsSpec, stream_metrics
+from app.reporting.pdf import build_pdf_report, spool_pdf_report
+from app.reporting.render_service import JobState, RenderJob, RenderService
+from app.reporting.rollup import DailyRollup, RollupStore
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import epoch_day, fmt_int, fmt_money, fmt_pct
+from app.settings import get_settings
+from app.slack.reporting import SNAPSHOT_BUSY, SNAPSHOT_QUEUED, SNAPSHOT_READY
+from app.slack.uploads import UploadData, upload_file
+from app.store.models import Case, KpiSnapshot
+from app.telemetry import span, tagged
 
 DEFAULT_FIELDS = ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND", "CTR", "E_CPCL"]
 
-mock_ads_api = MockSpotifyAdsApi()
+# KPIs come from the account's rollup (see compute_kpi_and_report).
+SNAPSHOT_METRICS = MetricsSpec(
+    kpis=False,
+    top=(("SPEND", 5), ("IMPRESSIONS", 5)),
+    series=("IMPRESSIONS", "SPEND"),
+)
 
-def compute_kpi_and_report(case: Dict[str, Any], days_back: int = 30):
-    start_date = dt.date.today() - dt.timedelta(days=days_back)
-    end_date = dt.date.today() - dt.timedelta(days=1)
-    entity_type = "AD_SET"
-    fields = DEFAULT_FIELDS
+REPORT_PAGE_SIZE = 50
+
+settings = get_settings()
+
+mock_ads_api = MockSpotifyAdsApi(
+    generator=SyntheticAdsGenerator(seed=settings.ads_mock_seed) if settings.ads_mock_seed is not None else None,
+    latency_seconds=settings.ads_mock_latency_ms / 1000,
+)
+
+report_cache = ReportCache(
+    mock_ads_api,
+    max_entries=settings.report_cache_max_entries,
+    ttl_seconds=settings.report_cache_ttl_seconds,
+    history=HistoryStore(settings.history_dir) if settings.history_dir else None,
+)
 
-    report = mock_ads_api.get_aggregate_report_by_ad_account_id(
-        ad_account_id=case["ad_account_id"],
+# Snapshot fetches are tapped into the account's daily rollup, so KPIs for any
+# range it covers need no refetch. Portfolio scans compute their own KPIs and
+# are not tapped, so a large scan cannot evict the snapshot rollups.
+rollups = RollupStore(max_entries=settings.report_cache_max_entries)
+
+artifact_cache = (
+    ArtifactCache(settings.artifact_cache_dir, max_bytes=int(settings.artifact_cache_max_mb * 1024 * 1024))
+    if settings.artifact_cache_dir
+    else None
+)
+
+_render_service: Optional[RenderService] = None
+# Uploads of snapshots rendered by the service, off its dispatcher threads.
+_upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="snapshot-upload")
+_render_service_lock = threading.Lock()
+
+def fetch_account_metrics(
+    ad_account_id: str,
+    start_date: dt.date,
+    end_date: dt.date,
+    spec: MetricsSpec = SNAPSHOT_METRICS,
+    entity_type: str = "AD_SET",
+    rollup: Optional[DailyRollup] = None,
+) -> MetricsResult:
+    """
+    Streams the range's report into `spec`'s metrics, tapping the pages into
+    `rollup` when one is given.
+    """
+    pages = report_cache.iter_pages(
+        ad_account_id=ad_account_id,
         entity_type=entity_type,
-        fields=fields,
-        report_start=iso_utc_start_of_day(start_date),
-        report_end=iso_utc_start_of_day(end_date),
+        fields=DEFAULT_FIELDS,
+        start_date=start_date,
+        end_date=end_date,
         granularity="DAY",
-        include_parent_entity=False,
-        limit=50,
+        limit=REPORT_PAGE_SIZE,
+    )
+    return stream_metrics(pages if rollup is None else rollup.tap(pages, start_date, end_date), spec)
+
+def account_rollup(ad_account_id: str, start_date: dt.date, end_date: dt.date, entity_type: str = "AD_SET") -> DailyRollup:
+    """
+    The account's rollup, first fetching the range if it is not fully covered
+    or its still-changing recent days are older than the report cache allows.
+    """
+    rollup = rollups.get(ad_account_id, entity_type)
+    volatile_from = dt.date.today() - dt.timedelta(days=report_cache.volatile_days)
+    if not rollup.covers(start_date, end_date):
+        fetch_start = start_date
+    elif end_date >= volatile_from and time.time() - rollup.updated_at > report_cache.volatile_ttl_seconds:
+        fetch_start = max(start_date, volatile_from)
+    else:
+        return rollup
+    fetch_account_metrics(
+        ad_account_id, fetch_start, end_date, spec=MetricsSpec(kpis=False), entity_type=entity_type, rollup=rollup
+    )
+    return rollup
+
+def account_kpi(ad_account_id: str, start_date: dt.date, end_date: dt.date, entity_type: str = "AD_SET") -> KPI:
+    return account_rollup(ad_account_id, start_date, end_date, entity_type).kpi(start_date, end_date)
+
+def compute_kpi_and_report(
+    case: Case,
+    days_back: int = 30,
+    start_date: Optional[dt.date] = None,
+    end_date: Optional[dt.date] = None,
+):
+    """
+    Fetches report metrics for [start_date, end_date] (default: the last
+    `days_back` days up to yesterday) and stores the KPI summary on the case.
+    """
+    end_date = end_date or dt.date.today() - dt.timedelta(days=1)
+    start_date = start_date or dt.date.today() - dt.timedelta(days=days_back)
+    entity_type = "AD_SET"
+
+    rollup = rollups.get(case.ad_account_id, entity_type)
+    metrics = fetch_account_metrics(case.ad_account_id, start_date, end_date, entity_type=entity_type, rollup=rollup)
+    kpi = metrics.kpi = rollup.kpi(start_date, end_date)
+
+    case.kpi = KpiSnapshot(
+        impressions=kpi.impressions,
+        streamed_impressions=kpi.streamed_impressions,
+        clicks=kpi.clicks,
+        ctr=kpi.ctr,
+        spend=kpi.spend,
+        e_cpcl=kpi.e_cpcl,
+        range=f"{start_date} → {end_date}",
     )
 
-    kpi = aggregate_kpis(report.rows)
+    return metrics, rollup, start_date, end_date, entity_type
+
+def get_render_service() -> Optional[RenderService]:
+    """
+    Process-pool renderer when PDF_RENDER_WORKERS > 0, else None (render inline).
+    """
+    global _render_service
+    if settings.pdf_render_workers <= 0:
+        return None
+    with _render_service_lock:
+        if _render_service is None:
+            _render_service = RenderService(
+                workers=settings.pdf_render_workers,
+                max_queue=settings.pdf_render_queue,
+                job_timeout=settings.pdf_render_timeout_seconds,
+            )
+            atexit.register(_render_service.shutdown)
+    return _render_service
 
-    case["kpi"] = {
-        "impressions": kpi.impressions,
-        "streamed_impressions": kpi.streamed_impressions,
-        "clicks": kpi.clicks,
-        "ctr": kpi.ctr,
-        "spend": kpi.spend,
-        "e_cpcl": kpi.e_cpcl,
-        "range": f"{start_date} → {end_date}",
-    }
+@dataclass
+class FinanceSnapshot:
+    """
+    The PDF and its upload are case-neutral, so cases on the same account and
+    range share them through the artifact cache; `upload_kwargs["initial_comment"]`
+    carries the case.
+    """
 
-    return report, kpi, start_date, end_date, entity_type
+    render_kwargs: Dict[str, Any]
+    upload_kwargs: Dict[str, Any]
+    artifact_key: str
 
-def generate_and_upload_finance_snapshot(client: WebClient, case: Dict[str, Any]):
-    report, kpi, start_date, end_date, entity_type = compute_kpi_and_report(case, days_back=30)
+    def cached_pdf(self) -> Optional[IO[bytes]]:
+        return artifact_cache.open(self.artifact_key) if artifact_cache is not None else None
 
-    pdf_bytes = build_pdf_report(
-        ad_account_id=case["ad_account_id"],
+    def store_pdf(self, pdf: UploadData) -> None:
+        if artifact_cache is not None:
+            artifact_cache.put(self.artifact_key, pdf)
+
+    def uploaded_file(self) -> Optional[str]:
+        """
+        Slack file ID of an earlier upload of this PDF to the case's channel.
+        """
+        if artifact_cache is None:
+            return None
+        return artifact_cache.slack_file(self.artifact_key, self.upload_kwargs["channel"])
+
+    def remember_upload(self, response: Any) -> None:
+        files = response.get("files") or []
+        if artifact_cache is not None and files:
+            artifact_cache.remember_slack_file(self.artifact_key, self.upload_kwargs["channel"], files[0]["id"])
+
+    def forget_upload(self) -> None:
+        if artifact_cache is not None:
+            artifact_cache.forget_slack_file(self.artifact_key, self.upload_kwargs["channel"])
+
+    def share_message(self, permalink: str) -> Dict[str, Any]:
+        """
+        chat_postMessage arguments that post an existing upload to the case thread.
+        """
+        return dict(
+            channel=self.upload_kwargs["channel"],
+            thread_ts=self.upload_kwargs["thread_ts"],
+            text=f"{self.upload_kwargs['initial_comment']}\n<{permalink}|{self.upload_kwargs['title']}>",
+        )
+
+def prepare_finance_snapshot(case: Case) -> FinanceSnapshot:
+    """
+    Fetches metrics and stores the KPI summary on the case. Returns the
+    build_pdf_report arguments and the files_upload_v2 arguments (minus `file`).
+    """
+    metrics, rollup, start_date, end_date, entity_type = compute_kpi_and_report(case, days_back=30)
+    kpi = metrics.kpi
+    comparison = rollup.compare(start_date, end_date)
+    trend = (
+        f"\nVs previous period: spend *{comparison.change('spend'):+.0%}* • CTR *{comparison.change('ctr'):+.0%}*"
+        if comparison.previous_complete
+        else ""
+    )
+
+    render_kwargs = dict(
+        ad_account_id=case.ad_account_id,
         entity_type=entity_type,
-        report_start=report.report_start,
-        report_end=report.report_end,
-        kpi=kpi,
-        top_by_spend=top_entities(report.rows, "SPEND", n=5),
-        top_by_imps=top_entities(report.rows, "IMPRESSIONS", n=5),
-        series_imps=daily_series(report.rows, "IMPRESSIONS"),
-        series_spend=daily_series(report.rows, "SPEND"),
-        case_id=case["case_id"],
-        account_name=case.get("account_name", ""),
+        report_start=epoch_day(start_date),
+        report_end=epoch_day(end_date),
+        **metrics.pdf_inputs(),
+        account_name=case.account_name,
         title_override="Spotify Advertising — Finance Snapshot",
+        chart_backend=settings.pdf_chart_backend,
     )
 
-    filename = f"finance_snapshot_{case['case_id']}_{start_date}_{end_date}.pdf"
-
-    client.files_upload_v2(
-        channel=case["channel_id"],
-        thread_ts=case["thread_ts"],
-        filename=filename,
-        title=f"Finance Snapshot — Case {case['case_id']}",
-        file=pdf_bytes,
+    upload_kwargs = dict(
+        channel=case.channel_id,
+        thread_ts=case.thread_ts,
+        filename=f"finance_snapshot_{case.ad_account_id}_{start_date}_{end_date}.pdf",
+        title=f"Finance Snapshot — {case.account_name or case.ad_account_id}",
         initial_comment=(
-            f":bar_chart: *Finance snapshot* for <@{case['approver_user_id']}>.\n"
+            f":bar_chart: *Finance snapshot* for <@{case.approver_user_id}>.\n"
             f"Range: {start_date} → {end_date}\n"
             f"Spend: *{fmt_money(kpi.spend)}* • Impressions: *{fmt_int(kpi.impressions)}* • "
-            f"CTR: *{fmt_pct(kpi.ctr)}* • E-CPCL: *{fmt_money(kpi.e_cpcl)}*"
+            f"CTR: *{fmt_pct(kpi.ctr)}* • E-CPCL: *{fmt_money(kpi.e_cpcl)}*{trend}"
         ),
     )
+    key = artifact_key(kind="finance_snapshot", fields=DEFAULT_FIELDS, **render_kwargs)
+    return FinanceSnapshot(render_kwargs=render_kwargs, upload_kwargs=upload_kwargs, artifact_key=key)
+
+def share_uploaded_snapshot(client: WebClient, snapshot: FinanceSnapshot) -> bool:
+    """
+    Posts an earlier upload of the same PDF to the case thread. False when
+    there is none, or Slack no longer has it.
+    """
+    file_id = snapshot.uploaded_file()
+    if file_id is None:
+        return False
+    try:
+        permalink = client.files_info(file=file_id)["file"]["permalink"]
+    except SlackApiError:
+        snapshot.forget_upload()
+        return False
+    client.chat_postMessage(**snapshot.share_message(permalink))
+    return True
+
+def generate_and_upload_finance_snapshot(client: WebClient, case: Case) -> str:
+    """
+    Returns SNAPSHOT_READY once uploaded, or SNAPSHOT_QUEUED right after
+    handing the render to the render service; a queued snapshot is uploaded
+    when its job finishes. SNAPSHOT_BUSY when the service's queue is full.
+    """
+    snapshot = prepare_finance_snapshot(case)
+    render_kwargs = snapshot.render_kwargs
+    if share_uploaded_snapshot(client, snapshot):
+        return SNAPSHOT_READY
+
+    def upload(pdf: UploadData):
+        snapshot.store_pdf(pdf)
+        with span("files_upload_v2"):
+            response = upload_file(client, pdf, **snapshot.upload_kwargs)
+        snapshot.remember_upload(response)
+
+    cached = snapshot.cached_pdf()
+    if cached is not None:
+        with cached:
+            upload(cached)
+        return SNAPSHOT_READY
+
+    service = get_render_service()
+    if service is None:
+        if settings.pdf_stream_uploads:
+            with spool_pdf_report(**render_kwargs) as pdf:
+                upload(pdf)
+        else:
+            upload(build_pdf_report(**render_kwargs))
+        return SNAPSHOT_READY
+
+    job = service.submit(**render_kwargs)
+    if job.state == JobState.REJECTED:
+        return SNAPSHOT_BUSY
+    job.add_done_callback(lambda j: _upload_executor.submit(_upload_when_rendered, j, upload, client, case))
+    return SNAPSHOT_QUEUED
+
+def _upload_when_rendered(job: RenderJob, upload: Callable[[UploadData], Any], client: WebClient, case: Case):
+    try:
+        with tagged(*job.tags):
+            upload(job.result(timeout=0))
+    except Exception as e:
+        client.chat_postMessage(
+            channel=case.channel_id,
+            thread_ts=case.thread_ts,
+            text=f":x: Failed to generate finance snapshot: `{e}`",
+        )
@@ -0,0 +1,130 @@
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from slack_sdk import WebClient
+
+from app.store.models import Case
+
+if TYPE_CHECKING:
+    import datetime as dt
+
+    from app.reporting.portfolio import PortfolioScan
+    from app.reporting.render_service import RenderService
+    from app.slack.pdf_actions import FinanceSnapshot
+
+# Listeners reach the reporting stack (numpy, reportlab, optionally
+# matplotlib) only through this module, which imports it on first use, so the
+# Slack app starts without it. warm_up() loads it ahead of the first request.
+
+SNAPSHOT_READY = "ready"
+SNAPSHOT_QUEUED = "queued"
+# The render service's queue was full; nothing was rendered.
+SNAPSHOT_BUSY = "busy"
+SNAPSHOT_BUSY_TEXT = ":hourglass: The snapshot renderer is busy right now; please try again in a minute."
+
+SCAN_USAGE = "Usage: `/churn-prevention-scan <ad account IDs, comma/space separated, or Slack file IDs>`"
+
+_PDF_ACTIONS = "app.slack.pdf_actions"
+_SCAN_ACTIONS = "app.slack.scan_actions"
+
+_load_seconds: Dict[str, float] = {}
+_warm_up_seconds: Optional[float] = None
+_warm_up_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+def _load(name: str) -> ModuleType:
+    if name in _load_seconds:
+        return importlib.import_module(name)
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    with _lock:
+        _load_seconds.setdefault(name, time.perf_counter() - started)
+    return module
+
+def is_loaded() -> bool:
+    return _PDF_ACTIONS in _load_seconds
+
+def generate_and_upload_finance_snapshot(client: WebClient, case: Case) -> str:
+    return _load(_PDF_ACTIONS).generate_and_upload_finance_snapshot(client, case)
+
+def prepare_finance_snapshot(case: Case) -> "FinanceSnapshot":
+    return _load(_PDF_ACTIONS).prepare_finance_snapshot(case)
+
+def build_pdf_report(**render_kwargs: Any) -> bytes:
+    return _load("app.reporting.pdf").build_pdf_report(**render_kwargs)
+
+def spool_pdf_report(**render_kwargs: Any) -> "IO[bytes]":
+    return _load("app.reporting.pdf").spool_pdf_report(**render_kwargs)
+
+def get_render_service() -> "Optional[RenderService]":
+    return _load(_PDF_ACTIONS).get_render_service()
+
+def running_render_service() -> "Optional[RenderService]":
+    """
+    The render service if the reporting stack is already loaded, else None;
+    for status checks that must not trigger the import.
+    """
+    return get_render_service() if is_loaded() else None
+
+def parse_account_ids(text: str) -> List[str]:
+    return _load(_SCAN_ACTIONS).parse_account_ids(text)
+
+def split_file_refs(text: str) -> Tuple[List[str], List[str]]:
+    return _load(_SCAN_ACTIONS).split_file_refs(text)
+
+def download_file_text(url: str, token: str) -> str:
+    return _load(_SCAN_ACTIONS).download_file_text(url, token)
+
+def read_account_ids(client: WebClient, text: str) -> List[str]:
+    return _load(_SCAN_ACTIONS).read_account_ids(client, text)
+
+def run_portfolio_scan(account_ids: List[str], **kwargs: Any) -> "Tuple[PortfolioScan, dt.date, dt.date]":
+    return _load(_SCAN_ACTIONS).run_portfolio_scan(account_ids, **kwargs)
+
+def warm_up() -> float:
+    """
+    Imports the reporting stack, builds the shared report template (sample
+    styles, static paragraphs) and loads the fonts it uses, plus matplotlib
+    when that is the chart backend. Returns the seconds it took.
+    """
+    global _warm_up_seconds
+    started = time.perf_counter()
+    pdf_actions = _load(_PDF_ACTIONS)
+    _load(_SCAN_ACTIONS)
+
+    from reportlab.pdfbase import pdfmetrics
+
+    from app.reporting.template import get_report_template
+
+    template = get_report_template()
+    for font in {getattr(style, "fontName", "Helvetica") for style in template.styles.byName.values()}:
+        pdfmetrics.getFont(font)
+    if pdf_actions.settings.pdf_chart_backend == "matplotlib":
+        import matplotlib.backends.backend_agg  # noqa: F401
+        import matplotlib.figure  # noqa: F401
+    pdf_actions.get_render_service()
+    _warm_up_seconds = time.perf_counter() - started
+    return _warm_up_seconds
+
+def start_warm_up() -> threading.Thread:
+    """
+    Runs warm_up() once on a daemon thread.
+    """
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name="reporting-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        loaded = {name.rsplit(".", 1)[-1]: round(s, 4) for name, s in _load_seconds.items()}
+    return {
+        "loaded": is_loaded(),
+        "load_seconds": loaded,
+        "warm_up_seconds": round(_warm_up_seconds, 4) if _warm_up_seconds is not None else None,
+    }
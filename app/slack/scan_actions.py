@@ -0,0 +1,55 @@
+import datetime as dt
+import re
+import urllib.request
+from typing import List, Tuple
+
+from slack_sdk import WebClient
+
+from app.reporting.metrics import MetricsSpec
+from app.reporting.portfolio import PortfolioScan, parse_account_ids, scan_portfolio
+from app.reporting.risk import TOP_ENTITIES
+from app.settings import get_settings
+from app.slack.pdf_actions import fetch_account_metrics
+
+SCAN_METRICS = MetricsSpec(
+    kpis=True,
+    top=(("SPEND", TOP_ENTITIES),),
+    series=("SPEND", "IMPRESSIONS", "CLICKS"),
+)
+SCAN_DAYS = 28
+
+_SLACK_FILE_ID = re.compile(r"^F[A-Z0-9]{8,}$")
+
+settings = get_settings()
+
+def split_file_refs(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Splits command text into (ad account IDs, Slack file IDs to read IDs from).
+    """
+    ids, files = [], []
+    for token in parse_account_ids(text):
+        (files if _SLACK_FILE_ID.match(token) else ids).append(token)
+    return ids, files
+
+def download_file_text(url: str, token: str) -> str:
+    req = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return resp.read().decode("utf-8", errors="replace")
+
+def read_account_ids(client: WebClient, text: str) -> List[str]:
+    ids, files = split_file_refs(text)
+    for file_id in files:
+        info = client.files_info(file=file_id)["file"]
+        ids += parse_account_ids(download_file_text(info["url_private_download"], client.token))
+    return list(dict.fromkeys(ids))
+
+def run_portfolio_scan(account_ids: List[str], days_back: int = SCAN_DAYS) -> Tuple[PortfolioScan, dt.date, dt.date]:
+    start_date = dt.date.today() - dt.timedelta(days=days_back)
+    end_date = dt.date.today() - dt.timedelta(days=1)
+    scan = scan_portfolio(
+        account_ids[: settings.scan_max_accounts],
+        lambda ad_account_id: fetch_account_metrics(ad_account_id, start_date, end_date, spec=SCAN_METRICS),
+        max_concurrency=settings.scan_max_concurrency,
+        max_rate=settings.scan_max_accounts_per_second or None,
+    )
+    return scan, start_date, end_date
@@ -0,0 +1,334 @@
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from app.telemetry import slack_api_span
+
+LANE_HIGH = 0
+LANE_NORMAL = 1
+LANE_LOW = 2
+LANE_NAMES = {LANE_HIGH: "high", LANE_NORMAL: "normal", LANE_LOW: "low"}
+
+# Trigger IDs expire 3 seconds after the user's click.
+HIGH_LANE_DEADLINE_SECONDS = 2.5
+
+@dataclass(frozen=True)
+class RateLimit:
+    per_minute: float
+    burst: int
+
+# Slack's published tiers: Tier 3 = 50/min, Tier 4 = 100/min; chat.postMessage
+# is "special" (about 1/s per channel), approximated here per workspace.
+METHOD_LIMITS: Dict[str, RateLimit] = {
+    "chat.postMessage": RateLimit(60, 5),
+    "chat.postEphemeral": RateLimit(100, 10),
+    "chat.update": RateLimit(50, 5),
+    "views.open": RateLimit(100, 10),
+    "views.update": RateLimit(100, 10),
+    "views.push": RateLimit(100, 10),
+    "files.getUploadURLExternal": RateLimit(100, 5),
+    "files.completeUploadExternal": RateLimit(100, 5),
+}
+DEFAULT_LIMIT = RateLimit(50, 5)
+
+def lane_for(api_method: str) -> int:
+    if api_method.startswith("views."):
+        return LANE_HIGH
+    if api_method.startswith("files."):
+        return LANE_LOW
+    return LANE_NORMAL
+
+class DeadlineExceeded(Exception):
+    pass
+
+class TokenBucket:
+    def __init__(self, limit: RateLimit, now: float):
+        self.rate = limit.per_minute / 60.0
+        self.capacity = float(limit.burst)
+        self.tokens = self.capacity
+        self.updated = now
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """
+        Seconds until a token is available (0 when one is available now).
+        """
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, until: float) -> None:
+        self.paused_until = max(self.paused_until, until)
+
+@dataclass
+class _Waiter:
+    lane: int
+    method: str
+
+class OutboundScheduler:
+    """
+    Admits outbound Slack calls: one token bucket per API method, at most
+    `max_in_flight` calls at once, and lanes so that a ready high-priority
+    call (views.*) always goes before normal (chat.*) and low (files.*) ones.
+
+    A 429 pauses that method's bucket for the Retry-After period; the call is
+    retried after that delay plus jitter. High-lane calls give up once they
+    can no longer finish inside HIGH_LANE_DEADLINE_SECONDS.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        max_retries: int = 3,
+        jitter: float = 0.5,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.jitter = jitter
+        self.limits = METHOD_LIMITS if limits is None else limits
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiters: List[_Waiter] = []
+        self._in_flight = 0
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._retries = 0
+        self._rate_limited = 0
+        self._waits: Dict[int, Deque[float]] = {lane: deque(maxlen=1024) for lane in LANE_NAMES}
+
+    def _bucket(self, method: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(method)
+        if bucket is None:
+            bucket = self._buckets[method] = TokenBucket(self.limits.get(method, DEFAULT_LIMIT), now)
+        return bucket
+
+    def acquire(self, method: str, deadline: Optional[float] = None) -> None:
+        me = _Waiter(lane_for(method), method)
+        with self._cond:
+            start = self._clock()
+            self._waiters.append(me)
+            try:
+                while True:
+                    admitted, timeout = self._admit(me, start, deadline)
+                    if admitted:
+                        return
+                    self._cond.wait(timeout=timeout)
+            finally:
+                self._waiters.remove(me)
+                self._cond.notify_all()
+
+    def _admit(self, me: _Waiter, start: float, deadline: Optional[float]) -> Tuple[bool, Optional[float]]:
+        """
+        Under `_cond`: takes a slot for `me`, or returns how long to wait
+        before trying again (None: until notified).
+        """
+        now = self._clock()
+        bucket = self._bucket(me.method, now)
+        wait = bucket.wait_time(now)
+        if wait == 0 and self._in_flight < self._max_for(me, now):
+            bucket.take(now)
+            self._in_flight += 1
+            self._calls[me.method] += 1
+            self._waits[me.lane].append(now - start)
+            return True, None
+        timeout = wait or None
+        if deadline is not None:
+            if now + wait > deadline:
+                raise DeadlineExceeded(f"{me.method} could not be sent before its deadline")
+            timeout = min(wait, deadline - now) if wait else deadline - now
+        return False, timeout
+
+    def _max_for(self, me: _Waiter, now: float) -> int:
+        # A ready waiter in a higher lane takes the next free slot.
+        for w in self._waiters:
+            if w.lane < me.lane and self._bucket(w.method, now).wait_time(now) == 0:
+                return 0
+        return self.max_in_flight
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def rate_limited(self, method: str, retry_after: float) -> float:
+        """
+        Records a 429 and returns how long to sleep before retrying.
+        """
+        delay = retry_after + random.uniform(0, self.jitter)
+        with self._cond:
+            self._rate_limited += 1
+            self._retries += 1
+            now = self._clock()
+            self._bucket(method, now).pause(now + retry_after)
+            self._cond.notify_all()
+        return delay
+
+    def call(self, method: str, send: Callable[[], SlackResponse]) -> SlackResponse:
+        deadline = self._clock() + HIGH_LANE_DEADLINE_SECONDS if lane_for(method) == LANE_HIGH else None
+        attempt = 0
+        while True:
+            self.acquire(method, deadline)
+            try:
+                return send()
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                delay = self.rate_limited(method, _retry_after(e.response))
+                if deadline is not None and self._clock() + delay > deadline:
+                    raise
+            finally:
+                self.release()
+            attempt += 1
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            waiting = {name: 0 for name in LANE_NAMES.values()}
+            for w in self._waiters:
+                waiting[LANE_NAMES[w.lane]] += 1
+            waits = {LANE_NAMES[lane]: sorted(d) for lane, d in self._waits.items()}
+            return {
+                "in_flight": self._in_flight,
+                "waiting": waiting,
+                "calls": dict(self._calls),
+                "retries": self._retries,
+                "rate_limited": self._rate_limited,
+                "wait_p95_ms": {
+                    lane: round(w[min(len(w) - 1, int(0.95 * len(w)))] * 1000, 1) if w else 0.0
+                    for lane, w in waits.items()
+                },
+            }
+
+class AsyncOutboundScheduler(OutboundScheduler):
+    """
+    OutboundScheduler for asyncio callers: the same buckets, lanes and 429
+    handling, but a call waiting for admission awaits instead of blocking
+    a thread. Waiters are woken through futures of their own loop.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._wakeups: List["asyncio.Future[None]"] = []
+
+    def _wake(self) -> None:
+        # Under _cond.
+        for future in self._wakeups:
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+        self._wakeups.clear()
+
+    async def acquire_async(self, method: str, deadline: Optional[float] = None) -> None:
+        me = _Waiter(lane_for(method), method)
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            start = self._clock()
+            self._waiters.append(me)
+        try:
+            while True:
+                with self._cond:
+                    admitted, timeout = self._admit(me, start, deadline)
+                    if admitted:
+                        return
+                    woken = loop.create_future()
+                    self._wakeups.append(woken)
+                try:
+                    await asyncio.wait_for(woken, timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                self._waiters.remove(me)
+                self._cond.notify_all()
+                self._wake()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+            self._wake()
+
+    def rate_limited(self, method: str, retry_after: float) -> float:
+        delay = super().rate_limited(method, retry_after)
+        with self._cond:
+            self._wake()
+        return delay
+
+    async def call_async(self, method: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        deadline = self._clock() + HIGH_LANE_DEADLINE_SECONDS if lane_for(method) == LANE_HIGH else None
+        attempt = 0
+        while True:
+            await self.acquire_async(method, deadline)
+            try:
+                return await send()
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                delay = self.rate_limited(method, _retry_after(e.response))
+                if deadline is not None and self._clock() + delay > deadline:
+                    raise
+            finally:
+                self.release()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+def _retry_after(response: SlackResponse) -> float:
+    for key, value in (response.headers or {}).items():
+        if key.lower() == "retry-after":
+            try:
+                return float(value if not isinstance(value, list) else value[0])
+            except ValueError:
+                break
+    return 1.0
+
+class ScheduledWebClient(WebClient):
+    """
+    WebClient whose API calls are admitted by an OutboundScheduler.
+    """
+
+    def __init__(self, *args: Any, scheduler: OutboundScheduler, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+
+    def api_call(self, api_method: str, **kwargs: Any) -> SlackResponse:
+        with slack_api_span(api_method):
+            return self.scheduler.call(api_method, lambda: super(ScheduledWebClient, self).api_call(api_method, **kwargs))
+
+    @classmethod
+    def like(cls, client: WebClient, scheduler: OutboundScheduler) -> "ScheduledWebClient":
+        """
+        Copy of a (per-request) Bolt client that goes through `scheduler`.
+        """
+        return cls(
+            token=client.token,
+            base_url=client.base_url,
+            timeout=client.timeout,
+            ssl=client.ssl,
+            proxy=client.proxy,
+            headers=client.headers,
+            team_id=client.default_params.get("team_id"),
+            logger=client.logger,
+            retry_handlers=client.retry_handlers.copy() if client.retry_handlers is not None else None,
+            scheduler=scheduler,
+        )
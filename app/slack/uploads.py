@@ -0,0 +1,95 @@
+import asyncio
+import os
+import urllib.request
+from ssl import SSLContext
+from typing import IO, Any, Dict, Optional, Union
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackRequestError
+from slack_sdk.web.async_client import AsyncWebClient
+
+# files_upload_v2 reads a file or path argument whole into memory, so files
+# are sent through the same three steps here with the body streamed instead.
+
+UploadData = Union[bytes, IO[bytes]]
+
+def upload_file(
+    client: WebClient,
+    file: UploadData,
+    *,
+    filename: str,
+    title: Optional[str] = None,
+    channel: Optional[str] = None,
+    thread_ts: Optional[str] = None,
+    initial_comment: Optional[str] = None,
+) -> Any:
+    """
+    files_upload_v2 for bytes; a file is streamed from its current position.
+    """
+    share = dict(channel=channel, thread_ts=thread_ts, initial_comment=initial_comment)
+    if isinstance(file, bytes):
+        return client.files_upload_v2(file=file, filename=filename, title=title, **share)
+    length = _remaining(file)
+    target = client.files_getUploadURLExternal(filename=filename, length=length)
+    post_upload(target["upload_url"], file, length, timeout=client.timeout, proxy=client.proxy, ssl=client.ssl)
+    return client.files_completeUploadExternal(files=_completed(target, title or filename), **_complete_args(share))
+
+async def upload_file_async(
+    client: AsyncWebClient,
+    file: UploadData,
+    *,
+    filename: str,
+    title: Optional[str] = None,
+    channel: Optional[str] = None,
+    thread_ts: Optional[str] = None,
+    initial_comment: Optional[str] = None,
+) -> Any:
+    share = dict(channel=channel, thread_ts=thread_ts, initial_comment=initial_comment)
+    if isinstance(file, bytes):
+        return await client.files_upload_v2(file=file, filename=filename, title=title, **share)
+    length = await asyncio.to_thread(_remaining, file)
+    target = await client.files_getUploadURLExternal(filename=filename, length=length)
+    await asyncio.to_thread(
+        post_upload, target["upload_url"], file, length, timeout=client.timeout, proxy=client.proxy, ssl=client.ssl
+    )
+    return await client.files_completeUploadExternal(files=_completed(target, title or filename), **_complete_args(share))
+
+def post_upload(
+    url: str,
+    file: IO[bytes],
+    length: int,
+    *,
+    timeout: float,
+    proxy: Optional[str] = None,
+    ssl: Optional[SSLContext] = None,
+) -> None:
+    """
+    POSTs the next `length` bytes of `file` to a files.getUploadURLExternal
+    URL. http.client sends a file body in blocks, so only one is in memory.
+    """
+    handlers: list = [urllib.request.HTTPSHandler(context=ssl)]
+    if proxy:
+        handlers.append(urllib.request.ProxyHandler({"http": proxy, "https": proxy}))
+    request = urllib.request.Request(
+        url,
+        data=file,
+        method="POST",
+        headers={"Content-Length": str(length), "Content-Type": "application/octet-stream"},
+    )
+    with urllib.request.build_opener(*handlers).open(request, timeout=timeout) as resp:
+        resp.read()
+        if resp.status != 200:
+            raise SlackRequestError(f"Failed to upload a file (status: {resp.status}, url: {url})")
+
+def _remaining(file: IO[bytes]) -> int:
+    position = file.tell()
+    end = file.seek(0, os.SEEK_END)
+    file.seek(position)
+    return end - position
+
+def _completed(target: Any, title: str) -> list:
+    return [{"id": target["file_id"], "title": title}]
+
+def _complete_args(share: Dict[str, Optional[str]]) -> Dict[str, str]:
+    args = {"channel_id": share["channel"], "thread_ts": share["thread_ts"], "initial_comment": share["initial_comment"]}
+    return {k: v for k, v in args.items() if v is not None}
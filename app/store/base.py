@@ -0,0 +1,39 @@
+import uuid
+from typing import List, Optional, Protocol, Union
+
+from app.store.models import Case, CaseStatus
+
+def new_case_id() -> str:
+    return uuid.uuid4().hex[:6].upper()
+
+class CaseStore(Protocol):
+    """
+    Case persistence. Handlers mutate the Case they got from `get_case()` and
+    hand it back to `save_case()`.
+    """
+
+    def get_case(self, case_id: str) -> Case: ...
+
+    def save_case(self, case: Case) -> None: ...
+
+    def set_case_status(self, case: Case, status: Union[CaseStatus, str]) -> None: ...
+
+    def latest_open_case_for_user(self, user_id: str) -> Optional[Case]: ...
+
+    def cases_for_ad_account(self, ad_account_id: str) -> List[Case]: ...
+
+    def cases_for_approver(self, user_id: str) -> List[Case]: ...
+
+    def case_for_thread(self, channel_id: str, thread_ts: str) -> Optional[Case]: ...
+
+    def create_case(
+        self,
+        *,
+        channel_id: str,
+        thread_ts: str,
+        initiator_user_id: str,
+        approver_user_id: str,
+        stakeholder_user_id: str,
+        ad_account_id: str,
+        account_name: str,
+    ) -> Case: ...
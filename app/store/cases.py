@@ -0,0 +1,62 @@
+import threading
+from typing import Any, List, Optional, Union
+
+from app.settings import get_settings
+from app.store.base import CaseStore
+from app.store.models import Case, CaseStatus
+
+_store: Optional[CaseStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> CaseStore:
+    """
+    The configured case store: in-memory by default, SQLite when
+    CASE_STORE=sqlite (required when running more than one worker).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _build_store()
+    return _store
+
+def set_store(store: Optional[CaseStore]) -> None:
+    global _store
+    with _store_lock:
+        _store = store
+
+def _build_store() -> CaseStore:
+    settings = get_settings()
+    if settings.case_store == "sqlite":
+        from app.store.sqlite import SqliteCaseStore
+
+        return SqliteCaseStore(settings.case_db_path)
+    if settings.case_store == "memory":
+        from app.store.memory import _default
+
+        return _default
+    raise ValueError(f"Unknown CASE_STORE: {settings.case_store}")
+
+def get_case(case_id: str) -> Case:
+    return get_store().get_case(case_id)
+
+def save_case(case: Case) -> None:
+    get_store().save_case(case)
+
+def set_case_status(case: Case, status: Union[CaseStatus, str]) -> None:
+    get_store().set_case_status(case, status)
+
+def latest_open_case_for_user(user_id: str) -> Optional[Case]:
+    return get_store().latest_open_case_for_user(user_id)
+
+def cases_for_ad_account(ad_account_id: str) -> List[Case]:
+    return get_store().cases_for_ad_account(ad_account_id)
+
+def cases_for_approver(user_id: str) -> List[Case]:
+    return get_store().cases_for_approver(user_id)
+
+def case_for_thread(channel_id: str, thread_ts: str) -> Optional[Case]:
+    return get_store().case_for_thread(channel_id, thread_ts)
+
+def create_case(**kwargs: Any) -> Case:
+    return get_store().create_case(**kwargs)
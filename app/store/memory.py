@@ -1,47 +1,150 @@
-import time
-import uuid
-from typing import Any, Dict, Optional
-
-CASES: Dict[str, Dict[str, Any]] = {}
-
-def new_case_id() -> str:
-    return uuid.uuid4().hex[:6].upper()
-
-def get_case(case_id: str) -> Dict[str, Any]:
-    c = CASES.get(case_id)
-    if not c:
-        raise ValueError(f"Unknown case_id: {case_id}")
-    return c
-
-def latest_open_case_for_user(user_id: str) -> Optional[Dict[str, Any]]:
-    open_cases = [c for c in CASES.values() if c.get("status") == "OPEN" and c.get("initiator_user_id") == user_id]
-    open_cases.sort(key=lambda x: x.get("created_at", 0), reverse=True)
-    return open_cases[0] if open_cases else None
-
-def create_case(
-    *,
-    channel_id: str,
-    thread_ts: str,
-    initiator_user_id: str,
-    approver_user_id: str,
-    stakeholder_user_id: str,
-    ad_account_id: str,
-    account_name: str,
-) -> Dict[str, Any]:
-    case_id = new_case_id()
-    CASES[case_id] = {
-        "case_id": case_id,
-        "created_at": time.time(),
-        "status": "OPEN",
-        "channel_id": channel_id,
-        "thread_ts": thread_ts,
-        "panel_ts": None,
-        "initiator_user_id": initiator_user_id,
-        "approver_user_id": approver_user_id,
-        "stakeholder_user_id": stakeholder_user_id,
-        "ad_account_id": ad_account_id,
-        "account_name": account_name,
-        "offer": None,
-        "kpi": None,
-    }
-    return CASES[case_id]
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Set, Tuple, Union
+
+from app.store.base import new_case_id
+from app.store.models import Case, CaseStatus
+
+CASES: Dict[str, Case] = {}
+
+# What a case is currently indexed under, so a re-index can drop stale entries.
+_IndexKeys = Tuple[CaseStatus, str, float, str, str, Tuple[str, str]]
+
+class MemoryCaseStore:
+    """
+    Process-local store; the default, and what tests use. Cases are shared by
+    reference, so `save_case()` only has to refresh the secondary indexes.
+
+    Indexes: (status, initiator) -> [(created_at, case_id)] kept sorted,
+    ad account -> ids, approver -> ids and (channel, thread_ts) -> id. All
+    index maintenance happens under one lock together with the case write.
+    """
+
+    def __init__(self, cases: Optional[Dict[str, Case]] = None):
+        self.cases = CASES if cases is None else cases
+        self._lock = threading.RLock()
+        self._by_status_initiator: DefaultDict[Tuple[CaseStatus, str], List[Tuple[float, str]]] = defaultdict(list)
+        self._by_ad_account: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._by_approver: DefaultDict[str, Set[str]] = defaultdict(set)
+        self._by_thread: Dict[Tuple[str, str], str] = {}
+        self._indexed: Dict[str, _IndexKeys] = {}
+        for case in self.cases.values():
+            self._index(case)
+
+    def get_case(self, case_id: str) -> Case:
+        c = self.cases.get(case_id)
+        if not c:
+            raise ValueError(f"Unknown case_id: {case_id}")
+        return c
+
+    def save_case(self, case: Case) -> None:
+        with self._lock:
+            self.cases[case.case_id] = case
+            self._index(case)
+
+    def set_case_status(self, case: Case, status: Union[CaseStatus, str]) -> None:
+        with self._lock:
+            case.status = CaseStatus(status)
+            self.cases[case.case_id] = case
+            self._index(case)
+
+    def latest_open_case_for_user(self, user_id: str) -> Optional[Case]:
+        with self._lock:
+            entries = self._by_status_initiator.get((CaseStatus.OPEN, user_id))
+            return self.cases[entries[-1][1]] if entries else None
+
+    def cases_for_ad_account(self, ad_account_id: str) -> List[Case]:
+        with self._lock:
+            return [self.cases[i] for i in self._by_ad_account.get(ad_account_id, ())]
+
+    def cases_for_approver(self, user_id: str) -> List[Case]:
+        with self._lock:
+            return [self.cases[i] for i in self._by_approver.get(user_id, ())]
+
+    def case_for_thread(self, channel_id: str, thread_ts: str) -> Optional[Case]:
+        with self._lock:
+            case_id = self._by_thread.get((channel_id, thread_ts))
+            return self.cases[case_id] if case_id else None
+
+    def create_case(
+        self,
+        *,
+        channel_id: str,
+        thread_ts: str,
+        initiator_user_id: str,
+        approver_user_id: str,
+        stakeholder_user_id: str,
+        ad_account_id: str,
+        account_name: str,
+    ) -> Case:
+        with self._lock:
+            case_id = new_case_id()
+            while case_id in self.cases:
+                case_id = new_case_id()
+            case = Case.new(
+                case_id,
+                channel_id=channel_id,
+                thread_ts=thread_ts,
+                initiator_user_id=initiator_user_id,
+                approver_user_id=approver_user_id,
+                stakeholder_user_id=stakeholder_user_id,
+                ad_account_id=ad_account_id,
+                account_name=account_name,
+            )
+            self.cases[case_id] = case
+            self._index(case)
+        return case
+
+    def _index(self, case: Case) -> None:
+        case_id = case.case_id
+        keys: _IndexKeys = (
+            case.status,
+            case.initiator_user_id,
+            case.created_at,
+            case.ad_account_id,
+            case.approver_user_id,
+            (case.channel_id, case.thread_ts),
+        )
+        old = self._indexed.get(case_id)
+        if old == keys:
+            return
+        if old is not None:
+            self._unindex(case_id, old)
+        status, initiator, created_at, ad_account_id, approver, thread = keys
+        bisect.insort(self._by_status_initiator[(status, initiator)], (created_at, case_id))
+        self._by_ad_account[ad_account_id].add(case_id)
+        self._by_approver[approver].add(case_id)
+        self._by_thread[thread] = case_id
+        self._indexed[case_id] = keys
+
+    def _unindex(self, case_id: str, keys: _IndexKeys) -> None:
+        status, initiator, created_at, ad_account_id, approver, thread = keys
+        entries = self._by_status_initiator[(status, initiator)]
+        i = bisect.bisect_left(entries, (created_at, case_id))
+        if i < len(entries) and entries[i] == (created_at, case_id):
+            del entries[i]
+        if not entries:
+            del self._by_status_initiator[(status, initiator)]
+        _discard(self._by_ad_account, ad_account_id, case_id)
+        _discard(self._by_approver, approver, case_id)
+        if self._by_thread.get(thread) == case_id:
+            del self._by_thread[thread]
+
+def _discard(index: DefaultDict[str, Set[str]], key: str, case_id: str) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(case_id)
+        if not ids:
+            del index[key]
+
+_default = MemoryCaseStore(CASES)
+
+def get_case(case_id: str) -> Case:
+    return _default.get_case(case_id)
+
+def latest_open_case_for_user(user_id: str) -> Optional[Case]:
+    return _default.latest_open_case_for_user(user_id)
+
+def create_case(**kwargs: Any) -> Case:
+    return _default.create_case(**kwargs)
@@ -0,0 +1,148 @@
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
+
+class CaseStatus(str, Enum):
+    OPEN = "OPEN"
+    ACCEPTED = "ACCEPTED"
+    DECLINED = "DECLINED"
+    DISMISSED = "DISMISSED"
+
+@dataclass(slots=True)
+class Offer:
+    type: str = ""
+    details: str = ""
+    expiry: str = ""
+    notes: str = ""
+    created_by: str = ""
+    created_at: str = ""
+
+    def to_row(self) -> List[Any]:
+        return [self.type, self.details, self.expiry, self.notes, self.created_by, self.created_at]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "Offer":
+        return cls(*row)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Offer":
+        return cls(**{k: d.get(k) or "" for k in cls.__slots__})
+
+@dataclass(slots=True)
+class KpiSnapshot:
+    impressions: float = 0.0
+    streamed_impressions: float = 0.0
+    clicks: float = 0.0
+    ctr: float = 0.0
+    spend: float = 0.0
+    e_cpcl: float = 0.0
+    range: str = ""
+
+    def to_row(self) -> List[Any]:
+        return [self.impressions, self.streamed_impressions, self.clicks, self.ctr, self.spend, self.e_cpcl, self.range]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "KpiSnapshot":
+        return cls(*row)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "KpiSnapshot":
+        return cls(
+            **{k: float(d.get(k) or 0.0) for k in cls.__slots__ if k != "range"},
+            range=d.get("range", ""),
+        )
+
+@dataclass(slots=True)
+class Case:
+    """
+    A churn case. `to_row()`/`from_row()` are the storage format: a flat
+    positional list (nested offer/kpi as lists) that serializes without
+    repeating field names per case.
+
+    `revision` goes up on every field assignment except `panel_ts`, so
+    rendered panels can be cached per revision. Offer and KPI snapshots are
+    replaced, never edited in place.
+
+    `stored` is the stored document the case was loaded from, if the store
+    needs it to detect concurrent saves; it is not part of the case.
+    """
+
+    case_id: str
+    channel_id: str
+    thread_ts: str
+    initiator_user_id: str
+    approver_user_id: str
+    stakeholder_user_id: str
+    ad_account_id: str
+    account_name: str = ""
+    status: CaseStatus = CaseStatus.OPEN
+    created_at: float = 0.0
+    panel_ts: Optional[str] = None
+    offer: Optional[Offer] = None
+    kpi: Optional[KpiSnapshot] = None
+    revision: int = 0
+    stored: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name not in _UNVERSIONED:
+            object.__setattr__(self, "revision", getattr(self, "revision", 0) + 1)
+
+    @classmethod
+    def new(cls, case_id: str, **fields: Any) -> "Case":
+        return cls(case_id=case_id, created_at=time.time(), **fields)
+
+    def to_row(self) -> List[Any]:
+        return [
+            self.case_id,
+            self.channel_id,
+            self.thread_ts,
+            self.initiator_user_id,
+            self.approver_user_id,
+            self.stakeholder_user_id,
+            self.ad_account_id,
+            self.account_name,
+            self.status.value,
+            self.created_at,
+            self.panel_ts,
+            self.offer.to_row() if self.offer else None,
+            self.kpi.to_row() if self.kpi else None,
+            self.revision,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "Case":
+        status, created_at, panel_ts, offer, kpi = row[8:13]
+        return cls(
+            *row[:8],
+            status=CaseStatus(status),
+            created_at=created_at,
+            panel_ts=panel_ts,
+            offer=Offer.from_row(offer) if offer else None,
+            kpi=KpiSnapshot.from_row(kpi) if kpi else None,
+            revision=row[13] if len(row) > 13 else 0,
+        )
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Case":
+        return cls(
+            case_id=d["case_id"],
+            channel_id=d.get("channel_id", ""),
+            thread_ts=d.get("thread_ts", ""),
+            initiator_user_id=d["initiator_user_id"],
+            approver_user_id=d["approver_user_id"],
+            stakeholder_user_id=d["stakeholder_user_id"],
+            ad_account_id=d["ad_account_id"],
+            account_name=d.get("account_name") or "",
+            status=CaseStatus(d.get("status") or CaseStatus.OPEN),
+            created_at=d.get("created_at", 0.0),
+            panel_ts=d.get("panel_ts"),
+            offer=Offer.from_dict(d["offer"]) if d.get("offer") else None,
+            kpi=KpiSnapshot.from_dict(d["kpi"]) if d.get("kpi") else None,
+        )
+
+_UNVERSIONED = frozenset({"revision", "panel_ts", "stored"})
+
+def as_case(case: Union[Case, Dict[str, Any]]) -> Case:
+    return case if isinstance(case, Case) else Case.from_dict(case)
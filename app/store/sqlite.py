@@ -0,0 +1,199 @@
+import dataclasses
+import json
+import sqlite3
+import threading
+from typing import List, Optional, Union
+
+from app.store.base import new_case_id
+from app.store.models import Case, CaseStatus
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    initiator_user_id TEXT NOT NULL,
+    approver_user_id TEXT NOT NULL,
+    ad_account_id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    thread_ts TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_status_initiator ON cases (status, initiator_user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_cases_initiator ON cases (initiator_user_id);
+CREATE INDEX IF NOT EXISTS idx_cases_ad_account ON cases (ad_account_id);
+CREATE INDEX IF NOT EXISTS idx_cases_approver ON cases (approver_user_id);
+CREATE INDEX IF NOT EXISTS idx_cases_thread ON cases (channel_id, thread_ts);
+"""
+
+# Constant statement texts, so sqlite3's per-connection statement cache reuses
+# the compiled statements instead of re-preparing them.
+_INSERT = (
+    "INSERT INTO cases (case_id, created_at, status, initiator_user_id, approver_user_id, "
+    "ad_account_id, channel_id, thread_ts, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE = (
+    "UPDATE cases SET status = ?, initiator_user_id = ?, approver_user_id = ?, ad_account_id = ?, "
+    "channel_id = ?, thread_ts = ?, data = ? WHERE case_id = ?"
+)
+# Compare-and-swap on the stored document the case was loaded from.
+_UPDATE_IF = _UPDATE + " AND data = ?"
+_SELECT = "SELECT data FROM cases WHERE case_id = ?"
+_LATEST_OPEN = (
+    "SELECT data FROM cases WHERE status = 'OPEN' AND initiator_user_id = ? "
+    "ORDER BY created_at DESC LIMIT 1"
+)
+_BY_AD_ACCOUNT = "SELECT data FROM cases WHERE ad_account_id = ?"
+_BY_APPROVER = "SELECT data FROM cases WHERE approver_user_id = ?"
+_BY_THREAD = "SELECT data FROM cases WHERE channel_id = ? AND thread_ts = ? LIMIT 1"
+
+class SqliteCaseStore:
+    """
+    SQLite-backed store that several uvicorn worker processes can share.
+
+    The database runs in WAL mode, so readers never block the writer. Each
+    thread gets its own connection. `data` holds `Case.to_row()` as JSON; the
+    indexed columns are mirrored out of it on every save.
+
+    Saves are optimistic: a case only overwrites the row it was loaded from.
+    If another save got there first, the case's own changes are merged onto
+    the stored case field by field and the write is retried, so a handler
+    saving a stale copy cannot undo, say, a dismiss made in the meantime.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def get_case(self, case_id: str) -> Case:
+        row = self._conn().execute(_SELECT, (case_id,)).fetchone()
+        if not row:
+            raise ValueError(f"Unknown case_id: {case_id}")
+        return _load(row[0])
+
+    def save_case(self, case: Case) -> None:
+        while True:
+            data = _dump(case)
+            params = (
+                case.status.value,
+                case.initiator_user_id,
+                case.approver_user_id,
+                case.ad_account_id,
+                case.channel_id,
+                case.thread_ts,
+                data,
+                case.case_id,
+            )
+            with self._conn() as conn:
+                if case.stored is None:
+                    conn.execute(_UPDATE, params)
+                    saved = True
+                else:
+                    saved = conn.execute(_UPDATE_IF, (*params, case.stored)).rowcount == 1
+            if saved:
+                case.stored = data
+                return
+            self._rebase(case)
+
+    def _rebase(self, case: Case) -> None:
+        """
+        Replaces the case's fields with the stored ones, keeping those it
+        changed since it was loaded. The merged revision is above both, so a
+        revision still identifies one content.
+        """
+        row = self._conn().execute(_SELECT, (case.case_id,)).fetchone()
+        if not row:
+            raise ValueError(f"Unknown case_id: {case.case_id}")
+        base, mine, theirs = _load(case.stored).to_row(), case.to_row(), _load(row[0]).to_row()
+        merged = [m if m != b else t for b, m, t in zip(base, mine, theirs)]
+        merged[-1] = max(mine[-1], theirs[-1]) + 1
+        current = Case.from_row(merged)
+        for f in dataclasses.fields(Case):
+            object.__setattr__(case, f.name, getattr(current, f.name))
+        case.stored = row[0]
+
+    def set_case_status(self, case: Case, status: Union[CaseStatus, str]) -> None:
+        case.status = CaseStatus(status)
+        self.save_case(case)
+
+    def latest_open_case_for_user(self, user_id: str) -> Optional[Case]:
+        row = self._conn().execute(_LATEST_OPEN, (user_id,)).fetchone()
+        return _load(row[0]) if row else None
+
+    def cases_for_ad_account(self, ad_account_id: str) -> List[Case]:
+        return [_load(r[0]) for r in self._conn().execute(_BY_AD_ACCOUNT, (ad_account_id,))]
+
+    def cases_for_approver(self, user_id: str) -> List[Case]:
+        return [_load(r[0]) for r in self._conn().execute(_BY_APPROVER, (user_id,))]
+
+    def case_for_thread(self, channel_id: str, thread_ts: str) -> Optional[Case]:
+        row = self._conn().execute(_BY_THREAD, (channel_id, thread_ts)).fetchone()
+        return _load(row[0]) if row else None
+
+    def create_case(
+        self,
+        *,
+        channel_id: str,
+        thread_ts: str,
+        initiator_user_id: str,
+        approver_user_id: str,
+        stakeholder_user_id: str,
+        ad_account_id: str,
+        account_name: str,
+    ) -> Case:
+        case = Case.new(
+            "",
+            channel_id=channel_id,
+            thread_ts=thread_ts,
+            initiator_user_id=initiator_user_id,
+            approver_user_id=approver_user_id,
+            stakeholder_user_id=stakeholder_user_id,
+            ad_account_id=ad_account_id,
+            account_name=account_name,
+        )
+        while True:
+            case.case_id = new_case_id()
+            data = _dump(case)
+            try:
+                with self._conn() as conn:
+                    conn.execute(
+                        _INSERT,
+                        (
+                            case.case_id,
+                            case.created_at,
+                            case.status.value,
+                            initiator_user_id,
+                            approver_user_id,
+                            ad_account_id,
+                            channel_id,
+                            thread_ts,
+                            data,
+                        ),
+                    )
+                case.stored = data
+                return case
+            except sqlite3.IntegrityError:
+                continue
+
+def _dump(case: Case) -> str:
+    return json.dumps(case.to_row(), separators=(",", ":"))
+
+def _load(data: str) -> Case:
+    row = json.loads(data)
+    # Rows written before the Case model stored the case dict itself.
+    case = Case.from_dict(row) if isinstance(row, dict) else Case.from_row(row)
+    case.stored = data
+    return case
@@ -0,0 +1,239 @@
+import asyncio
+import bisect
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Upper bounds (seconds) shared by every latency histogram.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@dataclass
+class _Series:
+    counts: List[int]
+    total: float = 0.0
+
+class Histogram:
+    """
+    Prometheus-style histogram keyed by label values. `observe()` is a bisect
+    and two additions under a lock, cheap enough for per-page hot paths.
+    """
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _Series(counts=[0] * (len(self.buckets) + 1))
+            series.counts[i] += 1
+            series.total += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series.counts) if series else 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(s.counts), s.total) for labels, s in sorted(self._series.items())]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in snapshot:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            prefix = base + "," if base else ""
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {total!r}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+@dataclass
+class Registry:
+    histograms: Dict[str, Histogram] = field(default_factory=dict)
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str]) -> Histogram:
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms.setdefault(name, Histogram(name, help, label_names))
+        return hist
+
+    def render(self) -> str:
+        """
+        Every histogram in the Prometheus text exposition format.
+        """
+        return "\n".join(line for hist in self.histograms.values() for line in hist.render()) + "\n"
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "churn_stage_duration_seconds",
+    "Time spent in a pipeline stage (ads fetch, metrics, chart, PDF, upload).",
+    ("stage", "handler", "callback_id"),
+)
+SLACK_API_SECONDS = REGISTRY.histogram(
+    "churn_slack_api_duration_seconds",
+    "Slack Web API calls, including time waiting for the outbound scheduler.",
+    ("method", "outcome", "handler", "callback_id"),
+)
+LISTENER_SECONDS = REGISTRY.histogram(
+    "churn_bolt_listener_duration_seconds",
+    "Bolt listener runs, from call to return.",
+    ("handler", "callback_id", "outcome"),
+)
+
+# (handler, callback_id) of the Slack request being served; copied into
+# threads started with copy_context() and into asyncio tasks.
+_tags: contextvars.ContextVar[Tuple[str, str]] = contextvars.ContextVar("telemetry_tags", default=("", ""))
+
+def current_tags() -> Tuple[str, str]:
+    return _tags.get()
+
+def set_tags(handler: str, callback_id: str = "") -> None:
+    """
+    Tags the rest of the current context. Bolt middleware cannot wrap the
+    listener (its `next()` only flags that the chain may continue), so it sets
+    the tags for the remainder of the dispatch instead.
+    """
+    _tags.set((handler, callback_id))
+
+@contextmanager
+def tagged(handler: str, callback_id: str = "") -> Iterator[None]:
+    token = _tags.set((handler, callback_id))
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+class span:
+    """
+    Records the time spent in the block under `stage`, tagged with the
+    current handler and callback_id. A plain class rather than a
+    @contextmanager generator, which costs twice as much per use.
+    """
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.stage, *_tags.get())
+
+def timed(stage: str) -> Callable[[F], F]:
+    """
+    Decorator form of span().
+    """
+
+    def decorate(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage, *_tags.get())
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+def observe_stage(stage: str, seconds: float, tags: Optional[Tuple[str, str]] = None) -> None:
+    """
+    For durations measured elsewhere, e.g. by another process or thread.
+    """
+    STAGE_SECONDS.observe(seconds, stage, *(tags or _tags.get()))
+
+@contextmanager
+def slack_api_span(method: str) -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        SLACK_API_SECONDS.observe(time.perf_counter() - started, method, outcome, *_tags.get())
+
+@contextmanager
+def listener_span() -> Iterator[None]:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        LISTENER_SECONDS.observe(time.perf_counter() - started, *_tags.get(), outcome)
+
+def timed_listener(fn: F) -> F:
+    """
+    Times a Bolt listener (sync or async). Goes under the `@app.command()`
+    style decorator; Bolt unwraps it to find the listener's arguments.
+    """
+    if asyncio.iscoroutinefunction(fn):
+
+        @wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with listener_span():
+                return await fn(*args, **kwargs)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with listener_span():
+            return fn(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+class ListenerExecutor(ThreadPoolExecutor):
+    """
+    Bolt listener executor that runs each listener in a copy of the
+    dispatching thread's context, so its spans keep the request's tags.
+    """
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def bolt_tags(body: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    (handler, callback_id) for a Slack request body: the slash command,
+    `block_actions:<action_id>`, `view_submission`, `event:<type>`, ...
+    """
+    if body.get("command"):
+        return body["command"], ""
+    kind = body.get("type") or ""
+    callback_id = body.get("callback_id") or (body.get("view") or {}).get("callback_id") or ""
+    if kind == "block_actions":
+        actions = body.get("actions") or [{}]
+        return f"block_actions:{actions[0].get('action_id', '')}", callback_id
+    if kind == "event_callback":
+        return f"event:{(body.get('event') or {}).get('type', '')}", ""
+    return kind, callback_id
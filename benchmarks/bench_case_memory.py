@@ -0,0 +1,79 @@
+"""
+Resident memory per case: the old dict-of-dicts layout versus the slotted
+Case/Offer/KpiSnapshot model, with every case carrying an offer and a KPI
+snapshot.
+
+    python -m benchmarks.bench_case_memory [--cases 200000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app.store.models import Case, CaseStatus, KpiSnapshot, Offer
+
+def make_fields(i: int):
+    return dict(
+        case_id=f"{i:06X}",
+        channel_id=f"C{i % 50:08d}",
+        thread_ts=f"{1_700_000_000 + i}.000100",
+        initiator_user_id=f"U{i % 5000:08d}",
+        approver_user_id=f"U{i % 500:08d}",
+        stakeholder_user_id=f"U{i % 700:08d}",
+        ad_account_id=f"{i:08x}-0000-4000-8000-000000000000",
+        account_name=f"Account {i}",
+    )
+
+def as_dict(i: int):
+    return {
+        **make_fields(i),
+        "created_at": time.time(),
+        "status": "OPEN",
+        "panel_ts": f"{1_700_000_000 + i}.000200",
+        "offer": {
+            "type": "DISCOUNT",
+            "details": "10% off next flight",
+            "expiry": "2099-01-01",
+            "notes": "",
+            "created_by": f"U{i % 500:08d}",
+            "created_at": "2024-06-01T10:00:00",
+        },
+        "kpi": {
+            "impressions": float(i), "streamed_impressions": float(i), "clicks": float(i),
+            "ctr": 0.01, "spend": float(i), "e_cpcl": 1.5, "range": "2024-05-01 → 2024-05-30",
+        },
+    }
+
+def as_model(i: int):
+    return Case(
+        **make_fields(i),
+        status=CaseStatus.OPEN,
+        created_at=time.time(),
+        panel_ts=f"{1_700_000_000 + i}.000200",
+        offer=Offer("DISCOUNT", "10% off next flight", "2099-01-01", "", f"U{i % 500:08d}", "2024-06-01T10:00:00"),
+        kpi=KpiSnapshot(float(i), float(i), float(i), 0.01, float(i), 1.5, "2024-05-01 → 2024-05-30"),
+    )
+
+def measure(make, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    cases = [make(i) for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cases
+    return size / n
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=200_000)
+    args = parser.parse_args()
+
+    before = measure(as_dict, args.cases)
+    after = measure(as_model, args.cases)
+    print(f"dict cases    {before:7.0f} B/case")
+    print(f"slotted Case  {after:7.0f} B/case")
+    print(f"saved         {before - after:7.0f} B/case ({(before - after) / before:.1%}), "
+          f"{(before - after) * args.cases / 2**20:.0f} MiB at {args.cases:,} cases")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Lookup latency of the in-memory case store's secondary indexes versus the
+full scans they replaced, at 10^5 and 10^6 cases.
+
+    python -m benchmarks.bench_case_store [--sizes 100000 1000000] [--lookups 2000]
+"""
+import argparse
+import random
+import time
+
+from app.store.memory import MemoryCaseStore
+
+USERS = 5_000
+ACCOUNTS = 20_000
+
+def populate(n: int) -> MemoryCaseStore:
+    rng = random.Random(n)
+    store = MemoryCaseStore({})
+    for i in range(n):
+        case = store.create_case(
+            channel_id=f"C{i % 50}",
+            thread_ts=f"{1_700_000_000 + i}.000100",
+            initiator_user_id=f"U{rng.randrange(USERS)}",
+            approver_user_id=f"A{rng.randrange(USERS // 10)}",
+            stakeholder_user_id="S1",
+            ad_account_id=f"acc-{rng.randrange(ACCOUNTS)}",
+            account_name="Bench",
+        )
+        if rng.random() < 0.7:
+            store.set_case_status(case, rng.choice(("DISMISSED", "ACCEPTED", "DECLINED")))
+    return store
+
+def scan_latest_open(store: MemoryCaseStore, user_id: str):
+    open_cases = [c for c in store.cases.values() if c.status == "OPEN" and c.initiator_user_id == user_id]
+    open_cases.sort(key=lambda x: x.created_at, reverse=True)
+    return open_cases[0] if open_cases else None
+
+def scan_thread(store: MemoryCaseStore, channel_id: str, thread_ts: str):
+    return next((c for c in store.cases.values() if c.channel_id == channel_id and c.thread_ts == thread_ts), None)
+
+def timed(fn, args_list) -> float:
+    t0 = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t0) / len(args_list)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--scans", type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        t0 = time.perf_counter()
+        store = populate(n)
+        build = time.perf_counter() - t0
+        rng = random.Random(0)
+        users = [(f"U{rng.randrange(USERS)}",) for _ in range(args.lookups)]
+        accounts = [(f"acc-{rng.randrange(ACCOUNTS)}",) for _ in range(args.lookups)]
+        threads = [(f"C{i % 50}", f"{1_700_000_000 + i}.000100") for i in (rng.randrange(n) for _ in range(args.lookups))]
+
+        print(f"n={n:,}  populate {build:.1f}s ({build / n * 1e6:.1f} us/case incl. status change)")
+        rows = (
+            ("latest_open_case_for_user", store.latest_open_case_for_user, scan_latest_open, users),
+            ("case_for_thread", store.case_for_thread, scan_thread, threads),
+            ("cases_for_ad_account", store.cases_for_ad_account, None, accounts),
+        )
+        for name, indexed, scan, lookup_args in rows:
+            fast = timed(indexed, lookup_args)
+            line = f"  {name:<26} indexed {fast * 1e6:8.2f} us"
+            if scan is not None:
+                slow = timed(lambda *a, scan=scan, store=store: scan(store, *a), lookup_args[: args.scans])
+                line += f"   scan {slow * 1e3:9.2f} ms   ({slow / fast:,.0f}x)"
+            print(line)
+
+if __name__ == "__main__":
+    main()
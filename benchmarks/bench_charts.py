@@ -0,0 +1,46 @@
+"""
+Compares chart backends for build_pdf_report: wall time per report and PDF size.
+
+    python -m benchmarks.bench_charts [--reports 20] [--days 30]
+"""
+import argparse
+import datetime as dt
+import time
+
+from app.reporting.metrics import MetricsSpec, compute_metrics
+from app.reporting.pdf import build_pdf_report
+from app.reporting.synthetic import SyntheticAdsGenerator
+
+SPEC = MetricsSpec(kpis=True, top=(("SPEND", 5), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    end = dt.date(2024, 6, 30)
+    start = end - dt.timedelta(days=args.days - 1)
+    report = SyntheticAdsGenerator(seed=1).generate(
+        "bench", "AD_SET", ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"], start, end
+    )
+    metrics = compute_metrics(report, SPEC)
+
+    for backend in ("reportlab", "matplotlib"):
+        build = lambda backend=backend: build_pdf_report(  # noqa: E731
+            ad_account_id="bench",
+            entity_type="AD_SET",
+            report_start=int(report.days[0]),
+            report_end=int(report.days[-1]),
+            chart_backend=backend,
+            **metrics.pdf_inputs(),
+        )
+        size = len(build())
+        t0 = time.perf_counter()
+        for _ in range(args.reports):
+            build()
+        per_report = (time.perf_counter() - t0) / args.reports
+        print(f"{backend:<11} {per_report * 1000:8.1f} ms/report  {size / 1024:8.1f} KiB")
+
+if __name__ == "__main__":
+    main()
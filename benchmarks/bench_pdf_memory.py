@@ -0,0 +1,117 @@
+"""
+Peak RSS of concurrent finance snapshots (render, then upload), with the PDF
+held as bytes and sent through files_upload_v2 versus spooled to a temporary
+file and streamed (PDF_STREAM_UPLOADS). Uploads go to a local receiver that
+reads at --kib-per-s per upload, so they take as long as on a slow link; each
+mode runs in a fresh process.
+
+    python -m benchmarks.bench_pdf_memory [--concurrency 16] [--snapshots 64] [--backend matplotlib] [--kib-per-s 512]
+"""
+import argparse
+import datetime as dt
+import http.server
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = ("bytes", "stream")
+CHUNK = 16 * 1024
+
+def serve(kib_per_s: float) -> http.server.ThreadingHTTPServer:
+    class Receiver(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            remaining = int(self.headers["Content-Length"])
+            while remaining:
+                remaining -= len(self.rfile.read(min(CHUNK, remaining)))
+                time.sleep(CHUNK / 1024 / kib_per_s)
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"OK")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def max_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def child(args) -> None:
+    from app.reporting.metrics import MetricsSpec, compute_metrics
+    from app.reporting.pdf import build_pdf_report, spool_pdf_report
+    from app.reporting.synthetic import SyntheticAdsGenerator
+    from app.slack.uploads import upload_file
+    from benchmarks.fake_slack import FakeWebClient
+
+    end = dt.date(2024, 6, 30)
+    start = end - dt.timedelta(days=args.days - 1)
+    report = SyntheticAdsGenerator(seed=1).generate(
+        "bench", "AD_SET", ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"], start, end
+    )
+    spec = MetricsSpec(top=(("SPEND", 5), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+    render_kwargs = dict(
+        ad_account_id="bench",
+        entity_type="AD_SET",
+        report_start=int(report.days[0]),
+        report_end=int(report.days[-1]),
+        chart_backend=args.backend,
+        **compute_metrics(report, spec).pdf_inputs(),
+    )
+    client = FakeWebClient(upload_url=args.url)
+    size = len(build_pdf_report(**render_kwargs))
+    warm = max_rss_mib()
+
+    def snapshot(i: int) -> None:
+        upload_kwargs = dict(filename=f"snapshot_{i}.pdf", channel="C_BENCH")
+        if args.mode == "stream":
+            with spool_pdf_report(**render_kwargs) as pdf:
+                upload_file(client, pdf, **upload_kwargs)
+        else:
+            upload_file(client, build_pdf_report(**render_kwargs), **upload_kwargs)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(snapshot, range(args.snapshots)))
+    print(json.dumps({"size": size, "warm": warm, "peak": max_rss_mib(), "seconds": time.perf_counter() - t0}))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--snapshots", type=int, default=64)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--backend", default="matplotlib")
+    parser.add_argument("--kib-per-s", type=float, default=512)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args)
+        return
+
+    server = serve(args.kib_per_s)
+    url = f"http://127.0.0.1:{server.server_port}/upload"
+    print(f"{args.snapshots} snapshots, {args.concurrency} concurrent, {args.backend} charts, "
+          f"uploads at {args.kib_per_s:g} KiB/s")
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pdf_memory", "--mode", mode, "--url", url,
+             *sys.argv[1:]],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(out)
+        print(f"{mode:<7} PDF {r['size'] / 1024:6.1f} KiB  RSS after warm-up {r['warm']:6.1f} MiB  "
+              f"peak {r['peak']:6.1f} MiB (+{r['peak'] - r['warm']:5.1f})  {r['seconds']:5.1f} s")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
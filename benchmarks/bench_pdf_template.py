@@ -0,0 +1,50 @@
+"""
+Per-report CPU of build_pdf_report with the shared compiled template versus a
+template rebuilt for every report (the previous behaviour).
+
+    python -m benchmarks.bench_pdf_template [--reports 200]
+"""
+import argparse
+import datetime as dt
+import time
+
+from app.reporting.metrics import MetricsSpec, compute_metrics
+from app.reporting.pdf import build_pdf_report
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.template import ReportTemplate, get_report_template
+
+SPEC = MetricsSpec(kpis=True, top=(("SPEND", 5), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=200)
+    args = parser.parse_args()
+
+    report = SyntheticAdsGenerator(seed=1).generate(
+        "bench", "AD_SET", ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"],
+        dt.date(2024, 6, 1), dt.date(2024, 6, 30),
+    )
+    inputs = dict(
+        ad_account_id="bench",
+        entity_type="AD_SET",
+        report_start=int(report.days[0]),
+        report_end=int(report.days[-1]),
+        case_id="BENCH1",
+        **compute_metrics(report, SPEC).pdf_inputs(),
+    )
+    get_report_template()
+
+    results = {}
+    for label, make_template in (("per-report", ReportTemplate), ("compiled", get_report_template)):
+        build_pdf_report(template=make_template(), **inputs)
+        t0 = time.process_time()
+        for _ in range(args.reports):
+            build_pdf_report(template=make_template(), **inputs)
+        results[label] = (time.process_time() - t0) / args.reports
+        print(f"{label:<11} {results[label] * 1000:7.2f} ms CPU/report")
+
+    saved = results["per-report"] - results["compiled"]
+    print(f"saved       {saved * 1000:7.2f} ms CPU/report ({saved / results['per-report']:.1%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Churn-risk scoring time for a portfolio of synthetic accounts: building the
+(account × day) matrices from scan results and scoring them.
+
+    python -m benchmarks.bench_risk [--accounts 1000 10000] [--days 28] [--repeat 5]
+"""
+import argparse
+import datetime as dt
+import time
+
+import numpy as np
+
+from app.reporting.metrics import KPI, MetricsResult
+from app.reporting.portfolio import AccountScan, PortfolioScan
+from app.reporting.risk import DailyMatrix, score_matrix, score_portfolio
+from app.reporting.utils import epoch_day
+
+def synthetic_scan(accounts: int, days: int, seed: int = 0) -> PortfolioScan:
+    rng = np.random.default_rng(seed)
+    start = epoch_day(dt.date(2024, 1, 1))
+    dates = list(range(start, start + days))
+    trend = 1 + rng.uniform(-0.03, 0.01, size=(accounts, 1)) * np.arange(days)
+    spend = np.clip(rng.uniform(50, 500, size=(accounts, 1)) * trend * rng.uniform(0.8, 1.2, (accounts, days)), 0, None)
+    imps = spend * rng.uniform(80, 120, size=(accounts, days))
+    clicks = imps * rng.uniform(0.002, 0.01, size=(accounts, 1))
+    scans = []
+    for i in range(accounts):
+        total = float(spend[i].sum())
+        scans.append(AccountScan(f"acc-{i}", metrics=MetricsResult(
+            kpi=KPI(int(imps[i].sum()), 0, int(clicks[i].sum()), total, 0.0, 0.0),
+            top={"SPEND": [(f"e{k}", total * share) for k, share in enumerate(rng.dirichlet(np.ones(8))[:3])]},
+            series={
+                "SPEND": list(zip(dates, spend[i].tolist())),
+                "IMPRESSIONS": list(zip(dates, imps[i].tolist())),
+                "CLICKS": list(zip(dates, clicks[i].tolist())),
+            },
+        )))
+    return PortfolioScan(accounts=scans, elapsed_seconds=0.0, max_concurrency=1, peak_concurrency=1)
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.accounts:
+        scan = synthetic_scan(n, args.days)
+        matrix = DailyMatrix.from_scan(scan)
+        build = best_of(lambda scan=scan: DailyMatrix.from_scan(scan), args.repeat)
+        score = best_of(lambda matrix=matrix: score_matrix(matrix), args.repeat)
+        total = best_of(lambda scan=scan: score_portfolio(scan), args.repeat)
+        print(
+            f"accounts={n:,} days={args.days}  matrix {build * 1e3:7.1f} ms   "
+            f"score {score * 1e3:6.2f} ms   end-to-end (incl. ranking) {total * 1e3:7.1f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-call cost of the telemetry spans, and their share of a snapshot's
+metrics and PDF stages (which are what they wrap).
+
+    python -m benchmarks.bench_telemetry [--calls 200000] [--days 30] [--entities 200]
+"""
+import argparse
+import datetime as dt
+import time
+
+from app.reporting.ads_client import MockSpotifyAdsApi, iter_report_pages
+from app.reporting.metrics import MetricsSpec, stream_metrics
+from app.reporting.pdf import build_pdf_report
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import epoch_day, iso_utc_start_of_day
+from app.telemetry import REGISTRY, STAGE_SECONDS, span, tagged, timed
+
+def per_call_ns(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls * 1e9
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--entities", type=int, default=200)
+    args = parser.parse_args()
+
+    def noop():
+        pass
+
+    @timed("bench")
+    def timed_noop():
+        pass
+
+    def span_noop():
+        with span("bench"):
+            pass
+
+    base = per_call_ns(noop, args.calls)
+    with tagged("/bench", "bench_modal"):
+        deco = per_call_ns(timed_noop, args.calls) - base
+        ctx = per_call_ns(span_noop, args.calls) - base
+    print(f"overhead per call: @timed {deco:6.0f} ns   span() {ctx:6.0f} ns")
+
+    api = MockSpotifyAdsApi(generator=SyntheticAdsGenerator(seed=1))
+    end = dt.date(2024, 6, 30)
+    start = end - dt.timedelta(days=args.days - 1)
+    pages = list(iter_report_pages(
+        api,
+        ad_account_id="bench",
+        entity_type="AD_SET",
+        fields=["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"],
+        report_start=iso_utc_start_of_day(start),
+        report_end=iso_utc_start_of_day(end + dt.timedelta(days=1)),
+        limit=50,
+    ))
+    spec = MetricsSpec(top=(("SPEND", 5), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+    STAGE_SECONDS.reset()
+    t0 = time.perf_counter()
+    metrics = stream_metrics(pages, spec)
+    build_pdf_report(
+        ad_account_id="bench",
+        entity_type="AD_SET",
+        report_start=epoch_day(start),
+        report_end=epoch_day(end),
+        **metrics.pdf_inputs(),
+    )
+    elapsed = time.perf_counter() - t0
+    spans = sum(STAGE_SECONDS.count(stage, "", "") for stage in ("metrics.stream_metrics", "chart_render", "build_pdf_report"))
+    print(f"snapshot ({len(pages)} pages): {elapsed * 1e3:.1f} ms, {spans} spans, "
+          f"span cost ~{spans * max(deco, ctx) / (elapsed * 1e9):.4%} of it")
+    print(f"/metrics body: {len(REGISTRY.render()):,} bytes")
+
+if __name__ == "__main__":
+    main()
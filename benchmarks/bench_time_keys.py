@@ -0,0 +1,90 @@
+"""
+Cost of the reporting pipeline's time keys: ISO strings parsed with strptime
+and formatted per row (before) versus integer epoch days with ISO conversion
+only at the edges (now).
+
+    python -m benchmarks.bench_time_keys [--days 90] [--entities 200] [--repeat 5]
+"""
+import argparse
+import datetime as dt
+import time
+from typing import Dict, List
+
+from app.reporting.ads_client import AggregateRow
+from app.reporting.metrics import daily_series
+from app.reporting.utils import epoch_day, epoch_day_from_iso, iso_utc_from_epoch_day, iso_utc_start_of_day
+
+def legacy_daterange(start: dt.date, end_inclusive: dt.date) -> List[dt.date]:
+    days = []
+    cur = start
+    while cur <= end_inclusive:
+        days.append(cur)
+        cur += dt.timedelta(days=1)
+    return days
+
+def legacy_format(days: List[dt.date], entities: int) -> List[str]:
+    # Two strings per row, as the row-based mock API used to build them.
+    out = []
+    for day in days:
+        for _ in range(entities):
+            out.append(iso_utc_start_of_day(day))
+            out.append(iso_utc_start_of_day(day + dt.timedelta(days=1)))
+    return out
+
+def epoch_format(days: range, entities: int) -> List[str]:
+    out = []
+    for day in days:
+        start_time, end_time = iso_utc_from_epoch_day(day), iso_utc_from_epoch_day(day + 1)
+        for _ in range(entities):
+            out.append(start_time)
+            out.append(end_time)
+    return out
+
+def legacy_daily_series(rows: List[AggregateRow], metric: str):
+    by_day: Dict[dt.date, float] = {}
+    for r in rows:
+        d = dt.datetime.strptime(r.start_time, "%Y-%m-%dT%H:%M:%SZ").date()
+        by_day[d] = by_day.get(d, 0.0) + float(r.stats.get(metric, 0.0))
+    return sorted(by_day.items(), key=lambda x: x[0])
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    end = dt.date(2024, 6, 30)
+    start = end - dt.timedelta(days=args.days - 1)
+    day_range = range(epoch_day(start), epoch_day(end) + 1)
+    rows = [
+        AggregateRow("AD", f"e{e}", f"Ad {e}", "ACTIVE", start_time, "", {"SPEND": 1.0})
+        for day in day_range
+        for start_time in (iso_utc_from_epoch_day(day),)
+        for e in range(args.entities)
+    ]
+    n = len(rows)
+
+    cases = (
+        ("day range", lambda: legacy_daterange(start, end), lambda: list(day_range)),
+        ("format row timestamps", lambda: legacy_format(legacy_daterange(start, end), args.entities),
+         lambda: epoch_format(day_range, args.entities)),
+        ("parse row start_time", lambda: [dt.datetime.strptime(r.start_time, "%Y-%m-%dT%H:%M:%SZ").date() for r in rows],
+         lambda: [epoch_day_from_iso(r.start_time) for r in rows]),
+        ("daily_series over rows", lambda: legacy_daily_series(rows, "SPEND"), lambda: daily_series(rows, "SPEND")),
+    )
+    print(f"{args.days} days x {args.entities} entities = {n:,} rows")
+    for label, before, after in cases:
+        b, a = best_of(before, args.repeat), best_of(after, args.repeat)
+        print(f"  {label:<24} before {b * 1e3:8.2f} ms   now {a * 1e3:8.2f} ms   ({b / a:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+In-process stand-in for Slack's Web API, for benchmarking handlers without a
+network: every call succeeds immediately with a plausible response.
+"""
+import itertools
+from collections import Counter
+from typing import Any, Optional
+
+from slack_sdk import WebClient
+from slack_sdk.web import SlackResponse
+from slack_sdk.web.file_upload_v2_result import FileUploadV2Result
+
+class FakeWebClient(WebClient):
+    """
+    WebClient whose API calls never leave the process. The real client code
+    (argument handling, files_upload_v2's three steps) still runs; only the
+    HTTP round trips are replaced. `calls` counts calls per API method.
+
+    With `upload_url`, file bodies really are POSTed there (e.g. to a local
+    receiver), so an upload takes as long as the receiver makes it.
+    """
+
+    def __init__(self, upload_url: Optional[str] = None, **kwargs: Any):
+        super().__init__(token="xoxb-fake", **kwargs)
+        self.upload_url = upload_url
+        self.calls: Counter = Counter()
+        self.uploaded_bytes = 0
+        self._ids = itertools.count(1)
+
+    def api_call(self, api_method: str, **kwargs: Any) -> SlackResponse:
+        self.calls[api_method] += 1
+        n = next(self._ids)
+        data = {
+            "ok": True,
+            "ts": f"1700000000.{n:06d}",
+            "channel": "C_FAKE",
+            "user_id": "U_BOT",
+            "bot_id": "B_BOT",
+            "team_id": "T_FAKE",
+            "file_id": f"F{n:09d}",
+            "upload_url": self.upload_url or f"https://files.invalid/upload/{n}",
+            "files": [{"id": f"F{n:09d}"}],
+        }
+        return SlackResponse(
+            client=self,
+            http_verb="POST",
+            api_url=api_method,
+            req_args=kwargs,
+            data=data,
+            headers={},
+            status_code=200,
+        )
+
+    def _upload_file(self, *, url: str, data: bytes, **kwargs: Any) -> FileUploadV2Result:
+        self.uploaded_bytes += len(data)
+        if self.upload_url:
+            return super()._upload_file(url=url, data=data, **kwargs)
+        return FileUploadV2Result(status=200, body="OK - fake")
@@ -0,0 +1,330 @@
+"""
+Benchmark suite for the reporting pipeline and the Slack handlers, with
+saved baselines.
+
+    python -m benchmarks.suite                     # run, compare with the baseline
+    python -m benchmarks.suite --save              # run and store as the baseline
+    python -m benchmarks.suite -k metrics --threshold 0.1
+
+Each case is timed with timeit: the number of calls per sample grows until a
+sample takes at least 0.2 s, and the best of `--repeat` samples is kept.
+The run fails (exit status 1) when a case is more than `--threshold`
+(relative) slower than its baseline. Baselines are machine-specific and
+are not committed; save one on the machine that runs the comparison.
+"""
+import argparse
+import datetime as dt
+import functools
+import itertools
+import json
+import os
+import platform
+import sys
+import timeit
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+# Settings are read at import; pin what the handlers depend on.
+os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-bench")
+os.environ.setdefault("SLACK_SIGNING_SECRET", "bench-signing-secret")
+os.environ.setdefault("ADS_MOCK_SEED", "1")
+os.environ["PANEL_UPDATE_WINDOW_SECONDS"] = "0"
+os.environ["PDF_RENDER_WORKERS"] = "0"
+
+from slack_sdk import WebClient
+
+from app.reporting.ads_client import MockSpotifyAdsApi, iter_report_pages
+from app.reporting.metrics import (
+    MetricsSpec,
+    aggregate_kpis,
+    compute_metrics,
+    daily_series,
+    stream_metrics,
+    top_entities,
+)
+from app.reporting.pdf import build_pdf_report
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import epoch_day, iso_utc_start_of_day
+from app.slack.blocks import case_controls_blocks
+from app.store.cases import create_case
+from app.store.models import Offer
+from benchmarks.fake_slack import FakeWebClient
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+FIELDS = ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"]
+END = dt.date(2024, 6, 30)
+
+# (entities, days) per mock report size.
+REPORT_SIZES = {"small": (10, 30), "medium": (200, 90), "large": (2_000, 365)}
+
+SNAPSHOT_SPEC = MetricsSpec(top=(("SPEND", 5), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+
+@dataclass
+class Result:
+    name: str
+    seconds: float
+    calls: int
+
+CASES: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+def case(name: str):
+    """
+    Registers a setup function that returns the operation to time.
+    """
+
+    def register(setup: Callable[[], Callable[[], Any]]):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+def _generate(size: str):
+    entities, days = REPORT_SIZES[size]
+    generator = SyntheticAdsGenerator(seed=1, entity_counts={"AD": entities})
+    start = END - dt.timedelta(days=days - 1)
+    return lambda: generator.generate("bench", "AD", FIELDS, start, END)
+
+for _size in REPORT_SIZES:
+    case(f"mock_report.columnar.{_size}")(functools.partial(_generate, _size))
+
+@case("mock_report.random_rows")
+def _random_rows():
+    api = MockSpotifyAdsApi()
+    start, end = iso_utc_start_of_day(END - dt.timedelta(days=29)), iso_utc_start_of_day(END)
+    return lambda: api.get_aggregate_report_by_ad_account_id("bench", "AD_SET", FIELDS, start, end)
+
+METRICS_FUNCTIONS: Dict[str, Callable[[Any], Any]] = {
+    "aggregate_kpis": aggregate_kpis,
+    "top_entities": lambda r: top_entities(r, "SPEND", 5),
+    "daily_series": lambda r: daily_series(r, "SPEND"),
+    "compute_metrics": lambda r: compute_metrics(r, SNAPSHOT_SPEC),
+}
+
+def _metrics(name: str, rows: bool):
+    report = _generate("medium")()
+    data = report.rows if rows else report
+    fn = METRICS_FUNCTIONS[name]
+    return lambda: fn(data)
+
+for _name in METRICS_FUNCTIONS:
+    case(f"metrics.{_name}.columnar")(functools.partial(_metrics, _name, False))
+    case(f"metrics.{_name}.rows")(functools.partial(_metrics, _name, True))
+
+@case("metrics.stream_metrics")
+def _stream_metrics():
+    api = MockSpotifyAdsApi(generator=SyntheticAdsGenerator(seed=1, entity_counts={"AD_SET": 200}))
+    pages = list(iter_report_pages(
+        api,
+        ad_account_id="bench",
+        entity_type="AD_SET",
+        fields=FIELDS,
+        report_start=iso_utc_start_of_day(END - dt.timedelta(days=89)),
+        report_end=iso_utc_start_of_day(END),
+        limit=50,
+    ))
+    return lambda: stream_metrics(pages, SNAPSHOT_SPEC)
+
+def _pdf(**extra):
+    start = END - dt.timedelta(days=29)
+    report = SyntheticAdsGenerator(seed=1).generate("bench", "AD_SET", FIELDS, start, END)
+    inputs = compute_metrics(report, SNAPSHOT_SPEC).pdf_inputs()
+    kwargs = dict(
+        ad_account_id="bench",
+        entity_type="AD_SET",
+        report_start=epoch_day(start),
+        report_end=epoch_day(END),
+        **inputs,
+        **extra,
+    )
+    return lambda: build_pdf_report(**kwargs)
+
+case("pdf.build_pdf_report.charts")(_pdf)
+case("pdf.build_pdf_report.no_charts")(functools.partial(_pdf, charts=False))
+
+def _case():
+    return create_case(
+        channel_id="C_BENCH",
+        thread_ts="1700000000.000001",
+        initiator_user_id="U_INIT",
+        approver_user_id="U_APPR",
+        stakeholder_user_id="U_STAKE",
+        ad_account_id="acc-bench",
+        account_name="Bench",
+    )
+
+@case("blocks.case_controls_blocks.cached")
+def _blocks_cached():
+    c = _case()
+    c.offer = Offer(type="DISCOUNT", details="10% off", expiry="2024-12-31")
+    return lambda: case_controls_blocks(c, "U_APPR")
+
+@case("blocks.case_controls_blocks.uncached")
+def _blocks_uncached():
+    c = _case()
+    c.offer = Offer(type="DISCOUNT", details="10% off", expiry="2024-12-31")
+
+    def render():
+        c.account_name = "Bench"  # bumps the revision, so every call rebuilds
+        return case_controls_blocks(c, "U_APPR")
+
+    return render
+
+def _handlers():
+    # The Slack app verifies its token when it is built; answer in-process.
+    fake = FakeWebClient()
+    with mock.patch.object(WebClient, "auth_test", lambda self, **kwargs: fake.api_call("auth.test")):
+        from app.slack import actions, views
+    return actions, views
+
+@case("handlers.churn_start_modal_submit")
+def _start_modal():
+    _, views = _handlers()
+    client = FakeWebClient()
+    accounts = itertools.count()
+
+    def submit():
+        # A new ad account each time, so the snapshot's report fetch is never cached.
+        body = {
+            "user": {"id": "U_INIT"},
+            "view": {
+                "private_metadata": "C_BENCH",
+                "state": {"values": {
+                    "ad_account": {"id": {"value": f"acc-{next(accounts)}"}},
+                    "account_name": {"name": {"value": "Bench"}},
+                    "stakeholder": {"user": {"selected_user": "U_STAKE"}},
+                    "approver": {"user": {"selected_user": "U_APPR"}},
+                }},
+            },
+        }
+        views.churn_start_modal_submit(lambda *a, **k: None, body, client, None)
+
+    return submit
+
+def _action(handler_name: str, action_id: str, user_id: str):
+    actions, _ = _handlers()
+    handler = getattr(actions, handler_name)
+    client = FakeWebClient()
+    c = _case()
+    c.panel_ts = "1700000000.000002"
+    body = {
+        "user": {"id": user_id},
+        "trigger_id": "trigger",
+        "actions": [{"action_id": action_id, "value": c.case_id}],
+    }
+    return lambda: handler(lambda *a, **k: None, body, client, None)
+
+for _handler, _action_id, _user in (
+    ("on_cp_propose_offer", "cp_propose_offer", "U_APPR"),
+    ("on_cp_dismiss_case", "cp_dismiss_case", "U_INIT"),
+    ("on_cp_offer_accepted", "cp_offer_accepted", "U_INIT"),
+    ("on_cp_offer_declined", "cp_offer_declined", "U_INIT"),
+    ("on_cp_reopen_case", "cp_reopen_case", "U_INIT"),
+):
+    case(f"handlers.{_action_id}")(functools.partial(_action, _handler, _action_id, _user))
+
+def run(names: List[str], repeat: int) -> List[Result]:
+    results = []
+    for name in names:
+        op = CASES[name]()
+        timer = timeit.Timer(op)
+        number, _ = _autorange(timer)
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results.append(Result(name, best, number))
+        print(f"  {name:<42} {_fmt(best):>10}   ({number} calls/sample)", flush=True)
+    return results
+
+def _autorange(timer: timeit.Timer):
+    # Like Timer.autorange(), but aiming for 0.2 s samples.
+    i = 1
+    while True:
+        for j in (1, 2, 5):
+            number = i * j
+            elapsed = timer.timeit(number)
+            if elapsed >= 0.2:
+                return number, elapsed
+        i *= 10
+
+def _fmt(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def compare(results: List[Result], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Names of the cases more than `threshold` slower than their baseline.
+    Cases without a baseline are never regressions.
+    """
+    regressions = []
+    for r in results:
+        before = baseline.get(r.name)
+        if before is None:
+            continue
+        change = r.seconds / before - 1.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"  {r.name:<42} {_fmt(before):>10} -> {_fmt(r.seconds):>10}  {change:+7.1%}{flag}")
+        if flag:
+            regressions.append(r.name)
+    return regressions
+
+def load_baseline(path: str) -> Optional[Dict[str, float]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+def save_baseline(path: str, results: List[Result], previous: Optional[Dict[str, float]]) -> None:
+    # Keep entries for cases not run this time (e.g. when filtered with -k).
+    merged = {**(previous or {}), **{r.name: r.seconds for r in results}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "saved_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "results": dict(sorted(merged.items())),
+        }, f, indent=2)
+        f.write("\n")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", dest="pattern", default="", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_THRESHOLD", DEFAULT_THRESHOLD)),
+                        help="allowed relative slowdown before a case fails (default 0.25, env BENCH_THRESHOLD)")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = [n for n in CASES if args.pattern in n]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print(f"No case matches {args.pattern!r}", file=sys.stderr)
+        return 2
+
+    print(f"Running {len(names)} cases (best of {args.repeat})")
+    results = run(names, args.repeat)
+    baseline = load_baseline(args.baseline)
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
+        return 0
+
+    print(f"Against {args.baseline} (threshold {args.threshold:+.0%})")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from slack_sdk.errors import SlackApiError
+
+from app.reporting import artifacts
+from app.reporting.artifacts import ArtifactCache, artifact_key
+from app.reporting.metrics import KPI
+from app.slack import pdf_actions, uploads
+from app.slack.reporting import SNAPSHOT_READY
+from app.store.models import Case
+
+def test_artifact_key_hashes_data_and_template_version(monkeypatch):
+    kpi = KPI(impressions=10, streamed_impressions=5, clicks=1, spend=2.5, ctr=0.1, e_cpcl=0.5)
+    key = artifact_key(account="a", kpi=kpi, series=[(1, 2.0)])
+    assert key == artifact_key(series=[(1, np.float64(2.0))], kpi=kpi, account="a")
+    assert key != artifact_key(account="a", kpi=kpi, series=[(1, 2.5)])
+    monkeypatch.setattr(artifacts, "TEMPLATE_VERSION", "next")
+    assert key != artifact_key(account="a", kpi=kpi, series=[(1, 2.0)])
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=250)
+    for i, key in enumerate("abc"):
+        cache.put(key, b"x" * 100)
+        os.utime(tmp_path / f"{key}.pdf", ns=(i, i))
+    assert cache.get("a") is None  # 300 bytes > 250: "a" was the oldest
+    cache.remember_slack_file("b", "C1", "F1")
+    assert cache.get("b") == b"x" * 100  # now the most recent
+    cache.put("d", b"y" * 100)
+    assert cache.get("c") is None
+    assert cache.get("b") is not None and cache.slack_file("b", "C1") == "F1"
+    assert cache.size() == 200
+    cache.put("huge", b"z" * 251)
+    assert cache.get("huge") is None
+    cache.remember_slack_file("d", "C1", "F2")
+    cache.put("e", b"w" * 100)
+    assert cache.get("d") is None and cache.slack_file("d", "C1") is None
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("d.")]
+
+def test_concurrent_slack_file_updates_are_not_lost(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    channels = [f"C{i}" for i in range(64)]
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(lambda c: cache.remember_slack_file("k", c, f"F_{c}"), channels))
+    assert all(cache.slack_file("k", c) == f"F_{c}" for c in channels)
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(lambda c: cache.forget_slack_file("k", c), channels[::2]))
+    assert [c for c in channels if cache.slack_file("k", c)] == channels[1::2]
+
+class _Client:
+    timeout, proxy, ssl = 30, None, None
+
+    def __init__(self):
+        self.calls = []
+        self.deleted = set()
+
+    def files_upload_v2(self, **kwargs):
+        self.calls.append("files_upload_v2")
+        return {"ok": True, "files": [{"id": f"F{len(self.calls)}"}]}
+
+    def files_getUploadURLExternal(self, filename, length):
+        self.calls.append("files_getUploadURLExternal")
+        return {"ok": True, "file_id": "F_STREAMED", "upload_url": "https://files.invalid/upload"}
+
+    def files_completeUploadExternal(self, files, **kwargs):
+        self.calls.append("files_completeUploadExternal")
+        return {"ok": True, "files": files}
+
+    def files_info(self, file):
+        self.calls.append("files_info")
+        if file in self.deleted:
+            raise SlackApiError("file_not_found", {"ok": False, "error": "file_not_found"})
+        return {"ok": True, "file": {"id": file, "permalink": f"https://slack.invalid/{file}"}}
+
+    def chat_postMessage(self, **kwargs):
+        self.calls.append(("chat_postMessage", kwargs["text"]))
+        return {"ok": True}
+
+def _case(case_id, channel="C1"):
+    return Case(
+        case_id=case_id,
+        channel_id=channel,
+        thread_ts=f"1.{case_id}",
+        ad_account_id="acc-artifacts",
+        account_name="Acme",
+        stakeholder_user_id="U_S",
+        approver_user_id="U_A",
+        initiator_user_id="U_I",
+    )
+
+def test_snapshots_share_uploads_and_rendered_pdfs(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_actions, "artifact_cache", ArtifactCache(str(tmp_path)))
+    monkeypatch.setattr(pdf_actions, "build_pdf_report", lambda **kw: b"%PDF-once")
+    streamed = []
+    monkeypatch.setattr(uploads, "post_upload", lambda url, file, length, **kw: streamed.append(file.read(length)))
+    client = _Client()
+
+    assert pdf_actions.generate_and_upload_finance_snapshot(client, _case("k1")) == SNAPSHOT_READY
+    assert client.calls == ["files_upload_v2"]
+
+    # Same account and range in the same channel: the upload is posted again.
+    client.calls.clear()
+    pdf_actions.generate_and_upload_finance_snapshot(client, _case("k2"))
+    assert client.calls[0] == "files_info"
+    assert client.calls[1][0] == "chat_postMessage" and "https://slack.invalid/F1" in client.calls[1][1]
+
+    # A deleted upload: the cached PDF is streamed from disk without rendering.
+    monkeypatch.setattr(pdf_actions, "build_pdf_report", lambda **kw: b"%PDF-again")
+    client.calls.clear()
+    client.deleted.add("F1")
+    pdf_actions.generate_and_upload_finance_snapshot(client, _case("k3"))
+    assert client.calls == ["files_info", "files_getUploadURLExternal", "files_completeUploadExternal"]
+    assert streamed == [b"%PDF-once"]
+    assert pdf_actions.artifact_cache.get(pdf_actions.prepare_finance_snapshot(_case("k4")).artifact_key) == b"%PDF-once"
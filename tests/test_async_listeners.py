@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+from slack_bolt.util.utils import get_arg_names_of_callable
+
+from app.slack import async_listeners
+from app.telemetry import LISTENER_SECONDS, tagged
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.calls = []
+        self._ts = 0
+
+    def __getattr__(self, method):
+        async def call(**kwargs):
+            self.calls.append((method, kwargs))
+            self._ts += 1
+            return {"ok": True, "ts": f"100.{self._ts}"}
+
+        return call
+
+def _start_body():
+    return {
+        "user": {"id": "U_INIT"},
+        "view": {
+            "private_metadata": "C1",
+            "state": {
+                "values": {
+                    "ad_account": {"id": {"value": " acc-1 "}},
+                    "account_name": {"name": {"value": "Acme"}},
+                    "stakeholder": {"user": {"selected_user": "U_STAKE"}},
+                    "approver": {"user": {"selected_user": "U_APPR"}},
+                }
+            },
+        },
+    }
+
+def test_start_submit_acks_first_and_snapshots_in_background():
+    client = FakeAsyncClient()
+    acked = []
+
+    async def ack():
+        acked.append(len(client.calls))
+
+    async def scenario():
+        await async_listeners.churn_start_modal_submit(ack, _start_body(), client, None)
+        handler_calls = [m for m, _ in client.calls]
+        await asyncio.gather(*list(async_listeners._background_tasks))
+        return handler_calls
+
+    handler_calls = asyncio.run(scenario())
+
+    assert acked == [0]
+    assert handler_calls == ["chat_postMessage", "chat_postMessage"]
+    methods = [m for m, _ in client.calls]
+    assert "files_upload_v2" in methods
+    assert methods[-1] == "chat_update"
+    upload = dict(client.calls)["files_upload_v2"]
+    assert upload["file"].startswith(b"%PDF")
+    assert upload["thread_ts"] == "100.1"
+
+def test_case_store_calls_run_off_the_event_loop(monkeypatch):
+    calls = []
+
+    def recording(name, fn):
+        def call(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            calls.append((name, threading.current_thread(), result))
+            return result
+
+        return call
+
+    for name in ("create_case", "get_case", "save_case", "set_case_status"):
+        monkeypatch.setattr(async_listeners, name, recording(name, getattr(async_listeners, name)))
+    monkeypatch.setattr(async_listeners, "spawn_background", lambda coro: coro.close())
+    client = FakeAsyncClient()
+
+    async def ack():
+        pass
+
+    async def scenario():
+        await async_listeners.churn_start_modal_submit(ack, _start_body(), client, None)
+        case = calls[0][2]
+        await async_listeners.on_cp_propose_offer(
+            ack, {"actions": [{"value": case.case_id}], "user": {"id": "U_APPR"}, "trigger_id": "T"}, client, None
+        )
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert {name for name, _, _ in calls} >= {"create_case", "save_case", "get_case"}
+    assert all(thread is not loop_thread for _, thread, _ in calls)
+
+def test_scan_parses_command_text_off_the_event_loop(monkeypatch):
+    parse_threads = []
+
+    def split_file_refs(text):
+        parse_threads.append(threading.current_thread())
+        return [], []
+
+    monkeypatch.setattr(async_listeners, "split_file_refs", split_file_refs)
+    client = FakeAsyncClient()
+
+    async def ack():
+        pass
+
+    async def scenario():
+        body = {"channel_id": "C1", "user_id": "U1", "text": "  "}
+        await async_listeners.churn_prevention_scan(ack, body, client, None)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert parse_threads and parse_threads[0] is not loop_thread
+    assert [m for m, _ in client.calls] == ["chat_postEphemeral"]
+
+def test_status_actions_are_timed_per_action(monkeypatch):
+    class Case:
+        channel_id, initiator_user_id = "C1", "U_OTHER"
+
+    monkeypatch.setattr(async_listeners, "get_case", lambda case_id: Case())
+    handler = async_listeners._status_action("cp_dismiss_case", "DISMISSED", "denied", "note")
+    assert handler.__name__ == "on_cp_dismiss_case"
+    assert get_arg_names_of_callable(handler) == ["ack", "body", "client", "logger"]
+
+    async def ack():
+        pass
+
+    async def scenario():
+        with tagged("/t-status", "cp_dismiss_case"):
+            body = {"actions": [{"value": "K1"}], "user": {"id": "U_INIT"}}
+            await handler(ack, body, FakeAsyncClient(), None)
+
+    asyncio.run(scenario())
+    assert LISTENER_SECONDS.count("/t-status", "cp_dismiss_case", "ok") == 1
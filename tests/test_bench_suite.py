@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.fake_slack import FakeWebClient
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _suite(*args):
+    return subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "-k", "case_controls_blocks.cached", "--repeat", "1", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+def test_fake_client_runs_files_upload_v2_in_process():
+    client = FakeWebClient()
+    client.chat_postMessage(channel="C1", text="hi")
+    client.files_upload_v2(file=b"%PDF-1.4", filename="a.pdf", channel="C1")
+    assert client.calls["chat.postMessage"] == 1
+    assert client.calls["files.getUploadURLExternal"] == 1
+    assert client.calls["files.completeUploadExternal"] == 1
+    assert client.uploaded_bytes == len(b"%PDF-1.4")
+
+def test_suite_saves_baseline_and_fails_on_regression(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    assert _suite("--save", "--baseline", str(baseline)).returncode == 0
+    saved = json.loads(baseline.read_text())
+    name = "blocks.case_controls_blocks.cached"
+    assert saved["results"][name] > 0
+
+    saved["results"][name] *= 1000
+    baseline.write_text(json.dumps(saved))
+    assert _suite("--baseline", str(baseline)).returncode == 0
+
+    saved["results"][name] /= 1e6
+    baseline.write_text(json.dumps(saved))
+    run = _suite("--baseline", str(baseline), "--threshold", "0.5")
+    assert run.returncode == 1
+    assert "REGRESSION" in run.stdout
@@ -1,4 +1,7 @@
-from app.slack.blocks import case_controls_blocks
+import json
+
+from app.slack.blocks import case_controls_blocks, case_controls_json
+from app.store.models import Case, CaseStatus, Offer
 
 def test_buttons_for_approver_when_no_offer():
     case = {
@@ -36,3 +39,27 @@ def test_buttons_for_initiator_when_offer_exists():
     texts = [el["text"]["text"] for el in actions[0]["elements"]]
     assert "Offer accepted" in texts
     assert "Offer declined" in texts
+
+def _case():
+    return Case.new(
+        "CACHE1",
+        channel_id="C1",
+        thread_ts="1.0",
+        initiator_user_id="U_INIT",
+        approver_user_id="U_APPR",
+        stakeholder_user_id="U_STAKE",
+        ad_account_id="acc",
+    )
+
+def test_panel_cache_invalidated_on_mutation():
+    case = _case()
+    first = case_controls_json(case, "U_INIT")
+    assert case_controls_json(case, "U_INIT") is first
+    assert "Propose offer" not in first and "Propose offer" in case_controls_json(case, "U_APPR")
+
+    case.offer = Offer(type="DISCOUNT", details="10%", expiry="2099-01-01")
+    assert "Offer accepted" in case_controls_json(case, "U_INIT")
+
+    case.status = CaseStatus.ACCEPTED
+    texts = [el["text"]["text"] for b in json.loads(case_controls_json(case, "U_INIT")) if b["type"] == "actions" for el in b["elements"]]
+    assert texts == ["Reopen case"]
@@ -0,0 +1,141 @@
+import datetime as dt
+import os
+
+import numpy as np
+import pytest
+
+from app.reporting.ads_client import ColumnarReport, MockSpotifyAdsApi, iter_report_pages
+from app.reporting.cache import ReportCache
+from app.reporting.history import HistoryStore
+from app.reporting.metrics import MetricsSpec, stream_metrics
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import epoch_day, iso_utc_from_epoch_day
+
+FIELDS = ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"]
+SPEC = MetricsSpec(kpis=True, top=(("SPEND", 3),), series=("SPEND",))
+TODAY = dt.date(2024, 3, 1)
+
+def _day(n):
+    return epoch_day(dt.date(2024, 1, 1)) + n
+
+def _report(first, last):
+    pages = iter_report_pages(
+        MockSpotifyAdsApi(generator=SyntheticAdsGenerator(seed=3)),
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        fields=FIELDS,
+        report_start=iso_utc_from_epoch_day(_day(first)),
+        report_end=iso_utc_from_epoch_day(_day(last)),
+        limit=4,
+    )
+    return ColumnarReport.concat(list(pages))
+
+def _assert_same_metrics(a, b):
+    ma, mb = stream_metrics([a], SPEC), stream_metrics([b], SPEC)
+    assert ma.kpi.impressions == mb.kpi.impressions
+    assert ma.kpi.spend == pytest.approx(mb.kpi.spend)
+    assert ma.top == mb.top
+    assert ma.series == mb.series
+
+def test_append_prepend_and_zero_copy_reads(tmp_path):
+    history = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    assert history.write(_report(10, 19), _day(10), _day(19))
+    assert history.write(_report(18, 29), _day(18), _day(29))  # overlap: appends 20..29
+    assert history.write(_report(0, 9), _day(0), _day(9))  # before: rewrites
+    assert not history.write(_report(40, 45), _day(40), _day(45))  # would leave a gap
+    assert history.covered() == (_day(0), _day(29))
+
+    stored = history.read(_day(5), _day(24), ["SPEND", "IMPRESSIONS"])
+    assert isinstance(stored.stats["SPEND"], np.memmap) or isinstance(stored.stats["SPEND"].base, np.memmap)
+    assert not stored.stats["SPEND"].flags.owndata
+    _assert_same_metrics(stored, _report(5, 24))
+
+    assert history.read(_day(25), _day(31), FIELDS) is None
+    assert history.read(_day(0), _day(3), ["CTR"]) is None
+
+def test_reopened_store_ignores_bytes_past_the_index(tmp_path):
+    history = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    history.write(_report(0, 9), _day(0), _day(9))
+    # A writer that crashed after appending column bytes but before the index.
+    with open(os.path.join(history.path, "SPEND.f8"), "ab") as f:
+        f.write(b"\0" * 64)
+
+    reopened = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    _assert_same_metrics(reopened.read(_day(0), _day(9), FIELDS), _report(0, 9))
+    reopened.write(_report(10, 14), _day(10), _day(14))
+    _assert_same_metrics(reopened.read(_day(0), _day(14), FIELDS), _report(0, 14))
+
+def test_report_cache_reads_closed_days_from_history(tmp_path):
+    class CountingApi(MockSpotifyAdsApi):
+        def __init__(self):
+            super().__init__(generator=SyntheticAdsGenerator(seed=11))
+            self.requested = []
+
+        def get_columnar_report_by_ad_account_id(self, **kwargs):
+            if kwargs.get("continuation_token") is None:
+                self.requested.append((kwargs["report_start"][:10], kwargs["report_end"][:10]))
+            return super().get_columnar_report_by_ad_account_id(**kwargs)
+
+    def fetch(cache):
+        pages = cache.iter_pages(
+            ad_account_id="acc",
+            entity_type="AD_SET",
+            fields=FIELDS,
+            start_date=dt.date(2024, 2, 20),
+            end_date=dt.date(2024, 2, 29),
+        )
+        return stream_metrics(pages, SPEC)
+
+    first = fetch(ReportCache(CountingApi(), today=lambda: TODAY, history=HistoryStore(str(tmp_path))))
+
+    # A fresh process: empty memory cache, same history directory.
+    api = CountingApi()
+    cache = ReportCache(api, today=lambda: TODAY, history=HistoryStore(str(tmp_path)))
+    again = fetch(cache)
+    assert api.requested == [("2024-02-29", "2024-02-29")]
+    assert cache.stats["history_days"] == 9
+    assert again.kpi.impressions == first.kpi.impressions
+    assert again.top == first.top
+
+def test_interrupted_rewrite_keeps_the_stored_run_readable(tmp_path, monkeypatch):
+    history = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    history.write(_report(10, 19), _day(10), _day(19))
+
+    def crash(self, index):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(type(history), "_save_index", crash)
+    with pytest.raises(KeyboardInterrupt):
+        history.write(_report(0, 9), _day(0), _day(9))  # prepend: rewrites
+    monkeypatch.undo()
+
+    reopened = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    assert reopened.covered() == (_day(10), _day(19))
+    _assert_same_metrics(reopened.read(_day(10), _day(19), FIELDS), _report(10, 19))
+    assert reopened.write(_report(0, 9), _day(0), _day(9))
+    _assert_same_metrics(reopened.read(_day(0), _day(19), FIELDS), _report(0, 19))
+    assert sorted(os.listdir(reopened.path)) == sorted(
+        [".lock", "index.json", "entity.2.i4", "day.2.i4", *(f"{f}.2.f8" for f in FIELDS)]
+    )
+
+def test_damaged_store_is_a_miss(tmp_path):
+    history = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    history.write(_report(0, 9), _day(0), _day(9))
+    with open(os.path.join(history.path, "SPEND.f8"), "r+b") as f:
+        f.truncate(8)
+
+    reopened = HistoryStore(str(tmp_path)).account("acc", "AD_SET")
+    assert reopened.read(_day(0), _day(9), FIELDS) is None
+    assert reopened.write(_report(0, 4), _day(0), _day(4))
+    _assert_same_metrics(reopened.read(_day(0), _day(4), FIELDS), _report(0, 4))
+
+def test_account_ids_map_to_distinct_directories_inside_the_store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    ids = ["..", ".", "../escape", "a/b", "a_b", "acc"]
+    paths = [os.path.realpath(store.account(i, "AD_SET").path) for i in ids]
+    root = os.path.realpath(tmp_path / "history")
+    assert all(os.path.dirname(os.path.dirname(p)) == root for p in paths)
+    assert len(set(paths)) == len(ids)
+
+    assert store.account("..", "AD_SET").write(_report(0, 2), _day(0), _day(2))
+    assert sorted(os.listdir(tmp_path)) == ["history"]
@@ -0,0 +1,103 @@
+import datetime as dt
+
+import pytest
+
+from app.reporting.ads_client import ColumnarReport, MockSpotifyAdsApi, iter_report_pages
+from app.reporting.metrics import (
+    MetricsSpec,
+    aggregate_kpis,
+    compute_metrics,
+    daily_series,
+    stream_metrics,
+    top_entities,
+)
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import iso_utc_start_of_day
+
+FIELDS = ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND", "CTR", "E_CPCL"]
+
+@pytest.fixture
+def report():
+    start = dt.date(2024, 1, 1)
+    return MockSpotifyAdsApi().get_aggregate_report_by_ad_account_id(
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        fields=FIELDS,
+        report_start=iso_utc_start_of_day(start),
+        report_end=iso_utc_start_of_day(start + dt.timedelta(days=13)),
+    )
+
+def test_columnar_metrics_match_row_metrics(report):
+    col = ColumnarReport.from_report(report)
+
+    assert aggregate_kpis(col).impressions == aggregate_kpis(report.rows).impressions
+    assert aggregate_kpis(col).clicks == aggregate_kpis(report.rows).clicks
+    assert aggregate_kpis(col).spend == pytest.approx(aggregate_kpis(report.rows).spend)
+
+    for metric in ("SPEND", "IMPRESSIONS"):
+        expected = top_entities(report.rows, metric, n=5)
+        got = top_entities(col, metric, n=5)
+        assert [name for name, _ in got] == [name for name, _ in expected]
+        assert [v for _, v in got] == pytest.approx([v for _, v in expected])
+
+        expected_series = daily_series(report.rows, metric)
+        got_series = daily_series(col, metric)
+        assert [d for d, _ in got_series] == [d for d, _ in expected_series]
+        assert [v for _, v in got_series] == pytest.approx([v for _, v in expected_series])
+
+def test_columnar_row_view_round_trips(report):
+    col = ColumnarReport.from_report(report)
+
+    assert len(col) == len(report.rows)
+    assert col.num_days == 14
+    assert col.rows == report.rows
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_compute_metrics_matches_individual_functions(report, columnar):
+    source = ColumnarReport.from_report(report) if columnar else report.rows
+    spec = MetricsSpec(kpis=True, top=(("SPEND", 3), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+
+    result = compute_metrics(source, spec)
+
+    assert result.kpi == aggregate_kpis(source)
+    assert result.top["SPEND"] == top_entities(source, "SPEND", n=3)
+    assert result.top["IMPRESSIONS"] == top_entities(source, "IMPRESSIONS", n=5)
+    assert result.series["SPEND"] == daily_series(source, "SPEND")
+    assert set(result.pdf_inputs()) == {"kpi", "top_by_spend", "top_by_imps", "series_imps", "series_spend"}
+
+def test_paged_ingestion_matches_single_report():
+    api = MockSpotifyAdsApi(generator=SyntheticAdsGenerator(seed=5, entity_counts={"AD": 23}))
+    params = dict(
+        ad_account_id="acc",
+        entity_type="AD",
+        fields=FIELDS,
+        report_start="2024-01-01T00:00:00Z",
+        report_end="2024-01-20T00:00:00Z",
+    )
+    spec = MetricsSpec(kpis=True, top=(("SPEND", 5),), series=("SPEND",))
+
+    pages = list(iter_report_pages(api, limit=10, **params))
+    streamed = stream_metrics(iter_report_pages(api, limit=10, **params), spec)
+    whole = compute_metrics(api.get_columnar_report_by_ad_account_id(limit=100, **params), spec)
+
+    assert [p.num_entities for p in pages] == [10, 10, 3]
+    assert pages[-1].continuation_token is None
+    assert streamed.kpi.impressions == whole.kpi.impressions
+    assert streamed.kpi.spend == pytest.approx(whole.kpi.spend)
+    assert [name for name, _ in streamed.top["SPEND"]] == [name for name, _ in whole.top["SPEND"]]
+    assert [v for _, v in streamed.series["SPEND"]] == pytest.approx([v for _, v in whole.series["SPEND"]])
+
+def test_legacy_mock_pages_by_entity():
+    pages = list(iter_report_pages(
+        MockSpotifyAdsApi(),
+        ad_account_id="acc",
+        entity_type="AD",
+        fields=FIELDS,
+        report_start="2024-01-01T00:00:00Z",
+        report_end="2024-01-03T00:00:00Z",
+        limit=8,
+        columnar=False,
+    ))
+
+    assert [len(p.rows) for p in pages] == [24, 24, 12]
+    assert pages[-1].rows[-1].entity_name == "Ad 20"
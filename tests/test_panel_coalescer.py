@@ -0,0 +1,102 @@
+import asyncio
+
+from app.slack.coalescer import AsyncPanelCoalescer, PanelCoalescer
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class FakeClient:
+    def __init__(self):
+        self.updates = []
+
+    def chat_update(self, **kwargs):
+        self.updates.append(kwargs)
+        return {"ok": True}
+
+class FakeAsyncClient(FakeClient):
+    async def chat_update(self, **kwargs):
+        return FakeClient.chat_update(self, **kwargs)
+
+def test_burst_sends_first_and_latest_only():
+    client, clock = FakeClient(), Clock()
+    coalescer = PanelCoalescer(window=60, clock=clock)
+
+    assert coalescer.update(client, channel="C1", ts="1.1", text="a") == {"ok": True}
+    for text in ("b", "c", "d"):
+        clock.now += 1
+        assert coalescer.update(client, channel="C1", ts="1.1", text=text) is None
+    assert [u["text"] for u in client.updates] == ["a"]
+
+    coalescer.flush()
+    assert [u["text"] for u in client.updates] == ["a", "d"]
+    assert coalescer.stats == {"sent": 2, "coalesced": 2}
+
+    coalescer.flush()
+    assert len(client.updates) == 2
+
+def test_panels_are_independent_and_window_expires():
+    client, clock = FakeClient(), Clock()
+    coalescer = PanelCoalescer(window=5, clock=clock)
+
+    coalescer.update(client, channel="C1", ts="1.1", text="a")
+    coalescer.update(client, channel="C1", ts="2.2", text="b")
+    clock.now += 5
+    coalescer.update(client, channel="C1", ts="1.1", text="c")
+    assert [u["text"] for u in client.updates] == ["a", "b", "c"]
+
+def test_deferred_update_flushes_when_window_closes():
+    client = FakeClient()
+    coalescer = PanelCoalescer(window=0.05)
+
+    coalescer.update(client, channel="C1", ts="1.1", text="a")
+    coalescer.update(client, channel="C1", ts="1.1", text="b")
+    coalescer._timers[("C1", "1.1")].join(1)
+    assert [u["text"] for u in client.updates] == ["a", "b"]
+
+def test_async_coalescer_flushes_latest():
+    client = FakeAsyncClient()
+    coalescer = AsyncPanelCoalescer(window=0.05)
+
+    async def scenario():
+        await coalescer.update(client, channel="C1", ts="1.1", text="a")
+        await coalescer.update(client, channel="C1", ts="1.1", text="b")
+        await coalescer.update(client, channel="C1", ts="1.1", text="c")
+        await asyncio.gather(*list(coalescer._running))
+
+    asyncio.run(scenario())
+    assert [u["text"] for u in client.updates] == ["a", "c"]
+
+def test_update_after_the_window_supersedes_the_held_back_one():
+    client, clock = FakeClient(), Clock()
+    coalescer = PanelCoalescer(window=1, clock=clock)
+
+    coalescer.update(client, channel="C1", ts="1.1", text="a")
+    clock.now += 0.5
+    coalescer.update(client, channel="C1", ts="1.1", text="b")
+    timer = coalescer._timers[("C1", "1.1")]
+    clock.now += 0.51
+    coalescer.update(client, channel="C1", ts="1.1", text="c")
+    timer.join(1)
+    coalescer.flush()
+    assert [u["text"] for u in client.updates] == ["a", "c"]
+    assert coalescer.stats == {"sent": 2, "coalesced": 1}
+
+def test_async_update_after_the_window_supersedes_the_held_back_one():
+    client, clock = FakeAsyncClient(), Clock()
+    coalescer = AsyncPanelCoalescer(window=1, clock=clock)
+
+    async def scenario():
+        await coalescer.update(client, channel="C1", ts="1.1", text="a")
+        clock.now += 0.5
+        await coalescer.update(client, channel="C1", ts="1.1", text="b")
+        clock.now += 0.51
+        await coalescer.update(client, channel="C1", ts="1.1", text="c")
+        await asyncio.gather(*list(coalescer._running), return_exceptions=True)
+        await coalescer.flush()
+
+    asyncio.run(scenario())
+    assert [u["text"] for u in client.updates] == ["a", "c"]
@@ -0,0 +1,54 @@
+import datetime as dt
+
+import pytest
+
+from app.reporting.metrics import MetricsSpec, compute_metrics
+from app.reporting.pdf import build_pdf_report, spool_pdf_report
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import epoch_day
+
+SPEC = MetricsSpec(kpis=True, top=(("SPEND", 5), ("IMPRESSIONS", 5)), series=("IMPRESSIONS", "SPEND"))
+
+@pytest.fixture(scope="module")
+def metrics():
+    report = SyntheticAdsGenerator(seed=2).generate(
+        "acc", "AD_SET", ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"], dt.date(2024, 1, 1), dt.date(2024, 1, 30)
+    )
+    return compute_metrics(report, SPEC)
+
+@pytest.mark.parametrize("backend", ["reportlab", "matplotlib"])
+def test_build_pdf_report_with_chart_backend(metrics, backend):
+    pdf = build_pdf_report(
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        report_start=epoch_day(dt.date(2024, 1, 1)),
+        report_end=epoch_day(dt.date(2024, 1, 30)),
+        case_id="ABC123",
+        chart_backend=backend,
+        **metrics.pdf_inputs(),
+    )
+    assert pdf.startswith(b"%PDF")
+
+def test_build_pdf_report_handles_empty_series(metrics):
+    inputs = {**metrics.pdf_inputs(), "series_imps": [], "series_spend": []}
+    pdf = build_pdf_report(
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        report_start=epoch_day(dt.date(2024, 1, 1)),
+        report_end=epoch_day(dt.date(2024, 1, 30)),
+        **inputs,
+    )
+    assert pdf.startswith(b"%PDF")
+
+def test_spool_pdf_report_rolls_to_disk_beyond_max_size(metrics):
+    kwargs = dict(
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        report_start=epoch_day(dt.date(2024, 1, 1)),
+        report_end=epoch_day(dt.date(2024, 1, 30)),
+        **metrics.pdf_inputs(),
+    )
+    with spool_pdf_report(max_size=1024, **kwargs) as spooled:
+        assert spooled._rolled
+        data = spooled.read()
+    assert data.startswith(b"%PDF") and len(data) == len(build_pdf_report(**kwargs))
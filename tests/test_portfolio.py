@@ -0,0 +1,34 @@
+import time
+
+from app.reporting.metrics import MetricsResult, KPI
+from app.reporting.portfolio import parse_account_ids, scan_portfolio
+
+def test_parse_account_ids():
+    text = "ad_account_id\nacc-1, acc-2;acc-1\n 'acc-3'  "
+    assert parse_account_ids(text) == ["acc-1", "acc-2", "acc-3"]
+
+def _fetch(delay=0.0, fail=()):
+    def fetch(ad_account_id):
+        time.sleep(delay)
+        if ad_account_id in fail:
+            raise RuntimeError("boom")
+        return MetricsResult(kpi=KPI(0, 0, 0, 0.0, 0.0, 0.0))
+
+    return fetch
+
+def test_scan_bounds_concurrency_and_reports_failures():
+    ids = [f"acc-{i}" for i in range(24)]
+    scan = scan_portfolio(ids, _fetch(delay=0.02, fail={"acc-3"}), max_concurrency=4)
+
+    assert scan.peak_concurrency == 4
+    assert len(scan.accounts) == 23
+    assert [a.ad_account_id for a in scan.failed] == ["acc-3"]
+    assert "boom" in scan.failed[0].error
+    # 24 fetches of 20 ms on 4 threads: ~0.12 s rather than ~0.48 s serially.
+    assert scan.elapsed_seconds < 0.4
+    assert scan.throughput > 50
+
+def test_scan_respects_rate_limit():
+    ids = [f"acc-{i}" for i in range(6)]
+    scan = scan_portfolio(ids, _fetch(), max_concurrency=6, max_rate=50)
+    assert scan.elapsed_seconds >= 5 / 50
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.reporting.render_service import JobState, RenderError, RenderJob, RenderService
+from app.slack import pdf_actions
+from app.slack.reporting import SNAPSHOT_BUSY, SNAPSHOT_QUEUED
+from app.store.models import Case
+
+def render_echo(text: str = "ok", delay: float = 0.0, crash: bool = False) -> bytes:
+    if crash:
+        os._exit(3)
+    time.sleep(delay)
+    return text.encode()
+
+@pytest.fixture
+def service():
+    svc = RenderService(workers=1, max_queue=2, job_timeout=2.0, target=render_echo)
+    yield svc
+    svc.shutdown()
+
+def test_renders_in_worker_process(service):
+    assert service.render(timeout=30, text="hello") == b"hello"
+    assert service.stats()["done"] == 1
+
+def test_timeout_and_crash_only_fail_their_own_job(service):
+    slow = service.submit(delay=10)
+    with pytest.raises(RenderError):
+        slow.result(timeout=30)
+    assert slow.state == JobState.TIMED_OUT
+
+    crashed = service.submit(crash=True)
+    with pytest.raises(RenderError):
+        crashed.result(timeout=30)
+    assert crashed.state == JobState.FAILED
+
+    assert service.render(timeout=30, text="still alive") == b"still alive"
+
+def test_full_queue_rejects_at_once_and_shutdown_rejects_waiting_jobs():
+    service = RenderService(workers=1, max_queue=2, job_timeout=2.0, target=render_echo)
+    service.render(timeout=30)
+    running = service.submit(delay=1.0)
+    while running.state == JobState.QUEUED:
+        time.sleep(0.01)
+    queued = [service.submit(text=str(i)) for i in range(3)]
+
+    assert [j.state for j in queued] == [JobState.QUEUED, JobState.QUEUED, JobState.REJECTED]
+    assert queued[2].done and "full" in queued[2].error
+    assert service.stats()["queue_depth"] == 2 and service.stats()["rejected"] == 1
+    assert [j.result(timeout=30) for j in queued[:2]] == [b"0", b"1"]
+
+    running = service.submit(delay=0.5)
+    while running.state == JobState.QUEUED:
+        time.sleep(0.01)
+    waiting = [service.submit() for _ in range(2)]
+    started = time.monotonic()
+    service.shutdown()
+    assert time.monotonic() - started < 2.0
+    assert running.result(timeout=0) == b"ok"
+    assert [j.state for j in waiting] == [JobState.REJECTED] * 2
+    assert service.submit().state == JobState.REJECTED
+
+def test_snapshot_returns_queued_at_once_and_uploads_off_the_dispatcher(monkeypatch):
+    jobs = []
+
+    class Service:
+        def submit(self, **kwargs):
+            jobs.append(RenderJob(kwargs))
+            return jobs[-1]
+
+    uploaded = threading.Event()
+    upload_threads = []
+
+    class Client:
+        def files_upload_v2(self, **kwargs):
+            upload_threads.append(threading.current_thread().name)
+            uploaded.set()
+            return {"ok": True}
+
+    monkeypatch.setattr(pdf_actions, "get_render_service", lambda: Service())
+    case = Case(
+        case_id="RQ1",
+        channel_id="C1",
+        thread_ts="1.1",
+        initiator_user_id="U_I",
+        approver_user_id="U_A",
+        stakeholder_user_id="U_S",
+        ad_account_id="acc-render-queue",
+    )
+    assert pdf_actions.generate_and_upload_finance_snapshot(Client(), case) == SNAPSHOT_QUEUED
+    assert not uploaded.is_set()
+
+    jobs[0]._finish(JobState.DONE, b"%PDF")
+    assert uploaded.wait(5)
+    assert upload_threads[0].startswith("snapshot-upload")
+
+def test_snapshot_reports_busy_when_the_render_queue_is_full(monkeypatch):
+    class Service:
+        def submit(self, **kwargs):
+            job = RenderJob(kwargs)
+            job._finish(JobState.REJECTED, error="render queue is full")
+            return job
+
+    monkeypatch.setattr(pdf_actions, "get_render_service", lambda: Service())
+    case = Case(
+        case_id="RQ2",
+        channel_id="C1",
+        thread_ts="1.2",
+        initiator_user_id="U_I",
+        approver_user_id="U_A",
+        stakeholder_user_id="U_S",
+        ad_account_id="acc-render-busy",
+    )
+    assert pdf_actions.generate_and_upload_finance_snapshot(object(), case) == SNAPSHOT_BUSY
@@ -0,0 +1,99 @@
+import datetime as dt
+
+import pytest
+
+from app.reporting.ads_client import MockSpotifyAdsApi
+from app.reporting.cache import ReportCache
+from app.reporting.metrics import MetricsSpec, stream_metrics
+from app.reporting.synthetic import SyntheticAdsGenerator
+
+FIELDS = ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"]
+TODAY = dt.date(2024, 3, 1)
+SPEC = MetricsSpec(kpis=True, top=(("SPEND", 3),), series=("SPEND",))
+
+class CountingApi(MockSpotifyAdsApi):
+    def __init__(self):
+        super().__init__(generator=SyntheticAdsGenerator(seed=11))
+        self.requested = []
+
+    def get_columnar_report_by_ad_account_id(self, **kwargs):
+        if kwargs.get("continuation_token") is None:
+            self.requested.append((kwargs["report_start"][:10], kwargs["report_end"][:10]))
+        return super().get_columnar_report_by_ad_account_id(**kwargs)
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+def _fetch(cache, account="acc", days=10, end=TODAY - dt.timedelta(days=1)):
+    pages = cache.iter_pages(
+        ad_account_id=account,
+        entity_type="AD_SET",
+        fields=FIELDS,
+        start_date=end - dt.timedelta(days=days - 1),
+        end_date=end,
+        limit=4,
+    )
+    return stream_metrics(pages, SPEC)
+
+def test_refresh_only_fetches_missing_and_volatile_days():
+    api, clock = CountingApi(), Clock()
+    cache = ReportCache(api, clock=clock, today=lambda: TODAY, volatile_ttl_seconds=600)
+
+    first = _fetch(cache)
+    assert api.requested == [("2024-02-20", "2024-02-29")]
+
+    clock.now += 60
+    again = _fetch(cache)
+    assert len(api.requested) == 1
+    assert again.kpi.impressions == first.kpi.impressions
+    assert again.kpi.spend == pytest.approx(first.kpi.spend)
+    assert again.top["SPEND"] == first.top["SPEND"]
+
+    clock.now += 600
+    _fetch(cache)
+    assert api.requested[1:] == [("2024-02-29", "2024-02-29")]
+
+    wider = _fetch(cache, days=12)
+    assert api.requested[2:] == [("2024-02-18", "2024-02-19")]
+    uncached = _fetch(ReportCache(CountingApi(), today=lambda: TODAY), days=12)
+    assert wider.kpi.impressions == uncached.kpi.impressions
+    assert [v for _, v in wider.series["SPEND"]] == pytest.approx([v for _, v in uncached.series["SPEND"]])
+
+def test_lru_eviction_and_ttl():
+    api, clock = CountingApi(), Clock()
+    cache = ReportCache(api, max_entries=1, ttl_seconds=100, clock=clock, today=lambda: TODAY)
+
+    _fetch(cache, account="a", end=TODAY - dt.timedelta(days=5))
+    _fetch(cache, account="b", end=TODAY - dt.timedelta(days=5))
+    assert len(cache) == 1
+    assert cache.stats["evictions"] == 1
+
+    _fetch(cache, account="b", end=TODAY - dt.timedelta(days=5))
+    assert len(api.requested) == 2
+
+    clock.now += 101
+    _fetch(cache, account="b", end=TODAY - dt.timedelta(days=5))
+    assert len(api.requested) == 3
+
+def test_unseeded_mock_refreshes_volatile_day_without_splitting_entities():
+    clock = Clock()
+    cache = ReportCache(MockSpotifyAdsApi(), clock=clock, today=lambda: TODAY, volatile_ttl_seconds=600)
+    spec = MetricsSpec(kpis=False, top=(("SPEND", 20),))
+    _fetch(cache, days=30)
+
+    clock.now += 601
+    pages = cache.iter_pages(
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        fields=FIELDS,
+        start_date=TODAY - dt.timedelta(days=30),
+        end_date=TODAY - dt.timedelta(days=1),
+        limit=4,
+    )
+    top = stream_metrics(pages, spec).top["SPEND"]
+    names = [name for name, _ in top]
+    assert len(names) == 10 and len(set(names)) == 10
@@ -0,0 +1,75 @@
+import datetime as dt
+import time
+
+import numpy as np
+
+from app.reporting.metrics import KPI, MetricsResult
+from app.reporting.portfolio import AccountScan, PortfolioScan
+from app.reporting.risk import DailyMatrix, score_matrix, score_portfolio, spend_slope
+from app.reporting.utils import epoch_day
+
+DAYS = [epoch_day(dt.date(2024, 1, 1)) + i for i in range(28)]
+
+def _account(ad_account_id, spend, ctr=0.01, top_share=0.3):
+    imps = [s * 100 for s in spend]
+    clicks = [i * c for i, c in zip(imps, ctr if isinstance(ctr, list) else [ctr] * len(spend))]
+    return AccountScan(ad_account_id, metrics=MetricsResult(
+        kpi=KPI(int(sum(imps)), 0, int(sum(clicks)), float(sum(spend)), 0.0, 0.0),
+        top={"SPEND": [("e1", sum(spend) * top_share)]},
+        series={
+            "SPEND": list(zip(DAYS, spend)),
+            "IMPRESSIONS": list(zip(DAYS, imps)),
+            "CLICKS": list(zip(DAYS, clicks)),
+        },
+    ))
+
+def _scan(accounts):
+    return PortfolioScan(accounts=accounts, elapsed_seconds=1.0, max_concurrency=1, peak_concurrency=1)
+
+def test_spend_slope_is_relative_to_mean():
+    rows = np.array([[10.0, 20.0, 30.0], [30.0, 20.0, 10.0], [5.0, 5.0, 5.0]])
+    assert np.allclose(spend_slope(rows), [0.5, -0.5, 0.0])
+
+def test_ranks_each_signal_above_a_flat_account():
+    flat = _account("flat", [100.0] * 28)
+    declining = _account("declining", [200.0 - 6 * i for i in range(28)])
+    ctr_drop = _account("ctr", [100.0] * 28, ctr=[0.01] * 21 + [0.004] * 7)
+    concentrated = _account("concentrated", [100.0] * 28, top_share=0.95)
+
+    candidates = score_portfolio(_scan([flat, declining, ctr_drop, concentrated]))
+    by_id = {c.ad_account_id: c for c in candidates}
+
+    assert candidates[-1].ad_account_id == "flat"
+    assert by_id["flat"].score == 0
+    assert by_id["declining"].signals["spend_decline"] == 1.0
+    assert by_id["ctr"].reasons[:2] == ["CTR below baseline", "E-CPCL rising"]
+    assert by_id["concentrated"].signals["concentration"] > 0.8
+    assert by_id["declining"].suggested_case == {
+        "ad_account_id": "declining",
+        "account_name": "",
+        "days_back": 28,
+        "reason": "spend declining",
+    }
+
+def test_missing_days_and_empty_scans_score_without_errors():
+    sparse = _account("sparse", [100.0] * 28)
+    sparse.metrics.series = {"SPEND": sparse.metrics.series["SPEND"][:3]}
+    assert [c.ad_account_id for c in score_portfolio(_scan([sparse]))] == ["sparse"]
+    assert score_portfolio(_scan([])) == []
+
+def test_scores_a_thousand_accounts_quickly():
+    rng = np.random.default_rng(0)
+    n = 1000
+    matrix = DailyMatrix(
+        account_ids=[f"acc-{i}" for i in range(n)],
+        days=DAYS,
+        spend=rng.uniform(0, 500, (n, 28)),
+        impressions=rng.uniform(1e4, 5e4, (n, 28)),
+        clicks=rng.uniform(0, 500, (n, 28)),
+        concentration=rng.uniform(0, 1, n),
+    )
+    t0 = time.perf_counter()
+    scores = score_matrix(matrix)
+    assert time.perf_counter() - t0 < 0.1
+    assert scores.score.shape == (n,)
+    assert ((scores.score >= 0) & (scores.score <= 100)).all()
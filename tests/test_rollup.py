@@ -0,0 +1,129 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from app.reporting.ads_client import MockSpotifyAdsApi, iter_report_pages
+from app.reporting.metrics import MetricsSpec, stream_metrics
+from app.reporting.rollup import DailyRollup, RollupStore
+from app.reporting.synthetic import SyntheticAdsGenerator
+from app.reporting.utils import epoch_day, iso_utc_start_of_day
+from app.slack import pdf_actions, scan_actions
+from app.store.models import Case
+
+FIELDS = ["IMPRESSIONS", "STREAMED_IMPRESSIONS", "CLICKS", "SPEND"]
+START = dt.date(2024, 1, 1)
+
+def _pages(start, end):
+    return iter_report_pages(
+        MockSpotifyAdsApi(generator=SyntheticAdsGenerator(seed=5)),
+        ad_account_id="acc",
+        entity_type="AD_SET",
+        fields=FIELDS,
+        report_start=iso_utc_start_of_day(start),
+        report_end=iso_utc_start_of_day(end),
+        granularity="DAY",
+        limit=7,
+    )
+
+def _day(n):
+    return START + dt.timedelta(days=n)
+
+@pytest.mark.parametrize("first, last", [(0, 59), (10, 20), (45, 45), (0, 0)])
+def test_range_kpis_match_direct_aggregation(first, last):
+    rollup = DailyRollup()
+    list(rollup.tap(_pages(_day(0), _day(59))))
+
+    expected = stream_metrics(_pages(_day(first), _day(last)), MetricsSpec(kpis=True)).kpi
+    got = rollup.kpi(_day(first), _day(last))
+    assert (got.impressions, got.streamed_impressions, got.clicks) == (
+        expected.impressions, expected.streamed_impressions, expected.clicks
+    )
+    assert got.spend == pytest.approx(expected.spend)
+    assert got.e_cpcl == pytest.approx(expected.e_cpcl)
+    assert rollup.covers(_day(first), _day(last))
+
+def test_incremental_days_and_replacement():
+    rollup = DailyRollup()
+    rollup.set_days({epoch_day(_day(0)): np.array([100.0, 50.0, 2.0, 10.0])})
+    rollup.set_days({epoch_day(_day(3)): np.array([200.0, 80.0, 4.0, 30.0])})  # gap of two days
+    assert len(rollup) == 4 and rollup.end == _day(3)
+    assert not rollup.covers(_day(0), _day(3))
+    assert rollup.covers(_day(3), _day(3))
+    assert rollup.totals(_day(0), _day(3))[3] == 40.0
+    with pytest.raises(ValueError):
+        rollup.kpi(_day(0), _day(3))
+
+    # Re-ingesting a day replaces it; an earlier day extends the start.
+    rollup.set_days({
+        epoch_day(_day(0)): np.array([100.0, 50.0, 2.0, 20.0]),
+        epoch_day(_day(-1)): np.array([10.0, 0.0, 1.0, 5.0]),
+    })
+    assert rollup.start == _day(-1)
+    assert rollup.totals(_day(-1), _day(3))[3] == 55.0
+    first = epoch_day(_day(-1))
+    assert rollup.series("SPEND", _day(-1), _day(1)) == [(first, 5.0), (first + 1, 20.0), (first + 2, 0.0)]
+
+    for n in range(4, 200):
+        rollup.set_days({epoch_day(_day(n)): np.array([1.0, 0.0, 1.0, 1.0])})
+    assert rollup.kpi(_day(4), _day(199)).clicks == 196
+
+def test_period_comparison():
+    rollup = DailyRollup()
+    rollup.set_days({epoch_day(_day(n)): np.array([100.0, 0.0, 1.0, 10.0 if n < 7 else 5.0]) for n in range(14)})
+
+    comparison = rollup.compare(_day(7), _day(13))
+    assert comparison.previous_complete
+    assert comparison.change("spend") == pytest.approx(-0.5)
+    assert comparison.change("ctr") == 0.0
+    assert not rollup.compare(_day(0), _day(6)).previous_complete
+    with pytest.raises(ValueError):
+        rollup.compare(_day(7), _day(14))
+
+def test_tap_with_range_covers_days_without_rows():
+    rollup = DailyRollup()
+    list(rollup.tap(_pages(_day(0), _day(2)), _day(0), _day(4)))
+    assert rollup.covers(_day(0), _day(4))
+    assert rollup.kpi(_day(3), _day(4)).impressions == 0
+
+def test_interrupted_stream_writes_nothing():
+    rollup = DailyRollup()
+    pages = rollup.tap(_pages(_day(0), _day(9)))
+    next(pages)
+    pages.close()
+    assert len(rollup) == 0
+
+def test_store_evicts_least_recently_used():
+    store = RollupStore(max_entries=2)
+    a = store.get("a", "AD_SET")
+    store.get("b", "AD_SET")
+    assert store.get("a", "AD_SET") is a
+    store.get("c", "AD_SET")
+    assert len(store) == 2
+    assert store.get("a", "AD_SET") is a
+    assert store.get("b", "AD_SET") is not None and len(store) == 2
+
+def test_snapshot_kpis_survive_eviction_during_the_fetch(monkeypatch):
+    monkeypatch.setattr(pdf_actions, "rollups", RollupStore(max_entries=1))
+    iter_pages = pdf_actions.report_cache.iter_pages
+
+    def evicting_pages(**kwargs):
+        for page in iter_pages(**kwargs):
+            pdf_actions.rollups.get("acc-other", "AD_SET")  # evicts the snapshot's rollup
+            yield page
+
+    monkeypatch.setattr(pdf_actions.report_cache, "iter_pages", evicting_pages)
+    case = Case(
+        case_id="r1", channel_id="C1", thread_ts="1.1", ad_account_id="acc-evicted", account_name="Acme",
+        stakeholder_user_id="U_S", approver_user_id="U_A", initiator_user_id="U_I",
+    )
+    metrics, rollup, start, end, _ = pdf_actions.compute_kpi_and_report(case, days_back=7)
+    assert rollup.covers(start, end)
+    assert case.kpi.impressions == metrics.kpi.impressions > 0
+
+def test_portfolio_scans_leave_snapshot_rollups_alone(monkeypatch):
+    monkeypatch.setattr(pdf_actions, "rollups", RollupStore(max_entries=2))
+    snapshot_rollup = pdf_actions.account_rollup("acc-snap", _day(0), _day(6))
+    scan_actions.run_portfolio_scan([f"acc-scan-{i}" for i in range(5)])
+    assert len(pdf_actions.rollups) == 1
+    assert pdf_actions.rollups.get("acc-snap", "AD_SET") is snapshot_rollup
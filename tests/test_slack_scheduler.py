@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from app.slack.async_app import ScheduledAsyncWebClient
+from app.slack.scheduler import (
+    LANE_HIGH,
+    LANE_LOW,
+    AsyncOutboundScheduler,
+    OutboundScheduler,
+    RateLimit,
+    ScheduledWebClient,
+    lane_for,
+)
+
+class FakeSlack(BaseHTTPRequestHandler):
+    """
+    Minimal Slack Web API: every method answers ok, except that the first
+    `rate_limit` calls of a method answer 429 with Retry-After.
+    """
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        method = self.path.rsplit("/", 1)[-1]
+        server = self.server
+        with server.lock:
+            server.calls.append(method)
+            limited = server.rate_limit.get(method, 0) > 0
+            if limited:
+                server.rate_limit[method] -= 1
+        time.sleep(server.latency)
+        if limited:
+            self._reply(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": "0"})
+        else:
+            self._reply(200, {"ok": True, "ts": "1.0"})
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fake_slack():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSlack)
+    server.lock = threading.Lock()
+    server.calls = []
+    server.rate_limit = {}
+    server.latency = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _client(server, scheduler):
+    return ScheduledWebClient(
+        token="xoxb-test",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/api/",
+        scheduler=scheduler,
+    )
+
+def test_lanes():
+    assert lane_for("views.open") == LANE_HIGH
+    assert lane_for("files.completeUploadExternal") == LANE_LOW
+
+def test_retries_after_429(fake_slack):
+    fake_slack.rate_limit["chat.update"] = 2
+    scheduler = OutboundScheduler(jitter=0.01)
+    client = _client(fake_slack, scheduler)
+
+    assert client.chat_update(channel="C1", ts="1.0", text="x")["ok"]
+    assert fake_slack.calls == ["chat.update"] * 3
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 2
+    assert stats["in_flight"] == 0
+
+def test_gives_up_after_max_retries(fake_slack):
+    fake_slack.rate_limit["chat.update"] = 5
+    client = _client(fake_slack, OutboundScheduler(max_retries=1, jitter=0))
+
+    with pytest.raises(SlackApiError):
+        client.chat_update(channel="C1", ts="1.0", text="x")
+    assert len(fake_slack.calls) == 2
+
+def test_token_bucket_paces_calls(fake_slack):
+    scheduler = OutboundScheduler(limits={"chat.postMessage": RateLimit(per_minute=600, burst=1)})
+    client = _client(fake_slack, scheduler)
+
+    t0 = time.monotonic()
+    for _ in range(4):
+        client.chat_postMessage(channel="C1", text="x")
+    assert time.monotonic() - t0 >= 0.25
+
+def test_high_lane_goes_first(fake_slack):
+    fake_slack.latency = 0.2
+    scheduler = OutboundScheduler(max_in_flight=1)
+    client = _client(fake_slack, scheduler)
+
+    blocker = threading.Thread(target=client.chat_postMessage, kwargs=dict(channel="C1", text="x"))
+    blocker.start()
+    time.sleep(0.05)
+    low = threading.Thread(target=client.api_call, args=("files.getUploadURLExternal",))
+    low.start()
+    time.sleep(0.05)
+    high = threading.Thread(target=client.views_open, kwargs=dict(trigger_id="T", view={"type": "modal"}))
+    high.start()
+    for t in (blocker, low, high):
+        t.join(5)
+
+    assert fake_slack.calls == ["chat.postMessage", "views.open", "files.getUploadURLExternal"]
+    assert scheduler.stats()["waiting"] == {"high": 0, "normal": 0, "low": 0}
+
+def _async_client(server, scheduler):
+    return ScheduledAsyncWebClient(
+        token="xoxb-test",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/api/",
+        scheduler=scheduler,
+    )
+
+def test_async_client_retries_after_429_and_paces_calls(fake_slack):
+    fake_slack.rate_limit["chat.update"] = 2
+    scheduler = AsyncOutboundScheduler(jitter=0.01, limits={"chat.postMessage": RateLimit(per_minute=600, burst=1)})
+
+    async def scenario():
+        client = _async_client(fake_slack, scheduler)
+        assert (await client.chat_update(channel="C1", ts="1.0", text="x"))["ok"]
+        t0 = time.monotonic()
+        await asyncio.gather(*(client.chat_postMessage(channel="C1", text="x") for _ in range(4)))
+        return time.monotonic() - t0
+
+    assert asyncio.run(scenario()) >= 0.25
+    assert fake_slack.calls[:3] == ["chat.update"] * 3
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 2
+    assert stats["in_flight"] == 0 and stats["waiting"] == {"high": 0, "normal": 0, "low": 0}
+
+def test_async_high_lane_goes_first(fake_slack):
+    fake_slack.latency = 0.2
+    scheduler = AsyncOutboundScheduler(max_in_flight=1)
+
+    async def scenario():
+        client = _async_client(fake_slack, scheduler)
+        blocker = asyncio.create_task(client.chat_postMessage(channel="C1", text="x"))
+        await asyncio.sleep(0.05)
+        low = asyncio.create_task(client.api_call("files.getUploadURLExternal"))
+        await asyncio.sleep(0.05)
+        high = asyncio.create_task(client.views_open(trigger_id="T", view={"type": "modal"}))
+        await asyncio.gather(blocker, low, high)
+
+    asyncio.run(scenario())
+    assert fake_slack.calls == ["chat.postMessage", "views.open", "files.getUploadURLExternal"]
@@ -0,0 +1,155 @@
+import multiprocessing as mp
+
+import pytest
+
+from app.store.memory import MemoryCaseStore
+from app.store.models import Case, CaseStatus, KpiSnapshot, Offer
+from app.store.sqlite import SqliteCaseStore
+
+def _new_case(store, initiator="U1", account="acc-1", thread_ts="1.0"):
+    return store.create_case(
+        channel_id="C1",
+        thread_ts=thread_ts,
+        initiator_user_id=initiator,
+        approver_user_id="U2",
+        stakeholder_user_id="U3",
+        ad_account_id=account,
+        account_name="Acme",
+    )
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCaseStore({})
+    return SqliteCaseStore(str(tmp_path / "cases.db"))
+
+def test_roundtrip_and_save(store):
+    case = _new_case(store)
+    case.status = CaseStatus.DISMISSED
+    case.offer = Offer(type="DISCOUNT", details="10%", expiry="2099-01-01")
+    store.save_case(case)
+
+    loaded = store.get_case(case.case_id)
+    assert loaded.status is CaseStatus.DISMISSED
+    assert loaded.offer.details == "10%"
+
+    with pytest.raises(ValueError):
+        store.get_case("NOPE")
+
+def test_latest_open_case_for_user(store):
+    first = _new_case(store, thread_ts="1.0")
+    second = _new_case(store, thread_ts="2.0")
+    _new_case(store, initiator="U9")
+    assert store.latest_open_case_for_user("U1").case_id == second.case_id
+
+    second.status = CaseStatus.ACCEPTED
+    store.save_case(second)
+    assert store.latest_open_case_for_user("U1").case_id == first.case_id
+    assert store.latest_open_case_for_user("U404") is None
+
+def test_sqlite_uses_wal_and_indexes(tmp_path):
+    store = SqliteCaseStore(str(tmp_path / "cases.db"))
+    conn = store._conn()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    plan = " ".join(
+        row[-1]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT data FROM cases WHERE status = 'OPEN' AND initiator_user_id = ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            ("U1",),
+        )
+    )
+    assert "idx_cases_status_initiator" in plan
+
+def _create_in_child(path, n):
+    store = SqliteCaseStore(path)
+    for i in range(n):
+        _new_case(store, thread_ts=f"child.{i}")
+
+def test_sqlite_shared_across_processes(tmp_path):
+    path = str(tmp_path / "cases.db")
+    store = SqliteCaseStore(path)
+    _new_case(store)
+
+    procs = [mp.get_context("spawn").Process(target=_create_in_child, args=(path, 5)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=30)
+        assert p.exitcode == 0
+
+    count = store._conn().execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+    assert count == 11
+
+def test_secondary_lookups(store):
+    a = _new_case(store, account="acc-1", thread_ts="1.0")
+    b = _new_case(store, account="acc-2", thread_ts="2.0")
+
+    assert [c.case_id for c in store.cases_for_ad_account("acc-2")] == [b.case_id]
+    assert {c.case_id for c in store.cases_for_approver("U2")} == {a.case_id, b.case_id}
+    assert store.case_for_thread("C1", "1.0").case_id == a.case_id
+    assert store.case_for_thread("C1", "9.9") is None
+
+    store.set_case_status(a, "DISMISSED")
+    assert store.get_case(a.case_id).status is CaseStatus.DISMISSED
+    assert store.latest_open_case_for_user("U1").case_id == b.case_id
+
+def test_memory_reindexes_on_save():
+    store = MemoryCaseStore({})
+    case = _new_case(store, account="acc-1")
+    case.ad_account_id = "acc-9"
+    store.save_case(case)
+
+    assert store.cases_for_ad_account("acc-1") == []
+    assert store.cases_for_ad_account("acc-9") == [case]
+    assert "acc-1" not in store._by_ad_account
+
+def test_case_row_roundtrip():
+    case = Case.new(
+        "ABC123",
+        channel_id="C1",
+        thread_ts="1.0",
+        initiator_user_id="U1",
+        approver_user_id="U2",
+        stakeholder_user_id="U3",
+        ad_account_id="acc-1",
+        offer=Offer(type="CREDITS", details="500 USD"),
+        kpi=KpiSnapshot(impressions=10.0, spend=2.5, range="a → b"),
+    )
+    assert Case.from_row(case.to_row()) == case
+
+    legacy = {
+        "case_id": "ABC123",
+        "status": "ACCEPTED",
+        "initiator_user_id": "U1",
+        "approver_user_id": "U2",
+        "stakeholder_user_id": "U3",
+        "ad_account_id": "acc-1",
+        "offer": {"type": "CREDITS", "details": "500 USD"},
+        "kpi": {"impressions": 10, "range": "a → b"},
+    }
+    loaded = Case.from_dict(legacy)
+    assert loaded.status is CaseStatus.ACCEPTED
+    assert loaded.offer.details == "500 USD" and loaded.offer.expiry == ""
+    assert loaded.kpi.impressions == 10.0
+
+def test_sqlite_save_of_a_stale_copy_keeps_concurrent_changes(tmp_path):
+    store = SqliteCaseStore(str(tmp_path / "cases.db"))
+    case_id = _new_case(store).case_id
+    first, second = store.get_case(case_id), store.get_case(case_id)
+
+    store.set_case_status(second, CaseStatus.DISMISSED)
+    first.kpi = KpiSnapshot(impressions=10.0, range="a → b")
+    store.save_case(first)
+
+    stored = store.get_case(case_id)
+    assert stored.status is CaseStatus.DISMISSED
+    assert stored.kpi.impressions == 10.0
+    assert first.status is CaseStatus.DISMISSED
+    assert stored.revision > second.revision and stored.revision == first.revision
+
+    # The merged copy saves again without undoing anything either.
+    first.panel_ts = "9.9"
+    store.save_case(first)
+    assert store.get_case(case_id).status is CaseStatus.DISMISSED
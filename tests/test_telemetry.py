@@ -0,0 +1,73 @@
+import asyncio
+import datetime as dt
+
+from slack_bolt.util.utils import get_arg_names_of_callable
+
+from app.reporting.metrics import MetricsSpec
+from app.slack import pdf_actions
+from app.telemetry import (
+    LISTENER_SECONDS,
+    STAGE_SECONDS,
+    Histogram,
+    ListenerExecutor,
+    bolt_tags,
+    current_tags,
+    span,
+    tagged,
+    timed_listener,
+)
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("t_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(v, 'a"b')
+    lines = hist.render()
+    assert lines[:2] == ["# HELP t_seconds Test.", "# TYPE t_seconds histogram"]
+    assert lines[2:] == [
+        't_seconds_bucket{stage="a\\"b",le="0.1"} 2',
+        't_seconds_bucket{stage="a\\"b",le="1.0"} 3',
+        't_seconds_bucket{stage="a\\"b",le="+Inf"} 4',
+        't_seconds_sum{stage="a\\"b"} 2.65',
+        't_seconds_count{stage="a\\"b"} 4',
+    ]
+
+def test_bolt_tags():
+    assert bolt_tags({"command": "/churn-prevention-scan"}) == ("/churn-prevention-scan", "")
+    assert bolt_tags({"type": "view_submission", "view": {"callback_id": "churn_start_modal"}}) == (
+        "view_submission",
+        "churn_start_modal",
+    )
+    assert bolt_tags({"type": "block_actions", "actions": [{"action_id": "cp_dismiss_case"}]}) == (
+        "block_actions:cp_dismiss_case",
+        "",
+    )
+
+def test_listener_executor_keeps_tags_and_listeners_are_timed():
+    @timed_listener
+    def listener(ack, body):
+        return current_tags()
+
+    with ListenerExecutor(max_workers=1) as pool, tagged("/t-exec", "cb"):
+        assert pool.submit(listener, None, {}).result() == ("/t-exec", "cb")
+    assert current_tags() == ("", "")
+    assert LISTENER_SECONDS.count("/t-exec", "cb", "ok") == 1
+    assert get_arg_names_of_callable(listener) == ["ack", "body"]
+
+def test_spans_follow_tags_into_asyncio_threads():
+    def work():
+        with span("t_stage"):
+            pass
+
+    async def scenario():
+        with tagged("/t-async", "modal"):
+            await asyncio.to_thread(work)
+
+    asyncio.run(scenario())
+    assert STAGE_SECONDS.count("t_stage", "/t-async", "modal") == 1
+
+def test_snapshot_pipeline_stages_are_recorded():
+    end = dt.date.today() - dt.timedelta(days=1)
+    with tagged("/t-pipeline", "snap"):
+        pdf_actions.fetch_account_metrics("acc-telemetry", end - dt.timedelta(days=6), end, spec=MetricsSpec())
+    assert STAGE_SECONDS.count("ads_fetch", "/t-pipeline", "snap") >= 1
+    assert STAGE_SECONDS.count("metrics.stream_metrics", "/t-pipeline", "snap") == 1
@@ -0,0 +1,75 @@
+import asyncio
+import http.server
+import io
+import threading
+
+import pytest
+
+from app.slack.uploads import upload_file, upload_file_async
+
+class _Receiver(http.server.BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append((self.headers.get("Transfer-Encoding"), body))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def upload_url():
+    server = http.server.HTTPServer(("127.0.0.1", 0), _Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Receiver.received.clear()
+    yield f"http://127.0.0.1:{server.server_port}/upload"
+    server.shutdown()
+
+class _Client:
+    timeout, proxy, ssl = 5, None, None
+
+    def __init__(self, upload_url):
+        self.upload_url = upload_url
+        self.calls = []
+
+    def files_getUploadURLExternal(self, **kwargs):
+        self.calls.append(("files_getUploadURLExternal", kwargs))
+        return {"ok": True, "file_id": "F1", "upload_url": self.upload_url}
+
+    def files_completeUploadExternal(self, **kwargs):
+        self.calls.append(("files_completeUploadExternal", kwargs))
+        return {"ok": True, "files": kwargs["files"]}
+
+class _AsyncClient(_Client):
+    def __getattribute__(self, name):
+        attr = super().__getattribute__(name)
+        if name.startswith("files_"):
+            async def call(**kwargs):
+                return attr(**kwargs)
+
+            return call
+        return attr
+
+def test_file_is_streamed_from_its_position_with_a_content_length(upload_url):
+    client = _Client(upload_url)
+    file = io.BytesIO(b"skip%PDF-1.4 body")
+    file.seek(4)
+    response = upload_file(client, file, filename="r.pdf", channel="C1", thread_ts="1.2", initial_comment="hi")
+    assert _Receiver.received == [(None, b"%PDF-1.4 body")]
+    assert client.calls[0] == ("files_getUploadURLExternal", {"filename": "r.pdf", "length": 13})
+    assert client.calls[1][1] == {
+        "files": [{"id": "F1", "title": "r.pdf"}],
+        "channel_id": "C1",
+        "thread_ts": "1.2",
+        "initial_comment": "hi",
+    }
+    assert response["files"][0]["id"] == "F1"
+
+def test_async_upload_streams_too(upload_url):
+    client = _AsyncClient(upload_url)
+    asyncio.run(upload_file_async(client, io.BytesIO(b"%PDF"), filename="r.pdf", title="Report"))
+    assert _Receiver.received == [(None, b"%PDF")]
+    assert client.calls[1][1] == {"files": [{"id": "F1", "title": "Report"}]}